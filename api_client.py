@@ -2,10 +2,12 @@ import json
 import os
 import ssl
 import sys
+import threading
 import time
 import urllib.error
 import urllib.parse
 import urllib.request
+from collections import OrderedDict
 
 
 class ApiError(Exception):
@@ -58,24 +60,64 @@ def is_api_configured():
 
 _TOKEN = None
 _TOKEN_EXP = 0
+_REFRESH_TOKEN = None
+_REFRESH_TIMER = None
+_REFRESH_LEAD_SECONDS = 120
+_TOKEN_LOCK = threading.RLock()
 _SESSION_USERNAME = ""
 _SESSION_PASSWORD = ""
 _SESSION_USER = None
+# GET bodies keyed by URL with the server's ETag; every hit is revalidated, a 304 costs only headers.
+_RESPONSE_CACHE = OrderedDict()
+_RESPONSE_CACHE_MAX = 256
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+
+def _cancel_background_refresh():
+    global _REFRESH_TIMER
+    if _REFRESH_TIMER is not None:
+        _REFRESH_TIMER.cancel()
+        _REFRESH_TIMER = None
 
 
 def set_session_credentials(username, password):
-    global _SESSION_USERNAME, _SESSION_PASSWORD, _TOKEN, _TOKEN_EXP, _SESSION_USER
-    _SESSION_USERNAME = (username or "").strip()
-    _SESSION_PASSWORD = password or ""
-    _TOKEN = None
-    _TOKEN_EXP = 0
-    _SESSION_USER = None
+    global _SESSION_USERNAME, _SESSION_PASSWORD, _TOKEN, _TOKEN_EXP, _SESSION_USER, _REFRESH_TOKEN
+    with _TOKEN_LOCK:
+        _cancel_background_refresh()
+        _SESSION_USERNAME = (username or "").strip()
+        _SESSION_PASSWORD = password or ""
+        _TOKEN = None
+        _TOKEN_EXP = 0
+        _REFRESH_TOKEN = None
+        _SESSION_USER = None
+    clear_response_cache()
 
 
 def clear_session_credentials():
     set_session_credentials("", "")
 
 
+def clear_response_cache():
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE.clear()
+
+
+def _cached_response(url):
+    with _RESPONSE_CACHE_LOCK:
+        entry = _RESPONSE_CACHE.get(url)
+        if entry is not None:
+            _RESPONSE_CACHE.move_to_end(url)
+        return entry
+
+
+def _store_response(url, etag, body):
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE[url] = (etag, body)
+        _RESPONSE_CACHE.move_to_end(url)
+        while len(_RESPONSE_CACHE) > _RESPONSE_CACHE_MAX:
+            _RESPONSE_CACHE.popitem(last=False)
+
+
 def get_current_session_user():
     return dict(_SESSION_USER) if isinstance(_SESSION_USER, dict) else None
 
@@ -93,6 +135,9 @@ def _request(method, path, payload=None, token=None):
         headers["Content-Type"] = "application/json"
     if token:
         headers["Authorization"] = f"Bearer {token}"
+    cached = _cached_response(url) if method == "GET" else None
+    if cached is not None:
+        headers["If-None-Match"] = cached[0]
 
     req = urllib.request.Request(url=url, data=data, headers=headers, method=method)
     ssl_context = None
@@ -104,8 +149,14 @@ def _request(method, path, payload=None, token=None):
     try:
         with urllib.request.urlopen(req, timeout=12, context=ssl_context) as resp:
             body = resp.read().decode("utf-8") if resp.length != 0 else ""
+            etag = resp.headers.get("ETag")
+            if method == "GET" and etag:
+                _store_response(url, etag, body)
             return json.loads(body) if body else {}
     except urllib.error.HTTPError as exc:
+        if exc.code == 304 and cached is not None:
+            # Parse the stored text again so callers never share (and mutate) one object.
+            return json.loads(cached[1]) if cached[1] else {}
         raw = exc.read().decode("utf-8", errors="replace")
         detail = raw
         try:
@@ -118,8 +169,21 @@ def _request(method, path, payload=None, token=None):
         raise ApiError(f"Cannot reach API server: {exc.reason}") from exc
 
 
+def _apply_token_response(response, username):
+    global _SESSION_USER, _REFRESH_TOKEN
+    token = response.get("access_token")
+    if not token:
+        raise ApiError("API login did not return access_token.")
+    expires_minutes = int(response.get("expires_in_minutes", 60))
+    _SESSION_USER = {
+        "username": response.get("username", username),
+        "role": response.get("role", ""),
+    }
+    _REFRESH_TOKEN = response.get("refresh_token") or None
+    return token, time.time() + (expires_minutes * 60)
+
+
 def _login():
-    global _SESSION_USER
     cfg = _api_config()
     username = _SESSION_USERNAME or cfg["username"]
     password = _SESSION_PASSWORD or cfg["password"]
@@ -130,23 +194,56 @@ def _login():
         "/auth/login",
         payload={"username": username, "password": password},
     )
-    token = response.get("access_token")
-    if not token:
-        raise ApiError("API login did not return access_token.")
-    expires_minutes = int(response.get("expires_in_minutes", 60))
-    _SESSION_USER = {
-        "username": response.get("username", username),
-        "role": response.get("role", ""),
-    }
-    return token, time.time() + (expires_minutes * 60)
+    return _apply_token_response(response, username)
+
+
+def _refresh():
+    response = _request(
+        "POST",
+        "/auth/refresh",
+        payload={"refresh_token": _REFRESH_TOKEN},
+    )
+    return _apply_token_response(response, _SESSION_USERNAME)
+
+
+def _renew_token():
+    global _REFRESH_TOKEN
+    if _REFRESH_TOKEN:
+        try:
+            return _refresh()
+        except ApiError:
+            # Rotated, expired or revoked: fall back to a full password login once.
+            _REFRESH_TOKEN = None
+    return _login()
+
+
+def _background_refresh():
+    try:
+        _ensure_token(force_refresh=True)
+    except ApiError:
+        # The next foreground request retries and reports the error to the user.
+        pass
+
+
+def _schedule_background_refresh():
+    global _REFRESH_TIMER
+    _cancel_background_refresh()
+    if not _REFRESH_TOKEN:
+        return
+    delay = max(_TOKEN_EXP - time.time() - _REFRESH_LEAD_SECONDS, 5)
+    _REFRESH_TIMER = threading.Timer(delay, _background_refresh)
+    _REFRESH_TIMER.daemon = True
+    _REFRESH_TIMER.start()
 
 
 def _ensure_token(force_refresh=False):
     global _TOKEN, _TOKEN_EXP
-    if not force_refresh and _TOKEN and (_TOKEN_EXP - 10) > time.time():
+    with _TOKEN_LOCK:
+        if not force_refresh and _TOKEN and (_TOKEN_EXP - 10) > time.time():
+            return _TOKEN
+        _TOKEN, _TOKEN_EXP = _renew_token()
+        _schedule_background_refresh()
         return _TOKEN
-    _TOKEN, _TOKEN_EXP = _login()
-    return _TOKEN
 
 
 def _with_auth_request(method, path, payload=None):
@@ -184,18 +281,35 @@ def auth_me():
     return data
 
 
-def list_students(limit, offset, status_filter, name_query=""):
-    params = urllib.parse.urlencode(
-        {
-            "limit": int(limit),
-            "offset": int(offset),
-            "status_filter": status_filter,
-            "name_query": (name_query or "").strip(),
-        }
-    )
+def _student_page_params(limit, offset, status_filter, name_query, after_id, before_id):
+    query = {
+        "limit": int(limit),
+        "offset": int(offset),
+        "status_filter": status_filter,
+        "name_query": (name_query or "").strip(),
+    }
+    if after_id is not None:
+        query["after_id"] = int(after_id)
+    if before_id is not None:
+        query["before_id"] = int(before_id)
+    return urllib.parse.urlencode(query)
+
+
+def list_students(limit, offset, status_filter, name_query="", after_id=None, before_id=None):
+    params = _student_page_params(limit, offset, status_filter, name_query, after_id, before_id)
     return _with_auth_request("GET", f"/students/list?{params}")
 
 
+def students_page(limit, offset, status_filter, name_query="", after_id=None, before_id=None):
+    params = _student_page_params(limit, offset, status_filter, name_query, after_id, before_id)
+    return _with_auth_request("GET", f"/students/page?{params}")
+
+
+def student_stats(months=24):
+    params = urllib.parse.urlencode({"months": int(months)})
+    return _with_auth_request("GET", f"/students/stats?{params}")
+
+
 def count_students(status_filter, name_query=""):
     params = urllib.parse.urlencode(
         {
@@ -231,10 +345,22 @@ def reactivate_student(student_id):
     return _with_auth_request("POST", f"/students/{int(student_id)}/reactivate")
 
 
+def student_overview(student_id, fields=("detail", "followups", "attendance"), attendance_limit=20):
+    params = urllib.parse.urlencode({"fields": ",".join(fields), "attendance_limit": int(attendance_limit)})
+    return _with_auth_request("GET", f"/students/{int(student_id)}/overview?{params}")
+
+
 def list_student_followups(student_id):
     return _with_auth_request("GET", f"/students/{int(student_id)}/followups")
 
 
+def followups_due(limit=50, offset=0, location_id=None, order="desc"):
+    query = {"limit": int(limit), "offset": int(offset), "order": order}
+    if location_id is not None:
+        query["location_id"] = int(location_id)
+    return _with_auth_request("GET", f"/followups/due?{urllib.parse.urlencode(query)}")
+
+
 def upsert_student_followup(student_id, payload):
     return _with_auth_request("POST", f"/students/{int(student_id)}/followups/upsert", payload=payload)
 
@@ -311,8 +437,24 @@ def reactivate_class(class_id):
     return _with_auth_request("POST", f"/classes/{int(class_id)}/reactivate")
 
 
-def list_sessions():
-    return _with_auth_request("GET", "/sessions/list")
+def list_sessions(date_from=None, date_to=None, location_id=None, class_id=None):
+    query = {}
+    if date_from is not None:
+        query["date_from"] = str(date_from)
+    if date_to is not None:
+        query["date_to"] = str(date_to)
+    if location_id is not None:
+        query["location_id"] = int(location_id)
+    if class_id is not None:
+        query["class_id"] = int(class_id)
+    if not query:
+        return _with_auth_request("GET", "/sessions/list")
+    return _with_auth_request("GET", f"/sessions/list?{urllib.parse.urlencode(query)}")
+
+
+def sync_changes(since=0):
+    params = urllib.parse.urlencode({"since": int(since)})
+    return _with_auth_request("GET", f"/sync/changes?{params}")
 
 
 def create_session(payload):
@@ -323,6 +465,25 @@ def update_session(session_id, payload):
     return _with_auth_request("PUT", f"/sessions/{int(session_id)}", payload=payload)
 
 
+def list_schedule_templates():
+    return _with_auth_request("GET", "/schedule-templates/list")
+
+
+def create_schedule_template(payload):
+    return _with_auth_request("POST", "/schedule-templates/create", payload=payload)
+
+
+def deactivate_schedule_template(template_id):
+    return _with_auth_request("POST", f"/schedule-templates/{int(template_id)}/deactivate")
+
+
+def generate_sessions(date_from, date_to, template_ids=None, dry_run=True):
+    payload = {"date_from": str(date_from), "date_to": str(date_to), "dry_run": bool(dry_run)}
+    if template_ids:
+        payload["template_ids"] = [int(item) for item in template_ids]
+    return _with_auth_request("POST", "/schedule-templates/generate", payload=payload)
+
+
 def cancel_session(session_id):
     return _with_auth_request("POST", f"/sessions/{int(session_id)}/cancel")
 
@@ -335,16 +496,64 @@ def register_attendance(payload):
     return _with_auth_request("POST", "/attendance/register", payload=payload)
 
 
-def attendance_by_session(session_id):
-    return _with_auth_request("GET", f"/attendance/by-session/{int(session_id)}")
+def register_attendance_bulk(session_id, entries, source="coach"):
+    payload = {
+        "session_id": int(session_id),
+        "source": source,
+        "entries": [{"student_id": int(sid), "status": status} for sid, status in entries],
+    }
+    return _with_auth_request("POST", "/attendance/register-bulk", payload=payload)
+
+
+def attendance_by_session(session_id, limit=100, cursor=None):
+    query = {"limit": int(limit)}
+    if cursor:
+        query["cursor"] = cursor
+    return _with_auth_request(
+        "GET", f"/attendance/by-session/{int(session_id)}?{urllib.parse.urlencode(query)}"
+    )
+
+
+def attendance_by_student(student_id, limit=50, cursor=None):
+    query = {"limit": int(limit)}
+    if cursor:
+        query["cursor"] = cursor
+    return _with_auth_request(
+        "GET", f"/attendance/by-student/{int(student_id)}?{urllib.parse.urlencode(query)}"
+    )
+
+
+def analytics_student(student_id, weeks=12):
+    params = urllib.parse.urlencode({"weeks": int(weeks)})
+    return _with_auth_request("GET", f"/analytics/students/{int(student_id)}?{params}")
+
+
+def analytics_retention(inactive_days=30, limit=50, offset=0, location_id=None):
+    query = {"inactive_days": int(inactive_days), "limit": int(limit), "offset": int(offset)}
+    if location_id:
+        query["location_id"] = int(location_id)
+    return _with_auth_request("GET", f"/analytics/retention?{urllib.parse.urlencode(query)}")
 
 
-def attendance_by_student(student_id):
-    return _with_auth_request("GET", f"/attendance/by-student/{int(student_id)}")
+def analytics_occupancy(date_from=None, date_to=None, location_id=None, class_id=None):
+    query = {}
+    if date_from:
+        query["date_from"] = str(date_from)
+    if date_to:
+        query["date_to"] = str(date_to)
+    if location_id:
+        query["location_id"] = int(location_id)
+    if class_id:
+        query["class_id"] = int(class_id)
+    suffix = f"?{urllib.parse.urlencode(query)}" if query else ""
+    return _with_auth_request("GET", f"/analytics/occupancy{suffix}")
 
 
-def news_birthdays():
-    return _with_auth_request("GET", "/news/birthdays")
+def news_birthdays(days=None):
+    if days is None:
+        return _with_auth_request("GET", "/news/birthdays")
+    params = urllib.parse.urlencode({"days": int(days)})
+    return _with_auth_request("GET", f"/news/birthdays?{params}")
 
 
 def reports_students_search(payload):
@@ -0,0 +1,154 @@
+import time
+from contextlib import asynccontextmanager
+
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool, PoolTimeout, TooManyRequests
+
+from backend.config import (
+    DB_ASYNC_POOL_MAX_SIZE,
+    DB_ASYNC_POOL_MIN_SIZE,
+    DB_HOST,
+    DB_NAME,
+    DB_PASSWORD,
+    DB_POOL_MAX_WAITERS,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_PORT,
+    DB_SSLMODE,
+    DB_USER,
+)
+from backend.pool import PoolTimeoutError
+
+_POOL: AsyncConnectionPool | None = None
+_STATS = {"acquired": 0, "timeouts": 0, "rejected": 0, "wait_total": 0.0, "wait_max": 0.0}
+
+
+def _require(value: str, name: str) -> str:
+    if not value:
+        raise RuntimeError(f"Missing required DB setting: {name}")
+    return value
+
+
+async def open_pool() -> None:
+    # Built lazily from lifespan so importing backend.main never needs a database.
+    global _POOL
+    if _POOL is not None:
+        return
+    conninfo = make_conninfo(
+        host=_require(DB_HOST, "DB_HOST"),
+        port=DB_PORT,
+        dbname=_require(DB_NAME, "DB_NAME"),
+        user=_require(DB_USER, "DB_USER"),
+        password=_require(DB_PASSWORD, "DB_PASSWORD"),
+        sslmode=DB_SSLMODE,
+    )
+    pool = AsyncConnectionPool(
+        conninfo,
+        min_size=DB_ASYNC_POOL_MIN_SIZE,
+        max_size=DB_ASYNC_POOL_MAX_SIZE,
+        timeout=DB_POOL_TIMEOUT_SECONDS,
+        max_waiting=DB_POOL_MAX_WAITERS,
+        kwargs={"row_factory": dict_row},
+        open=False,
+    )
+    await pool.open()
+    _POOL = pool
+
+
+async def close_pool() -> None:
+    global _POOL
+    pool, _POOL = _POOL, None
+    if pool is not None:
+        await pool.close()
+
+
+def pool_stats() -> dict:
+    measures = _POOL.get_stats() if _POOL is not None else {}
+    size = int(measures.get("pool_size", 0))
+    idle = int(measures.get("pool_available", 0))
+    acquired = _STATS["acquired"]
+    return {
+        "min_size": DB_ASYNC_POOL_MIN_SIZE,
+        "max_size": DB_ASYNC_POOL_MAX_SIZE,
+        "size": size,
+        "in_use": max(size - idle, 0),
+        "idle": idle,
+        "waiters": int(measures.get("requests_waiting", 0)),
+        "max_waiters": DB_POOL_MAX_WAITERS,
+        "acquired": acquired,
+        "timeouts": _STATS["timeouts"],
+        "rejected": _STATS["rejected"],
+        "avg_wait_ms": round((_STATS["wait_total"] / acquired) * 1000, 3) if acquired else 0.0,
+        "max_wait_ms": round(_STATS["wait_max"] * 1000, 3),
+    }
+
+
+@asynccontextmanager
+async def get_conn():
+    if _POOL is None:
+        raise RuntimeError("Async DB pool is not open")
+    started = time.monotonic()
+    try:
+        conn = await _POOL.getconn()
+    except TooManyRequests as exc:
+        _STATS["rejected"] += 1
+        raise PoolTimeoutError("Database connection wait queue is full") from exc
+    except PoolTimeout as exc:
+        _STATS["timeouts"] += 1
+        raise PoolTimeoutError(
+            f"Timed out after {DB_POOL_TIMEOUT_SECONDS:.1f}s waiting for a database connection"
+        ) from exc
+    waited = time.monotonic() - started
+    _STATS["acquired"] += 1
+    _STATS["wait_total"] += waited
+    _STATS["wait_max"] = max(_STATS["wait_max"], waited)
+    try:
+        yield conn
+    finally:
+        await _POOL.putconn(conn)
+
+
+async def fetch_all(query: str, params=()):
+    async with get_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(query, params)
+            rows = await cur.fetchall()
+        await conn.commit()
+        return rows
+
+
+async def fetch_all_many(statements: list[tuple[str, tuple]]) -> list[list]:
+    # Several reads on one checkout; callers composing a view pay for one pool wait instead of N.
+    results = []
+    async with get_conn() as conn:
+        async with conn.cursor() as cur:
+            for query, params in statements:
+                await cur.execute(query, params)
+                results.append(await cur.fetchall())
+        await conn.commit()
+    return results
+
+
+async def fetch_one(query: str, params=()):
+    async with get_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(query, params)
+            row = await cur.fetchone()
+        await conn.commit()
+        return row
+
+
+async def execute(query: str, params=()):
+    async with get_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(query, params)
+        await conn.commit()
+
+
+async def execute_returning_one(query: str, params=()):
+    async with get_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(query, params)
+            row = await cur.fetchone()
+        await conn.commit()
+        return row
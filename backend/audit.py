@@ -1,11 +1,28 @@
+import asyncio
 import json
+import logging
+import queue
+import re
+import threading
+import time
 from contextvars import ContextVar
-from typing import Any
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable
 
 from fastapi import Request
 
+from backend.config import (
+    API_AUDIT_BATCH_SIZE,
+    API_AUDIT_BLOCK_SECONDS,
+    API_AUDIT_FLUSH_SECONDS,
+    API_AUDIT_PARTITION_MONTHS_AHEAD,
+    API_AUDIT_QUEUE_POLICY,
+    API_AUDIT_QUEUE_SIZE,
+)
 from backend.db import execute
 
+logger = logging.getLogger(__name__)
+
 _MASKED = "***"
 _SENSITIVE_KEYS = {
     "password",
@@ -20,6 +37,31 @@ _SENSITIVE_KEYS = {
 _MAX_TEXT_LEN = 300
 _CURRENT_CORRELATION_ID: ContextVar[str] = ContextVar("audit_correlation_id", default="")
 _CURRENT_IP_ADDRESS: ContextVar[str] = ContextVar("audit_ip_address", default="")
+_INSERT_COLUMNS = """
+    INSERT INTO audit_log (
+        actor_user_id,
+        actor_username,
+        action,
+        resource_type,
+        resource_id,
+        result,
+        ip_address,
+        correlation_id,
+        details,
+        created_at
+    )
+    VALUES
+"""
+_ROW_PLACEHOLDERS = "(%s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb, %s::timestamptz)"
+_QUEUE: queue.Queue = queue.Queue(maxsize=API_AUDIT_QUEUE_SIZE)
+_STATS_LOCK = threading.Lock()
+_STATS = {"enqueued": 0, "flushed": 0, "dropped": 0, "failed": 0, "batches": 0}
+_WRITER: threading.Thread | None = None
+_WRITER_STOP = threading.Event()
+_PARTITION_NAME_RE = re.compile(r"^audit_log_p(\d{4})(\d{2})$")
+_PARTITIONS_CHECKED_ON: date | None = None
+_DAILY_TASKS: dict[str, Callable[[], None]] = {}
+_DAILY_TASKS_DONE_ON: dict[str, date] = {}
 
 
 def _sanitize(value: Any) -> Any:
@@ -74,6 +116,100 @@ def get_current_request_context() -> dict[str, str]:
     }
 
 
+def _month_start(value: date, offset: int = 0) -> date:
+    months = value.year * 12 + value.month - 1 + offset
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def audit_partition_name(month: date) -> str:
+    return f"audit_log_p{month.year:04d}{month.month:02d}"
+
+
+def audit_partition_bounds(name: str) -> tuple[date, date] | None:
+    # Partitions are only ever created by ensure_audit_partitions, so the name carries the range.
+    match = _PARTITION_NAME_RE.match(name or "")
+    if not match:
+        return None
+    start = date(int(match.group(1)), int(match.group(2)), 1)
+    return start, _month_start(start, 1)
+
+
+def ensure_audit_partitions(
+    months_ahead: int = API_AUDIT_PARTITION_MONTHS_AHEAD,
+    start: date | None = None,
+) -> list[str]:
+    first = _month_start(start or date.today())
+    statements = []
+    names = []
+    for offset in range(max(months_ahead, 0) + 1):
+        month = _month_start(first, offset)
+        name = audit_partition_name(month)
+        names.append(name)
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF audit_log "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_month_start(month, 1).isoformat()}')"
+        )
+    execute(";\n".join(statements))
+    return names
+
+
+def _maybe_extend_partitions() -> None:
+    global _PARTITIONS_CHECKED_ON
+    today = date.today()
+    if _PARTITIONS_CHECKED_ON == today:
+        return
+    try:
+        ensure_audit_partitions()
+    except Exception:
+        logger.exception("Rolling audit_log partitions forward failed; will retry")
+        return
+    _PARTITIONS_CHECKED_ON = today
+
+
+def register_daily_task(name: str, task: Callable[[], None]) -> None:
+    """Run `task` once a day on the audit writer thread, retried on the next loop if it raises."""
+    _DAILY_TASKS[name] = task
+
+
+def _run_daily_tasks() -> None:
+    today = date.today()
+    for name, task in list(_DAILY_TASKS.items()):
+        if _DAILY_TASKS_DONE_ON.get(name) == today:
+            continue
+        try:
+            task()
+        except Exception:
+            logger.exception("Daily maintenance task %s failed; will retry", name)
+            continue
+        _DAILY_TASKS_DONE_ON[name] = today
+
+
+def _ensure_partitions_for(rows: list[tuple]) -> None:
+    # A month with no partition rejects every insert; create the months these rows need and let the caller retry.
+    # created_at is sent as UTC but stored as a naive timestamp in the server's TimeZone, which can move it
+    # across a month boundary; covering a day either side covers every offset.
+    months = {
+        _month_start((row[9] + timedelta(days=shift)).date())
+        for row in rows
+        for shift in (-1, 0, 1)
+    }
+    for month in sorted(months):
+        ensure_audit_partitions(months_ahead=0, start=month)
+
+
+def _count(key: str, amount: int = 1) -> None:
+    with _STATS_LOCK:
+        _STATS[key] += amount
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
 def audit_log_event(
     *,
     action: str,
@@ -90,35 +226,135 @@ def audit_log_event(
     current = get_current_request_context()
     resolved_ip = ip_address or current.get("ip_address")
     resolved_correlation = correlation_id or current.get("correlation_id")
+    row = (
+        actor_user_id,
+        (actor_username or "").strip() or None,
+        action,
+        resource_type,
+        resource_id,
+        result,
+        (resolved_ip or "").strip() or None,
+        (resolved_correlation or "").strip() or None,
+        json.dumps(payload, ensure_ascii=True),
+        datetime.now(timezone.utc),
+    )
+    # Audit must not block business requests: the row is written later by the writer thread.
+    # "block" only applies to sync handlers (threadpool); waiting on the event loop would stall every request.
     try:
-        execute(
-            """
-            INSERT INTO audit_log (
-                actor_user_id,
-                actor_username,
-                action,
-                resource_type,
-                resource_id,
-                result,
-                ip_address,
-                correlation_id,
-                details,
-                created_at
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb, now())
-            """,
-            (
-                actor_user_id,
-                (actor_username or "").strip() or None,
-                action,
-                resource_type,
-                resource_id,
-                result,
-                (resolved_ip or "").strip() or None,
-                (resolved_correlation or "").strip() or None,
-                json.dumps(payload, ensure_ascii=True),
-            ),
-        )
-    except Exception:
-        # Audit must not block business requests.
+        if API_AUDIT_QUEUE_POLICY == "block" and not _on_event_loop():
+            _QUEUE.put(row, timeout=API_AUDIT_BLOCK_SECONDS)
+        else:
+            _QUEUE.put_nowait(row)
+    except queue.Full:
+        _count("dropped")
+        return
+    _count("enqueued")
+
+
+def _insert_rows(rows: list[tuple]) -> None:
+    params: list[Any] = []
+    for row in rows:
+        params.extend(row)
+    execute(_INSERT_COLUMNS + ", ".join([_ROW_PLACEHOLDERS] * len(rows)), tuple(params))
+
+
+def _write_batch(rows: list[tuple]) -> None:
+    for attempt in range(2):
+        try:
+            _insert_rows(rows)
+        except Exception:
+            if attempt == 0:
+                try:
+                    _ensure_partitions_for(rows)
+                    continue
+                except Exception:
+                    logger.exception("Creating audit_log partitions for a failed batch failed")
+            logger.exception("Audit batch insert of %d rows failed; retrying row by row", len(rows))
+            break
+        with _STATS_LOCK:
+            _STATS["flushed"] += len(rows)
+            _STATS["batches"] += 1
+        return
+    # Only the rows that fail on their own are lost.
+    for row in rows:
+        try:
+            _insert_rows([row])
+        except Exception:
+            logger.exception("Audit event %s dropped after insert failure", row[2])
+            _count("failed")
+            continue
+        _count("flushed")
+
+
+def _take_batch(wait_seconds: float) -> list[tuple]:
+    try:
+        rows = [_QUEUE.get(timeout=wait_seconds)]
+    except queue.Empty:
+        return []
+    deadline = time.monotonic() + API_AUDIT_FLUSH_SECONDS
+    while len(rows) < API_AUDIT_BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            rows.append(_QUEUE.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return rows
+
+
+def flush_audit_events() -> int:
+    written = 0
+    while True:
+        rows = []
+        while len(rows) < API_AUDIT_BATCH_SIZE:
+            try:
+                rows.append(_QUEUE.get_nowait())
+            except queue.Empty:
+                break
+        if not rows:
+            return written
+        _write_batch(rows)
+        written += len(rows)
+
+
+def _writer_loop() -> None:
+    while not _WRITER_STOP.is_set():
+        # Long-running workers roll partitions forward themselves; startup only covers a few months.
+        _maybe_extend_partitions()
+        _run_daily_tasks()
+        rows = _take_batch(wait_seconds=0.5)
+        if rows:
+            _write_batch(rows)
+    flush_audit_events()
+
+
+def start_audit_writer() -> None:
+    global _WRITER
+    if _WRITER is not None and _WRITER.is_alive():
         return
+    _WRITER_STOP.clear()
+    _WRITER = threading.Thread(target=_writer_loop, name="audit-writer", daemon=True)
+    _WRITER.start()
+
+
+def stop_audit_writer(timeout: float = 10.0) -> None:
+    global _WRITER
+    writer, _WRITER = _WRITER, None
+    _WRITER_STOP.set()
+    if writer is not None:
+        writer.join(timeout)
+    flush_audit_events()
+
+
+def audit_queue_stats() -> dict[str, Any]:
+    with _STATS_LOCK:
+        stats = dict(_STATS)
+    stats.update(
+        {
+            "queued": _QUEUE.qsize(),
+            "capacity": _QUEUE.maxsize,
+            "policy": API_AUDIT_QUEUE_POLICY,
+        }
+    )
+    return stats
@@ -7,50 +7,80 @@ ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from backend.bulk_import import Checkpoint, iter_records, run_import  # noqa: E402
 
-def _load_students(path: str) -> list[dict]:
-    with open(path, "r", encoding="utf-8-sig") as handle:
-        data = json.load(handle)
-    if isinstance(data, dict):
-        data = data.get("students", [])
-    if not isinstance(data, list):
-        raise ValueError("Input JSON must be a list or an object with key 'students'.")
-    return data
+MAX_CHUNK_SIZE = 1000  # StudentBatchCreateIn limit
+
+
+def _print_result(chunk_no: int, _chunk: list, result: dict, verbose: bool, counters: dict) -> None:
+    counters["created"] += int(result.get("created", 0))
+    counters["errors"] += int(result.get("errors", 0))
+    for row in result.get("results", []):
+        if not verbose and row.get("status") != "error":
+            continue
+        print(
+            f"- [chunk {chunk_no}] {row.get('name', '')} <{row.get('email', '')}>: {row.get('status', '')}"
+            + (f" ({row.get('detail')})" if row.get("detail") else "")
+        )
 
 
 def main() -> int:
     from api_client import ApiError, batch_create_students
 
-    parser = argparse.ArgumentParser(description="Batch create students from JSON file")
-    parser.add_argument("--file", required=True, help="Path to JSON file")
+    parser = argparse.ArgumentParser(description="Batch create students from a JSON, NDJSON or CSV file")
+    parser.add_argument("--file", required=True, help="Path to input file")
+    parser.add_argument("--format", choices=["json", "ndjson", "csv"], help="Input format (default: by extension)")
+    parser.add_argument("--chunk-size", type=int, default=500, help=f"Students per request (max {MAX_CHUNK_SIZE})")
+    parser.add_argument("--workers", type=int, default=2, help="Requests in flight at once")
+    parser.add_argument(
+        "--checkpoint",
+        help="Checkpoint file (default: <file>.checkpoint.json); an existing one resumes the import",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Print every row, not only errors")
     parser.add_argument(
         "--dry-run",
         action="store_true",
         help="Validate payload and show outcome without inserting rows",
     )
     args = parser.parse_args()
+    if not 1 <= args.chunk_size <= MAX_CHUNK_SIZE:
+        print(f"Input error: --chunk-size must be between 1 and {MAX_CHUNK_SIZE}")
+        return 2
 
+    counters = {"created": 0, "errors": 0}
+    checkpoint_path = None if args.dry_run else (args.checkpoint or f"{args.file}.checkpoint.json")
     try:
-        students = _load_students(args.file)
-        result = batch_create_students({"students": students}, dry_run=args.dry_run)
+        checkpoint = Checkpoint(checkpoint_path, args.file, args.chunk_size)
+        if checkpoint.completed:
+            print(f"Resuming: {len(checkpoint.completed)} chunks ({checkpoint.rows_done} rows) already imported")
+        totals = run_import(
+            iter_records(args.file, "students", args.format),
+            send=lambda chunk: batch_create_students({"students": chunk}, dry_run=args.dry_run),
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            checkpoint=checkpoint,
+            on_result=lambda no, chunk, result: _print_result(no, chunk, result, args.verbose, counters),
+        )
     except (OSError, ValueError, json.JSONDecodeError) as exc:
         print(f"Input error: {exc}")
         return 2
     except ApiError as exc:
         print(f"API error: {exc}")
+        if checkpoint_path:
+            print(f"Progress saved to {checkpoint_path}; rerun the same command to resume.")
         return 1
 
+    rate = totals["rows"] / totals["seconds"] if totals["seconds"] else 0.0
     print(
         "Batch result:",
-        f"total={result.get('total', 0)}",
-        f"created={result.get('created', 0)}",
-        f"errors={result.get('errors', 0)}",
+        f"sent={totals['rows']}",
+        f"created={counters['created']}",
+        f"errors={counters['errors']}",
+        f"chunks={totals['chunks']}",
+        f"resumed_skipped={totals['skipped_chunks']}",
+        f"seconds={totals['seconds']}",
+        f"rows_per_second={rate:.0f}",
     )
-    for row in result.get("results", []):
-        print(
-            f"- {row.get('name', '')} <{row.get('email', '')}>: {row.get('status', '')}"
-            + (f" ({row.get('detail')})" if row.get("detail") else "")
-        )
     return 0
 
 
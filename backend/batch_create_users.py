@@ -7,36 +7,29 @@ ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from backend.bulk_import import Checkpoint, iter_records, run_import  # noqa: E402
 
-def _load_json(path: str):
-    with open(path, "r", encoding="utf-8-sig") as handle:
-        data = json.load(handle)
-    if isinstance(data, dict):
-        data = data.get("users", [])
-    if not isinstance(data, list):
-        raise ValueError("Input JSON must be a list or an object with key 'users'.")
-    return data
+MAX_CHUNK_SIZE = 500  # ApiUserBatchCreateIn limit
 
 
 def _username_from_row(row: dict) -> str:
-    username = str(row.get("username", "")).strip()
+    username = str(row.get("username") or "").strip()
     if username:
         return username
-    email = str(row.get("email", "")).strip()
+    email = str(row.get("email") or "").strip()
     if "@" in email:
         return email.split("@", 1)[0].strip()
     return ""
 
 
-def _normalize_users(items: list[dict], default_role: str, default_password: str) -> list[dict]:
-    users = []
+def _normalize_users(items, default_role: str, default_password: str):
     for idx, row in enumerate(items, start=1):
         if not isinstance(row, dict):
             raise ValueError(f"Row {idx}: expected object.")
 
         username = _username_from_row(row)
-        password = str(row.get("password", "")).strip() or default_password
-        role = str(row.get("role", default_role)).strip() or default_role
+        password = str(row.get("password") or "").strip() or default_password
+        role = str(row.get("role") or default_role).strip() or default_role
 
         if not username:
             raise ValueError(f"Row {idx}: missing username.")
@@ -45,15 +38,27 @@ def _normalize_users(items: list[dict], default_role: str, default_password: str
                 f"Row {idx}: missing password (provide password in row or --default-password)."
             )
 
-        users.append({"username": username, "password": password, "role": role})
-    return users
+        yield {"username": username, "password": password, "role": role}
+
+
+def _print_result(chunk_no: int, result: dict, verbose: bool, counters: dict) -> None:
+    for key in ("created", "skipped", "errors"):
+        counters[key] += int(result.get(key, 0))
+    for row in result.get("results", []):
+        if not verbose and row.get("status") != "error":
+            continue
+        print(
+            f"- [chunk {chunk_no}] {row.get('username', '')}: {row.get('status', '')}"
+            + (f" ({row.get('detail')})" if row.get("detail") else "")
+        )
 
 
 def main() -> int:
     from api_client import ApiError, batch_create_api_users
 
-    parser = argparse.ArgumentParser(description="Batch create API users from JSON file")
-    parser.add_argument("--file", required=True, help="Path to JSON file with users")
+    parser = argparse.ArgumentParser(description="Batch create API users from a JSON, NDJSON or CSV file")
+    parser.add_argument("--file", required=True, help="Path to input file with users")
+    parser.add_argument("--format", choices=["json", "ndjson", "csv"], help="Input format (default: by extension)")
     parser.add_argument(
         "--default-role",
         default="coach",
@@ -65,36 +70,61 @@ def main() -> int:
         default="",
         help="Fallback password when row password is omitted",
     )
+    parser.add_argument("--chunk-size", type=int, default=200, help=f"Users per request (max {MAX_CHUNK_SIZE})")
+    parser.add_argument("--workers", type=int, default=2, help="Requests in flight at once")
+    parser.add_argument(
+        "--checkpoint",
+        help="Checkpoint file (default: <file>.checkpoint.json); an existing one resumes the import",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Print every row, not only errors")
     parser.add_argument(
         "--dry-run",
         action="store_true",
         help="Validate payload and show outcome without inserting rows",
     )
     args = parser.parse_args()
+    if not 1 <= args.chunk_size <= MAX_CHUNK_SIZE:
+        print(f"Input error: --chunk-size must be between 1 and {MAX_CHUNK_SIZE}")
+        return 2
 
+    counters = {"created": 0, "skipped": 0, "errors": 0}
+    checkpoint_path = None if args.dry_run else (args.checkpoint or f"{args.file}.checkpoint.json")
     try:
-        raw_items = _load_json(args.file)
-        users = _normalize_users(raw_items, args.default_role, args.default_password)
-        result = batch_create_api_users({"users": users}, dry_run=args.dry_run)
+        checkpoint = Checkpoint(checkpoint_path, args.file, args.chunk_size)
+        if checkpoint.completed:
+            print(f"Resuming: {len(checkpoint.completed)} chunks ({checkpoint.rows_done} rows) already imported")
+        users = _normalize_users(
+            iter_records(args.file, "users", args.format), args.default_role, args.default_password
+        )
+        totals = run_import(
+            users,
+            send=lambda chunk: batch_create_api_users({"users": chunk}, dry_run=args.dry_run),
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            checkpoint=checkpoint,
+            on_result=lambda no, _chunk, result: _print_result(no, result, args.verbose, counters),
+        )
     except (ValueError, OSError, json.JSONDecodeError) as exc:
         print(f"Input error: {exc}")
         return 2
     except ApiError as exc:
         print(f"API error: {exc}")
+        if checkpoint_path:
+            print(f"Progress saved to {checkpoint_path}; rerun the same command to resume.")
         return 1
 
+    rate = totals["rows"] / totals["seconds"] if totals["seconds"] else 0.0
     print(
         "Batch result:",
-        f"total={result.get('total', 0)}",
-        f"created={result.get('created', 0)}",
-        f"skipped={result.get('skipped', 0)}",
-        f"errors={result.get('errors', 0)}",
+        f"sent={totals['rows']}",
+        f"created={counters['created']}",
+        f"skipped={counters['skipped']}",
+        f"errors={counters['errors']}",
+        f"chunks={totals['chunks']}",
+        f"resumed_skipped={totals['skipped_chunks']}",
+        f"seconds={totals['seconds']}",
+        f"rows_per_second={rate:.0f}",
     )
-    for row in result.get("results", []):
-        print(
-            f"- {row.get('username', '')}: {row.get('status', '')}"
-            + (f" ({row.get('detail')})" if row.get("detail") else "")
-        )
     return 0
 
 
@@ -0,0 +1,203 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+_READ_SIZE = 64 * 1024
+_FORMATS = {".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv"}
+
+
+def detect_format(path: str, explicit: str | None = None) -> str:
+    if explicit:
+        return explicit
+    fmt = _FORMATS.get(Path(path).suffix.lower())
+    if fmt is None:
+        raise ValueError("Cannot infer input format from extension; pass --format json|ndjson|csv.")
+    return fmt
+
+
+def _iter_json_array(handle, key: str) -> Iterator:
+    # json.load needs the whole document in memory; this decodes one array element at a time.
+    decoder = json.JSONDecoder()
+    buffer = ""
+    eof = False
+
+    def _fill() -> bool:
+        nonlocal buffer, eof
+        chunk = handle.read(_READ_SIZE)
+        if not chunk:
+            eof = True
+            return False
+        buffer += chunk
+        return True
+
+    while "[" not in buffer:
+        if not _fill():
+            raise ValueError(f"Input JSON must be a list or an object with key '{key}'.")
+    head, _, buffer = buffer.partition("[")
+    head = head.strip()
+    if head and not (head.startswith("{") and f'"{key}"' in head):
+        raise ValueError(f"Input JSON must be a list or an object with key '{key}'.")
+
+    while True:
+        buffer = buffer.lstrip().lstrip(",").lstrip()
+        if not buffer:
+            if not _fill():
+                raise ValueError("Unexpected end of JSON input.")
+            continue
+        if buffer[0] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof or not _fill():
+                raise
+            continue
+        buffer = buffer[end:]
+        yield item
+
+
+def _iter_ndjson(handle) -> Iterator:
+    for line_no, line in enumerate(handle, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Line {line_no}: {exc.msg}") from exc
+
+
+def _iter_csv(handle) -> Iterator:
+    for row in csv.DictReader(handle):
+        yield {
+            key.strip(): ((value.strip() or None) if isinstance(value, str) else value)
+            for key, value in row.items()
+            if key
+        }
+
+
+def iter_records(path: str, key: str, fmt: str | None = None) -> Iterator:
+    fmt = detect_format(path, fmt)
+    with open(path, "r", encoding="utf-8-sig", newline="" if fmt == "csv" else None) as handle:
+        if fmt == "json":
+            yield from _iter_json_array(handle, key)
+        elif fmt == "ndjson":
+            yield from _iter_ndjson(handle)
+        else:
+            yield from _iter_csv(handle)
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    chunk: list = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Checkpoint:
+    """Completed chunk numbers for one input file, rewritten atomically after every chunk."""
+
+    def __init__(self, path: str | None, source: str, chunk_size: int):
+        self.path = path
+        self.source = os.path.abspath(source)
+        self.chunk_size = chunk_size
+        self.completed: set[int] = set()
+        self.rows_done = 0
+        if path and os.path.exists(path):
+            self._load()
+
+    def _load(self) -> None:
+        with open(self.path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        if data.get("source") != self.source:
+            raise ValueError(f"Checkpoint {self.path} belongs to {data.get('source')}, not {self.source}.")
+        if int(data.get("chunk_size", 0)) != self.chunk_size:
+            raise ValueError(
+                f"Checkpoint was written with --chunk-size {data.get('chunk_size')}; resume with the same value."
+            )
+        self.completed = {int(item) for item in data.get("completed_chunks", [])}
+        self.rows_done = int(data.get("rows_done", 0))
+
+    def mark(self, chunk_no: int, rows: int) -> None:
+        self.completed.add(chunk_no)
+        self.rows_done += rows
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(
+                {
+                    "source": self.source,
+                    "chunk_size": self.chunk_size,
+                    "completed_chunks": sorted(self.completed),
+                    "rows_done": self.rows_done,
+                },
+                handle,
+            )
+        os.replace(tmp_path, self.path)
+
+
+def run_import(
+    records: Iterable,
+    *,
+    send: Callable[[list], dict],
+    chunk_size: int,
+    workers: int,
+    checkpoint: Checkpoint,
+    on_result: Callable[[int, list, dict], None],
+) -> dict:
+    """Send chunks with at most `workers` requests in flight; stops submitting on the first failure."""
+    totals = {"chunks": 0, "skipped_chunks": 0, "rows": 0, "failed_chunks": 0}
+    started = time.monotonic()
+    in_flight: dict = {}
+    first_error: Exception | None = None
+
+    def _drain(block_until: int) -> None:
+        nonlocal first_error
+        while len(in_flight) > block_until:
+            done, _pending = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk_no, chunk = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    totals["failed_chunks"] += 1
+                    if first_error is None:
+                        first_error = exc
+                    continue
+                checkpoint.mark(chunk_no, len(chunk))
+                totals["chunks"] += 1
+                totals["rows"] += len(chunk)
+                on_result(chunk_no, chunk, result)
+                elapsed = max(time.monotonic() - started, 1e-6)
+                print(
+                    f"[chunk {chunk_no}] {len(chunk)} rows ok; "
+                    f"{totals['rows']} rows this run, {totals['rows'] / elapsed:.0f} rows/s"
+                )
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        try:
+            for chunk_no, chunk in enumerate(chunked(records, chunk_size), start=1):
+                if chunk_no in checkpoint.completed:
+                    totals["skipped_chunks"] += 1
+                    continue
+                if first_error is not None:
+                    break
+                in_flight[executor.submit(send, chunk)] = (chunk_no, chunk)
+                _drain(max(workers, 1) - 1)
+        finally:
+            # Record whatever already went through, even if reading the input failed midway.
+            _drain(0)
+
+    totals["seconds"] = round(time.monotonic() - started, 3)
+    if first_error is not None:
+        raise first_error
+    return totals
@@ -78,6 +78,12 @@ DB_NAME = os.getenv("DB_NAME", str(_db_url.get("name") or _pg_name or _db.get("n
 DB_USER = os.getenv("DB_USER", str(_db_url.get("user") or _pg_user or ""))
 DB_PASSWORD = os.getenv("DB_PASSWORD", str(_db_url.get("password") or _pg_password or ""))
 DB_SSLMODE = os.getenv("DB_SSLMODE", str(_db_url.get("sslmode") or _pg_sslmode or _db.get("sslmode", "prefer")))
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+DB_POOL_MAX_WAITERS = int(os.getenv("DB_POOL_MAX_WAITERS", "100"))
+DB_ASYNC_POOL_MIN_SIZE = int(os.getenv("DB_ASYNC_POOL_MIN_SIZE", "1"))
+DB_ASYNC_POOL_MAX_SIZE = int(os.getenv("DB_ASYNC_POOL_MAX_SIZE", "10"))
 
 _railway_port = os.getenv("PORT")
 API_HOST = os.getenv("API_HOST", "0.0.0.0" if _railway_port else "127.0.0.1")
@@ -88,10 +94,22 @@ API_PROXY_HEADERS = os.getenv("API_PROXY_HEADERS", "true").strip().lower() in {"
 API_JWT_SECRET = os.getenv("API_JWT_SECRET", "CHANGE_ME_IN_ENV")
 API_JWT_ALGORITHM = "HS256"
 API_TOKEN_MINUTES = int(os.getenv("API_TOKEN_MINUTES", "60"))
+API_REFRESH_TOKEN_DAYS = int(os.getenv("API_REFRESH_TOKEN_DAYS", "14"))
 API_LOGIN_RATE_LIMIT_ATTEMPTS = int(os.getenv("API_LOGIN_RATE_LIMIT_ATTEMPTS", "5"))
 API_LOGIN_RATE_LIMIT_WINDOW_SECONDS = int(os.getenv("API_LOGIN_RATE_LIMIT_WINDOW_SECONDS", "300"))
 API_LOGIN_BLOCK_SECONDS = int(os.getenv("API_LOGIN_BLOCK_SECONDS", "900"))
 API_AUDIT_RETENTION_DAYS = int(os.getenv("API_AUDIT_RETENTION_DAYS", "365"))
+API_AUDIT_PARTITION_MONTHS_AHEAD = int(os.getenv("API_AUDIT_PARTITION_MONTHS_AHEAD", "3"))
+API_AUDIT_QUEUE_SIZE = int(os.getenv("API_AUDIT_QUEUE_SIZE", "10000"))
+API_AUDIT_BATCH_SIZE = int(os.getenv("API_AUDIT_BATCH_SIZE", "200"))
+API_AUDIT_FLUSH_SECONDS = float(os.getenv("API_AUDIT_FLUSH_SECONDS", "1.0"))
+API_AUDIT_QUEUE_POLICY = os.getenv("API_AUDIT_QUEUE_POLICY", "drop").strip().lower()
+API_AUDIT_BLOCK_SECONDS = float(os.getenv("API_AUDIT_BLOCK_SECONDS", "0.05"))
+API_AUTH_CACHE_SECONDS = float(os.getenv("API_AUTH_CACHE_SECONDS", "30"))
+API_STUDENT_COUNT_CACHE_SECONDS = float(os.getenv("API_STUDENT_COUNT_CACHE_SECONDS", "30"))
+API_SYNC_TOMBSTONE_DAYS = int(os.getenv("API_SYNC_TOMBSTONE_DAYS", "30"))
+API_HASH_WORKERS = int(os.getenv("API_HASH_WORKERS", str(os.cpu_count() or 1)))
+API_HASH_MAX_PENDING = int(os.getenv("API_HASH_MAX_PENDING", "64"))
 
 API_ADMIN_USER = os.getenv("API_ADMIN_USER", "admin")
 API_ADMIN_PASSWORD = os.getenv("API_ADMIN_PASSWORD", "change-me")
@@ -1,9 +1,21 @@
 from contextlib import contextmanager
 
+import psycopg2
 from psycopg2.extras import RealDictCursor
-from psycopg2.pool import SimpleConnectionPool
 
-from backend.config import DB_HOST, DB_NAME, DB_PASSWORD, DB_PORT, DB_SSLMODE, DB_USER
+from backend.config import (
+    DB_HOST,
+    DB_NAME,
+    DB_PASSWORD,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_MAX_WAITERS,
+    DB_POOL_MIN_SIZE,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_PORT,
+    DB_SSLMODE,
+    DB_USER,
+)
+from backend.pool import BoundedConnectionPool
 
 
 def _require(value: str, name: str) -> str:
@@ -12,18 +24,28 @@ def _require(value: str, name: str) -> str:
     return value
 
 
-_POOL = SimpleConnectionPool(
-    minconn=1,
-    maxconn=10,
-    host=_require(DB_HOST, "DB_HOST"),
-    port=DB_PORT,
-    dbname=_require(DB_NAME, "DB_NAME"),
-    user=_require(DB_USER, "DB_USER"),
-    password=_require(DB_PASSWORD, "DB_PASSWORD"),
-    sslmode=DB_SSLMODE,
+_CONNECT_KWARGS = {
+    "host": _require(DB_HOST, "DB_HOST"),
+    "port": DB_PORT,
+    "dbname": _require(DB_NAME, "DB_NAME"),
+    "user": _require(DB_USER, "DB_USER"),
+    "password": _require(DB_PASSWORD, "DB_PASSWORD"),
+    "sslmode": DB_SSLMODE,
+}
+
+_POOL = BoundedConnectionPool(
+    minconn=DB_POOL_MIN_SIZE,
+    maxconn=DB_POOL_MAX_SIZE,
+    connect=lambda: psycopg2.connect(**_CONNECT_KWARGS),
+    timeout=DB_POOL_TIMEOUT_SECONDS,
+    max_waiters=DB_POOL_MAX_WAITERS,
 )
 
 
+def pool_stats() -> dict:
+    return _POOL.stats()
+
+
 @contextmanager
 def get_conn():
     conn = _POOL.getconn()
@@ -61,3 +83,16 @@ def execute_returning_one(query: str, params=()):
             row = cur.fetchone()
         conn.commit()
         return row
+
+
+@contextmanager
+def transaction():
+    # One connection and a single commit for multi-statement work; any error rolls it all back.
+    with get_conn() as conn:
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                yield cur
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from backend.config import API_HASH_MAX_PENDING, API_HASH_WORKERS
+from backend.security import hash_password as _hash_password_inline
+from backend.security import verify_password as _verify_password_inline
+
+
+class HashingBusyError(RuntimeError):
+    pass
+
+
+_LOCK = threading.Lock()
+_EXECUTOR: ProcessPoolExecutor | None = None
+_STATS = {"pending": 0, "completed": 0, "rejected": 0, "busy_total": 0.0}
+
+
+def _executor() -> ProcessPoolExecutor | None:
+    global _EXECUTOR
+    with _LOCK:
+        if _EXECUTOR is None and API_HASH_WORKERS > 0:
+            _EXECUTOR = ProcessPoolExecutor(max_workers=API_HASH_WORKERS)
+        return _EXECUTOR
+
+
+def shutdown() -> None:
+    global _EXECUTOR
+    with _LOCK:
+        executor, _EXECUTOR = _EXECUTOR, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _reserve() -> float:
+    with _LOCK:
+        if _STATS["pending"] >= API_HASH_MAX_PENDING:
+            _STATS["rejected"] += 1
+            raise HashingBusyError("Password hashing queue is full")
+        _STATS["pending"] += 1
+    return time.monotonic()
+
+
+def _release(started: float) -> None:
+    with _LOCK:
+        _STATS["pending"] -= 1
+        _STATS["completed"] += 1
+        _STATS["busy_total"] += time.monotonic() - started
+
+
+def _submit(fn, *args) -> Future:
+    executor = _executor()
+    started = _reserve()
+    try:
+        if executor is None:
+            future: Future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as exc:
+                future.set_exception(exc)
+        else:
+            future = executor.submit(fn, *args)
+    except Exception:
+        _release(started)
+        raise
+    future.add_done_callback(lambda _future: _release(started))
+    return future
+
+
+def hash_password(password: str) -> str:
+    return _submit(_hash_password_inline, password).result()
+
+
+def verify_password(password: str, encoded_hash: str) -> bool:
+    return _submit(_verify_password_inline, password, encoded_hash).result()
+
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    # Submit in waves of one task per worker so a large batch never trips the pending cap.
+    window = max(API_HASH_WORKERS, 1)
+    hashed: list[str] = []
+    for start in range(0, len(passwords), window):
+        futures = [_submit(_hash_password_inline, item) for item in passwords[start:start + window]]
+        hashed.extend(future.result() for future in futures)
+    return hashed
+
+
+async def verify_password_async(password: str, encoded_hash: str) -> bool:
+    return await asyncio.wrap_future(_submit(_verify_password_inline, password, encoded_hash))
+
+
+def stats() -> dict:
+    with _LOCK:
+        pending = _STATS["pending"]
+        completed = _STATS["completed"]
+        return {
+            "workers": API_HASH_WORKERS,
+            "max_pending": API_HASH_MAX_PENDING,
+            "pending": pending,
+            "queued": max(pending - API_HASH_WORKERS, 0),
+            "completed": completed,
+            "rejected": _STATS["rejected"],
+            "avg_ms": round((_STATS["busy_total"] / completed) * 1000, 3) if completed else 0.0,
+        }
@@ -1,35 +1,54 @@
+import base64
+import binascii
 import csv
+import hashlib
 import json
 import threading
 import time
 import uuid
 from io import StringIO
 from contextlib import asynccontextmanager
-from datetime import date, datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 
 from fastapi import Depends, FastAPI, HTTPException, Query, Request, status
 from fastapi.responses import JSONResponse, Response
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from psycopg2.extras import execute_values
 
+from backend import async_db, hashing
 from backend.audit import (
     audit_log_event,
+    audit_partition_bounds,
+    audit_queue_stats,
     build_request_context,
     clear_current_request_context,
+    ensure_audit_partitions,
+    register_daily_task,
     set_current_request_context,
+    start_audit_writer,
+    stop_audit_writer,
 )
 from backend.config import (
     API_AUDIT_RETENTION_DAYS,
+    API_AUTH_CACHE_SECONDS,
+    API_STUDENT_COUNT_CACHE_SECONDS,
     API_ADMIN_PASSWORD,
     API_ADMIN_USER,
     API_LOGIN_BLOCK_SECONDS,
     API_LOGIN_RATE_LIMIT_ATTEMPTS,
     API_LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+    API_REFRESH_TOKEN_DAYS,
+    API_SYNC_TOMBSTONE_DAYS,
     API_TOKEN_MINUTES,
     validate_security_settings,
 )
-from backend.db import execute, execute_returning_one, fetch_all, fetch_one
+from backend.db import execute, execute_returning_one, fetch_all, fetch_one, pool_stats, transaction
+from backend.hashing import HashingBusyError, hash_password, hash_passwords, verify_password_async
+from backend.pool import PoolTimeoutError
 from backend.schemas import (
     AuditLogRow,
+    AuditQueueStatsOut,
+    AuditLogPartitionOut,
     AuditLogPurgeOut,
     AuditLogSearchOut,
     ApiUserPasswordResetIn,
@@ -39,8 +58,14 @@ from backend.schemas import (
     ApiUserBatchCreateResult,
     ApiUserCreateIn,
     ApiUserOut,
+    AttendanceBulkIn,
+    AttendanceBulkOut,
+    AttendanceBulkResult,
+    AttendancePageOut,
     AttendanceRegisterIn,
     AttendanceRow,
+    AttendanceTotalsOut,
+    AttendanceWeekOut,
     AuthUserOut,
     UserPreferencesIn,
     UserPreferencesOut,
@@ -48,14 +73,28 @@ from backend.schemas import (
     ClassIn,
     ClassOut,
     CountResponse,
+    DbPoolStatsOut,
+    DbPoolsStatsOut,
+    FollowupDuePageOut,
+    FollowupDueRow,
+    HashingStatsOut,
     IdNameOut,
     LoginRequest,
+    RefreshTokenIn,
     LocationCreateResponse,
     LocationIn,
     LocationOut,
+    OccupancySlotOut,
     ReportsStudentRow,
     ReportsStudentSearchIn,
     ReportsStudentSearchOut,
+    RetentionPageOut,
+    RetentionRow,
+    ScheduleGenerateIn,
+    ScheduleGenerateOut,
+    ScheduleSlotOut,
+    ScheduleTemplateIn,
+    ScheduleTemplateOut,
     SessionIn,
     SessionOut,
     TeacherCreateResponse,
@@ -65,6 +104,7 @@ from backend.schemas import (
     StudentBatchCreateIn,
     StudentBatchCreateOut,
     StudentBatchCreateResult,
+    StudentAttendanceAnalyticsOut,
     StudentCreateResponse,
     StudentDetailOut,
     StudentFollowupOut,
@@ -72,15 +112,16 @@ from backend.schemas import (
     StudentFollowupStageStatus,
     StudentFollowupUpsertIn,
     StudentOut,
+    StudentOverviewOut,
+    StudentPageOut,
+    StudentEnrollmentPoint,
+    StudentStatsBucket,
+    StudentStatsOut,
     StudentUpdateRequest,
+    SyncChangesOut,
     TokenResponse,
 )
-from backend.security import (
-    create_access_token,
-    hash_password,
-    verify_access_token,
-    verify_password,
-)
+from backend.security import create_access_token, decode_access_token, hash_refresh_token, new_refresh_token
 
 
 auth_scheme = HTTPBearer(auto_error=True)
@@ -205,6 +246,40 @@ def _run_startup_migrations():
         ADD COLUMN IF NOT EXISTS guardian_relationship varchar(50)
         """
     )
+    # Substring name search goes through trigram GIN indexes. unaccent() is only STABLE,
+    # so a pinned-dictionary IMMUTABLE wrapper is needed to use it in a generated column.
+    execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    execute(
+        """
+        CREATE OR REPLACE FUNCTION f_unaccent(text)
+        RETURNS text
+        LANGUAGE sql
+        IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+        """
+    )
+    execute(
+        """
+        ALTER TABLE t_students
+        ADD COLUMN IF NOT EXISTS name_search text
+        GENERATED ALWAYS AS (lower(f_unaccent(COALESCE(name, '')))) STORED
+        """
+    )
+    execute(
+        "CREATE INDEX IF NOT EXISTS idx_students_name_search_trgm ON t_students USING gin (name_search gin_trgm_ops)"
+    )
+    # Birthday as MMDD (e.g. 1231) so "upcoming birthdays" is a btree range instead of a full scan.
+    execute(
+        """
+        ALTER TABLE t_students
+        ADD COLUMN IF NOT EXISTS birthday_md smallint
+        GENERATED ALWAYS AS ((EXTRACT(MONTH FROM birthday) * 100 + EXTRACT(DAY FROM birthday))::smallint) STORED
+        """
+    )
+    execute(
+        "CREATE INDEX IF NOT EXISTS idx_students_birthday_md ON t_students (birthday_md) WHERE birthday_md IS NOT NULL"
+    )
     execute(
         """
         CREATE TABLE IF NOT EXISTS t_api_roles (
@@ -269,6 +344,12 @@ def _run_startup_migrations():
         ADD COLUMN IF NOT EXISTS can_update boolean NOT NULL DEFAULT true
         """
     )
+    execute(
+        """
+        ALTER TABLE t_api_users
+        ADD COLUMN IF NOT EXISTS token_version integer NOT NULL DEFAULT 0
+        """
+    )
     execute(
         """
         DO $$
@@ -312,8 +393,49 @@ def _run_startup_migrations():
     )
     execute(
         """
-        CREATE TABLE IF NOT EXISTS audit_log (
+        CREATE TABLE IF NOT EXISTS t_api_refresh_tokens (
             id bigserial PRIMARY KEY,
+            user_id integer NOT NULL REFERENCES t_api_users(id) ON DELETE CASCADE,
+            family_id varchar(32) NOT NULL,
+            token_hash char(64) NOT NULL UNIQUE,
+            expires_at timestamp NOT NULL,
+            revoked_at timestamp,
+            created_at timestamp NOT NULL DEFAULT now()
+        )
+        """
+    )
+    execute(
+        "CREATE INDEX IF NOT EXISTS idx_api_refresh_tokens_user_id ON t_api_refresh_tokens (user_id)"
+    )
+    execute(
+        "CREATE INDEX IF NOT EXISTS idx_api_refresh_tokens_family_id ON t_api_refresh_tokens (family_id)"
+    )
+    # audit_log is range-partitioned by month so retention can drop whole partitions.
+    # Older installs had a plain table; move it aside and copy it into partitions once.
+    execute(
+        """
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1
+                FROM pg_class
+                WHERE oid = to_regclass('audit_log') AND relkind = 'r'
+            ) THEN
+                ALTER TABLE audit_log RENAME TO audit_log_legacy;
+                ALTER INDEX IF EXISTS audit_log_pkey RENAME TO audit_log_legacy_pkey;
+                DROP INDEX IF EXISTS idx_audit_log_created_at;
+                DROP INDEX IF EXISTS idx_audit_log_actor_user_id;
+                DROP INDEX IF EXISTS idx_audit_log_action;
+                DROP INDEX IF EXISTS idx_audit_log_resource_type;
+            END IF;
+        END $$;
+        """
+    )
+    execute("CREATE SEQUENCE IF NOT EXISTS audit_log_id_seq")
+    execute(
+        """
+        CREATE TABLE IF NOT EXISTS audit_log (
+            id bigint NOT NULL DEFAULT nextval('audit_log_id_seq'),
             actor_user_id integer REFERENCES t_api_users(id) ON DELETE SET NULL,
             actor_username varchar(60),
             action varchar(80) NOT NULL,
@@ -323,14 +445,66 @@ def _run_startup_migrations():
             ip_address varchar(64),
             correlation_id varchar(120),
             details jsonb NOT NULL DEFAULT '{}'::jsonb,
-            created_at timestamp NOT NULL DEFAULT now()
-        )
+            created_at timestamp NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    execute("ALTER SEQUENCE audit_log_id_seq OWNED BY audit_log.id")
+    ensure_audit_partitions()
+    execute(
+        """
+        DO $$
+        DECLARE
+            month_start date;
+        BEGIN
+            IF to_regclass('audit_log_legacy') IS NULL THEN
+                RETURN;
+            END IF;
+            FOR month_start IN
+                SELECT generate_series(
+                    date_trunc('month', MIN(created_at)),
+                    date_trunc('month', MAX(created_at)),
+                    interval '1 month'
+                )::date
+                FROM audit_log_legacy
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF audit_log FOR VALUES FROM (%L) TO (%L)',
+                    'audit_log_p' || to_char(month_start, 'YYYYMM'),
+                    month_start,
+                    (month_start + interval '1 month')::date
+                );
+            END LOOP;
+            INSERT INTO audit_log (
+                id, actor_user_id, actor_username, action, resource_type, resource_id,
+                result, ip_address, correlation_id, details, created_at
+            )
+            SELECT
+                id, actor_user_id, actor_username, action, resource_type, resource_id,
+                result, ip_address, correlation_id, details, created_at
+            FROM audit_log_legacy;
+            DROP TABLE audit_log_legacy;
+        END $$;
         """
     )
-    execute("CREATE INDEX IF NOT EXISTS idx_audit_log_created_at ON audit_log (created_at DESC)")
+    execute("DROP INDEX IF EXISTS idx_audit_log_created_at")
+    execute(
+        "CREATE INDEX IF NOT EXISTS idx_audit_log_created_at_id ON audit_log (created_at DESC, id DESC)"
+    )
     execute("CREATE INDEX IF NOT EXISTS idx_audit_log_actor_user_id ON audit_log (actor_user_id)")
     execute("CREATE INDEX IF NOT EXISTS idx_audit_log_action ON audit_log (action)")
     execute("CREATE INDEX IF NOT EXISTS idx_audit_log_resource_type ON audit_log (resource_type)")
+    # The audit filters are ILIKE '%term%'; btree indexes cannot serve those, trigram GIN can.
+    execute(
+        "CREATE INDEX IF NOT EXISTS idx_audit_log_actor_username_trgm ON audit_log USING gin (actor_username gin_trgm_ops)"
+    )
+    execute(
+        "CREATE INDEX IF NOT EXISTS idx_audit_log_action_trgm ON audit_log USING gin (action gin_trgm_ops)"
+    )
+    execute(
+        "CREATE INDEX IF NOT EXISTS idx_audit_log_resource_type_trgm ON audit_log USING gin (resource_type gin_trgm_ops)"
+    )
     execute(
         """
         CREATE TABLE IF NOT EXISTS t_student_followups (
@@ -396,12 +570,420 @@ def _run_startup_migrations():
     execute(
         "CREATE INDEX IF NOT EXISTS idx_student_followups_call_date ON t_student_followups (call_date DESC)"
     )
+    execute(
+        "CREATE INDEX IF NOT EXISTS idx_class_sessions_date_start ON t_class_sessions (session_date, start_time)"
+    )
+    # History lookups filter on one side of the pair and read status from the index alone.
+    execute(
+        "CREATE INDEX IF NOT EXISTS idx_attendance_student_session ON t_attendance (student_id, session_id) "
+        "INCLUDE (status)"
+    )
+    execute(
+        "CREATE INDEX IF NOT EXISTS idx_attendance_session_student ON t_attendance (session_id, student_id) "
+        "INCLUDE (status, checkin_time)"
+    )
+    execute(
+        """
+        CREATE TABLE IF NOT EXISTS t_schedule_templates (
+            id serial PRIMARY KEY,
+            class_id integer NOT NULL REFERENCES t_classes(id),
+            weekday smallint NOT NULL CHECK (weekday BETWEEN 1 AND 7),
+            start_time time NOT NULL,
+            end_time time NOT NULL,
+            location_id integer NOT NULL REFERENCES t_locations(id),
+            valid_from date NOT NULL,
+            valid_to date NOT NULL,
+            active boolean NOT NULL DEFAULT true,
+            created_at timestamp NOT NULL DEFAULT now(),
+            updated_at timestamp NOT NULL DEFAULT now(),
+            CHECK (end_time > start_time),
+            CHECK (valid_to >= valid_from)
+        )
+        """
+    )
+    # /followups/due only looks at active students still inside the 70-day programme.
+    execute(
+        "CREATE INDEX IF NOT EXISTS idx_students_active_created_at ON t_students (created_at) WHERE active = true"
+    )
+    # One counter per table, bumped by a statement-level trigger; GET endpoints derive weak ETags from it.
+    execute(
+        """
+        CREATE TABLE IF NOT EXISTS t_table_versions (
+            table_name text PRIMARY KEY,
+            version bigint NOT NULL DEFAULT 0,
+            changed_at timestamptz NOT NULL DEFAULT now()
+        )
+        """
+    )
+    execute(
+        """
+        CREATE OR REPLACE FUNCTION f_bump_table_version() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO t_table_versions (table_name, version, changed_at)
+            VALUES (TG_TABLE_NAME, 1, now())
+            ON CONFLICT (table_name)
+            DO UPDATE SET version = t_table_versions.version + 1, changed_at = now();
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    for table in _VERSIONED_TABLES:
+        execute(f"DROP TRIGGER IF EXISTS trg_{table}_version ON {table}")
+        execute(
+            f"""
+            CREATE TRIGGER trg_{table}_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION f_bump_table_version()
+            """
+        )
+    # Change feed for /sync/changes: every written row is stamped with its writing transaction id
+    # (monotonic, 64-bit), and hard deletes leave a tombstone carrying the same stamp.
+    execute(
+        """
+        CREATE TABLE IF NOT EXISTS t_sync_tombstones (
+            table_name text NOT NULL,
+            row_id bigint NOT NULL,
+            change_seq bigint NOT NULL,
+            deleted_at timestamptz NOT NULL DEFAULT now()
+        )
+        """
+    )
+    execute("CREATE INDEX IF NOT EXISTS idx_sync_tombstones_change_seq ON t_sync_tombstones (change_seq)")
+    execute("CREATE INDEX IF NOT EXISTS idx_sync_tombstones_deleted_at ON t_sync_tombstones (deleted_at)")
+    # Highest change_seq among purged tombstones: a cursor at or below it may have missed deletes.
+    execute(
+        """
+        CREATE TABLE IF NOT EXISTS t_sync_state (
+            id boolean PRIMARY KEY DEFAULT true CHECK (id),
+            tombstone_floor bigint NOT NULL DEFAULT 0
+        )
+        """
+    )
+    execute(
+        """
+        CREATE OR REPLACE FUNCTION f_stamp_change_seq() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                INSERT INTO t_sync_tombstones (table_name, row_id, change_seq)
+                VALUES (TG_TABLE_NAME, OLD.id, pg_current_xact_id()::text::bigint);
+                RETURN OLD;
+            END IF;
+            NEW.change_seq := pg_current_xact_id()::text::bigint;
+            RETURN NEW;
+        END
+        $$
+        """
+    )
+    for table in _SYNC_TABLES:
+        execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS change_seq bigint")
+        execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_change_seq ON {table} (change_seq)")
+        execute(f"DROP TRIGGER IF EXISTS trg_{table}_change_seq ON {table}")
+        execute(
+            f"""
+            CREATE TRIGGER trg_{table}_change_seq
+            BEFORE INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION f_stamp_change_seq()
+            """
+        )
+    _migrate_attendance_rollups()
+
+
+def _migrate_attendance_rollups() -> None:
+    # Attendance rollups for /analytics/*. Inserts (the common case, usually a whole roster per
+    # statement) are folded in from the transition table; updates, deletes and moved sessions
+    # recompute only the students and sessions they touched. Every writer first takes per-session and then
+    # per-student advisory locks in sorted order, so a recompute never races another transaction's
+    # upsert or recompute of the same keys.
+    execute(
+        """
+        CREATE TABLE IF NOT EXISTS t_attendance_student_weekly (
+            student_id integer NOT NULL,
+            week_start date NOT NULL,
+            attended integer NOT NULL DEFAULT 0,
+            recorded integer NOT NULL DEFAULT 0,
+            PRIMARY KEY (student_id, week_start)
+        )
+        """
+    )
+    execute(
+        """
+        CREATE TABLE IF NOT EXISTS t_attendance_student_span (
+            student_id integer PRIMARY KEY,
+            first_attended date NOT NULL,
+            last_attended date NOT NULL,
+            attended_total integer NOT NULL DEFAULT 0
+        )
+        """
+    )
+    execute(
+        "CREATE INDEX IF NOT EXISTS idx_attendance_student_span_last ON t_attendance_student_span (last_attended)"
+    )
+    execute(
+        """
+        CREATE TABLE IF NOT EXISTS t_attendance_session_counts (
+            session_id integer PRIMARY KEY,
+            attended integer NOT NULL DEFAULT 0,
+            recorded integer NOT NULL DEFAULT 0
+        )
+        """
+    )
+    execute(
+        """
+        CREATE TABLE IF NOT EXISTS t_migration_markers (
+            name text PRIMARY KEY,
+            applied_at timestamptz NOT NULL DEFAULT now()
+        )
+        """
+    )
+    execute(
+        """
+        CREATE OR REPLACE FUNCTION f_attendance_rollup_lock(p_students integer[], p_sessions integer[])
+        RETURNS void
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            key integer;
+        BEGIN
+            -- Sessions before students: a moved session only learns its students after locking it.
+            FOR key IN SELECT DISTINCT k FROM unnest(p_sessions) AS k WHERE k IS NOT NULL ORDER BY k LOOP
+                PERFORM pg_advisory_xact_lock(hashtext('attendance_rollup.session'), key);
+            END LOOP;
+            FOR key IN SELECT DISTINCT k FROM unnest(p_students) AS k WHERE k IS NOT NULL ORDER BY k LOOP
+                PERFORM pg_advisory_xact_lock(hashtext('attendance_rollup.student'), key);
+            END LOOP;
+        END
+        $$
+        """
+    )
+    execute(
+        """
+        CREATE OR REPLACE FUNCTION f_attendance_rollup_refresh(p_students integer[], p_sessions integer[])
+        RETURNS void
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM f_attendance_rollup_lock(p_students, p_sessions);
+
+            DELETE FROM t_attendance_student_weekly WHERE student_id = ANY(p_students);
+            INSERT INTO t_attendance_student_weekly (student_id, week_start, attended, recorded)
+            SELECT a.student_id, date_trunc('week', cs.session_date)::date,
+                   COUNT(*) FILTER (WHERE a.status IN ('present', 'late')), COUNT(*)
+            FROM t_attendance a
+            JOIN t_class_sessions cs ON cs.id = a.session_id
+            WHERE a.student_id = ANY(p_students)
+            GROUP BY 1, 2;
+
+            DELETE FROM t_attendance_student_span WHERE student_id = ANY(p_students);
+            INSERT INTO t_attendance_student_span (student_id, first_attended, last_attended, attended_total)
+            SELECT a.student_id, MIN(cs.session_date), MAX(cs.session_date), COUNT(*)
+            FROM t_attendance a
+            JOIN t_class_sessions cs ON cs.id = a.session_id
+            WHERE a.student_id = ANY(p_students) AND a.status IN ('present', 'late')
+            GROUP BY 1;
+
+            DELETE FROM t_attendance_session_counts WHERE session_id = ANY(p_sessions);
+            INSERT INTO t_attendance_session_counts (session_id, attended, recorded)
+            SELECT a.session_id, COUNT(*) FILTER (WHERE a.status IN ('present', 'late')), COUNT(*)
+            FROM t_attendance a
+            WHERE a.session_id = ANY(p_sessions)
+            GROUP BY 1;
+        END
+        $$
+        """
+    )
+    # Full recompute: the startup backfill and POST /analytics/rebuild. Blocking attendance writes
+    # for its duration keeps the per-key triggers from interleaving with it.
+    execute(
+        """
+        CREATE OR REPLACE FUNCTION f_attendance_rollup_rebuild() RETURNS void
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            LOCK TABLE t_attendance IN SHARE ROW EXCLUSIVE MODE;
+            DELETE FROM t_attendance_student_weekly;
+            DELETE FROM t_attendance_student_span;
+            DELETE FROM t_attendance_session_counts;
+
+            INSERT INTO t_attendance_student_weekly (student_id, week_start, attended, recorded)
+            SELECT a.student_id, date_trunc('week', cs.session_date)::date,
+                   COUNT(*) FILTER (WHERE a.status IN ('present', 'late')), COUNT(*)
+            FROM t_attendance a
+            JOIN t_class_sessions cs ON cs.id = a.session_id
+            GROUP BY 1, 2;
+
+            INSERT INTO t_attendance_student_span (student_id, first_attended, last_attended, attended_total)
+            SELECT a.student_id, MIN(cs.session_date), MAX(cs.session_date), COUNT(*)
+            FROM t_attendance a
+            JOIN t_class_sessions cs ON cs.id = a.session_id
+            WHERE a.status IN ('present', 'late')
+            GROUP BY 1;
+
+            INSERT INTO t_attendance_session_counts (session_id, attended, recorded)
+            SELECT a.session_id, COUNT(*) FILTER (WHERE a.status IN ('present', 'late')), COUNT(*)
+            FROM t_attendance a
+            GROUP BY 1;
+        END
+        $$
+        """
+    )
+    execute(
+        """
+        CREATE OR REPLACE FUNCTION f_attendance_rollup_insert() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM f_attendance_rollup_lock(
+                ARRAY(SELECT student_id FROM new_rows),
+                ARRAY(SELECT session_id FROM new_rows)
+            );
+
+            INSERT INTO t_attendance_student_weekly AS w (student_id, week_start, attended, recorded)
+            SELECT n.student_id, date_trunc('week', cs.session_date)::date,
+                   COUNT(*) FILTER (WHERE n.status IN ('present', 'late')), COUNT(*)
+            FROM new_rows n
+            JOIN t_class_sessions cs ON cs.id = n.session_id
+            GROUP BY 1, 2
+            ON CONFLICT (student_id, week_start) DO UPDATE
+            SET attended = w.attended + EXCLUDED.attended, recorded = w.recorded + EXCLUDED.recorded;
+
+            INSERT INTO t_attendance_student_span AS sp (student_id, first_attended, last_attended, attended_total)
+            SELECT n.student_id, MIN(cs.session_date), MAX(cs.session_date), COUNT(*)
+            FROM new_rows n
+            JOIN t_class_sessions cs ON cs.id = n.session_id
+            WHERE n.status IN ('present', 'late')
+            GROUP BY 1
+            ON CONFLICT (student_id) DO UPDATE
+            SET first_attended = LEAST(sp.first_attended, EXCLUDED.first_attended),
+                last_attended = GREATEST(sp.last_attended, EXCLUDED.last_attended),
+                attended_total = sp.attended_total + EXCLUDED.attended_total;
+
+            INSERT INTO t_attendance_session_counts AS sc (session_id, attended, recorded)
+            SELECT n.session_id, COUNT(*) FILTER (WHERE n.status IN ('present', 'late')), COUNT(*)
+            FROM new_rows n
+            GROUP BY 1
+            ON CONFLICT (session_id) DO UPDATE
+            SET attended = sc.attended + EXCLUDED.attended, recorded = sc.recorded + EXCLUDED.recorded;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    execute(
+        """
+        CREATE OR REPLACE FUNCTION f_attendance_rollup_change() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                PERFORM f_attendance_rollup_refresh(
+                    ARRAY(SELECT DISTINCT student_id FROM old_rows),
+                    ARRAY(SELECT DISTINCT session_id FROM old_rows)
+                );
+            ELSE
+                PERFORM f_attendance_rollup_refresh(
+                    ARRAY(SELECT student_id FROM old_rows UNION SELECT student_id FROM new_rows),
+                    ARRAY(SELECT session_id FROM old_rows UNION SELECT session_id FROM new_rows)
+                );
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    execute(
+        """
+        CREATE OR REPLACE FUNCTION f_attendance_rollup_truncate() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            TRUNCATE t_attendance_student_weekly, t_attendance_student_span, t_attendance_session_counts;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    execute(
+        """
+        CREATE OR REPLACE FUNCTION f_attendance_rollup_session_moved() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            -- Wait for in-flight inserts into this session (they hold its lock until commit), then read
+            -- the attendee list in a later statement so their rows are visible.
+            PERFORM f_attendance_rollup_lock(ARRAY[]::integer[], ARRAY[NEW.id]);
+            PERFORM f_attendance_rollup_refresh(
+                ARRAY(SELECT DISTINCT student_id FROM t_attendance WHERE session_id = NEW.id),
+                ARRAY[NEW.id]
+            );
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    # Triggers and the one-time backfill share a transaction that blocks attendance writes, so no
+    # insert can land between them; the marker (not an empty-table check) records that the backfill
+    # ran, and a second worker starting at the same time waits on the lock and then skips it.
+    with transaction() as cur:
+        cur.execute("LOCK TABLE t_attendance IN SHARE ROW EXCLUSIVE MODE")
+        cur.execute("DROP TRIGGER IF EXISTS trg_attendance_rollup_insert ON t_attendance")
+        cur.execute(
+            """
+            CREATE TRIGGER trg_attendance_rollup_insert
+            AFTER INSERT ON t_attendance
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION f_attendance_rollup_insert()
+            """
+        )
+        cur.execute("DROP TRIGGER IF EXISTS trg_attendance_rollup_update ON t_attendance")
+        cur.execute(
+            """
+            CREATE TRIGGER trg_attendance_rollup_update
+            AFTER UPDATE ON t_attendance
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION f_attendance_rollup_change()
+            """
+        )
+        cur.execute("DROP TRIGGER IF EXISTS trg_attendance_rollup_delete ON t_attendance")
+        cur.execute(
+            """
+            CREATE TRIGGER trg_attendance_rollup_delete
+            AFTER DELETE ON t_attendance
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION f_attendance_rollup_change()
+            """
+        )
+        cur.execute("DROP TRIGGER IF EXISTS trg_attendance_rollup_truncate ON t_attendance")
+        cur.execute(
+            """
+            CREATE TRIGGER trg_attendance_rollup_truncate
+            AFTER TRUNCATE ON t_attendance
+            FOR EACH STATEMENT EXECUTE FUNCTION f_attendance_rollup_truncate()
+            """
+        )
+        cur.execute("DROP TRIGGER IF EXISTS trg_class_sessions_rollup_moved ON t_class_sessions")
+        cur.execute(
+            """
+            CREATE TRIGGER trg_class_sessions_rollup_moved
+            AFTER UPDATE OF session_date ON t_class_sessions
+            FOR EACH ROW WHEN (OLD.session_date IS DISTINCT FROM NEW.session_date)
+            EXECUTE FUNCTION f_attendance_rollup_session_moved()
+            """
+        )
+        cur.execute(
+            "INSERT INTO t_migration_markers (name) VALUES (%s) ON CONFLICT DO NOTHING RETURNING name",
+            (_ATTENDANCE_ROLLUP_MARKER,),
+        )
+        if cur.fetchone() is not None:
+            cur.execute("SELECT f_attendance_rollup_rebuild()")
 
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     _run_startup_migrations()
-    yield
+    await async_db.open_pool()
+    start_audit_writer()
+    try:
+        yield
+    finally:
+        stop_audit_writer()
+        await async_db.close_pool()
+        hashing.shutdown()
 
 
 app = FastAPI(title="BJJ Vienna API", version="0.1.0", lifespan=lifespan)
@@ -423,6 +1005,24 @@ async def correlation_middleware(request: Request, call_next):
     return response
 
 
+@app.exception_handler(HashingBusyError)
+async def hashing_busy_handler(_request: Request, _exc: HashingBusyError):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy verifying credentials. Try again shortly."},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(_request: Request, _exc: PoolTimeoutError):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database is busy. Try again shortly."},
+        headers={"Retry-After": "1"},
+    )
+
+
 @app.get("/")
 def root():
     return {"status": "ok", "service": "bjj-vienna-api"}
@@ -444,57 +1044,183 @@ def _normalize_sex(value: str) -> str:
     )
 
 
-def _require_auth(
-    credentials: HTTPAuthorizationCredentials = Depends(auth_scheme),
-) -> str:
-    subject = verify_access_token(credentials.credentials)
-    _get_user_by_subject(subject)
-    return subject
-
-
-def _get_user_by_subject(subject: str):
-    row = fetch_one(
-        """
-        SELECT id, username, role, can_write, can_update, active
-        FROM t_api_users
-        WHERE username = %s
-        """,
-        (subject,),
-    )
+_USER_BY_SUBJECT_SQL = """
+    SELECT id, username, role, can_write, can_update, active
+    FROM t_api_users
+    WHERE username = %s
+"""
+_USER_CACHE_LOCK = threading.Lock()
+_USER_CACHE: dict[str, tuple[float, dict]] = {}
+_TOKEN_VERSIONS_SQL = "SELECT username, token_version, active FROM t_api_users"
+_TOKEN_VERSIONS: dict[str, tuple[int, bool]] = {}
+_TOKEN_VERSIONS_EXPIRES_AT = 0.0
+
+
+def _cached_user(subject: str):
+    with _USER_CACHE_LOCK:
+        entry = _USER_CACHE.get(subject)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            _USER_CACHE.pop(subject, None)
+            return None
+        return entry[1]
+
+
+def _store_cached_user(subject: str, row):
+    if not row or API_AUTH_CACHE_SECONDS <= 0:
+        return row
+    user = dict(row)
+    with _USER_CACHE_LOCK:
+        _USER_CACHE[subject] = (time.monotonic() + API_AUTH_CACHE_SECONDS, user)
+    return user
+
+
+def _invalidate_user_cache(*usernames: str | None) -> None:
+    global _TOKEN_VERSIONS_EXPIRES_AT
+    with _USER_CACHE_LOCK:
+        for username in usernames:
+            if username:
+                _USER_CACHE.pop(username, None)
+        _TOKEN_VERSIONS_EXPIRES_AT = 0.0
+
+
+def _cached_token_versions():
+    with _USER_CACHE_LOCK:
+        if _TOKEN_VERSIONS_EXPIRES_AT > time.monotonic():
+            return _TOKEN_VERSIONS
+    return None
+
+
+def _store_token_versions(rows) -> dict[str, tuple[int, bool]]:
+    global _TOKEN_VERSIONS, _TOKEN_VERSIONS_EXPIRES_AT
+    versions = {
+        str(row["username"]): (int(row.get("token_version") or 0), bool(row.get("active")))
+        for row in rows
+    }
+    with _USER_CACHE_LOCK:
+        _TOKEN_VERSIONS = versions
+        _TOKEN_VERSIONS_EXPIRES_AT = time.monotonic() + API_AUTH_CACHE_SECONDS
+    return versions
+
+
+def _token_versions() -> dict[str, tuple[int, bool]]:
+    # One small query per TTL refreshes the revocation state of every API user.
+    versions = _cached_token_versions()
+    if versions is None:
+        versions = _store_token_versions(fetch_all(_TOKEN_VERSIONS_SQL))
+    return versions
+
+
+async def _token_versions_async() -> dict[str, tuple[int, bool]]:
+    versions = _cached_token_versions()
+    if versions is None:
+        versions = _store_token_versions(await async_db.fetch_all(_TOKEN_VERSIONS_SQL))
+    return versions
+
+
+def _token_claims(row) -> dict:
+    return {
+        "uid": row["id"],
+        "role": row["role"],
+        "can_write": bool(row.get("can_write")),
+        "can_update": bool(row.get("can_update")),
+        "tv": int(row.get("token_version") or 0),
+    }
+
+
+def _user_from_claims(claims: dict, versions: dict[str, tuple[int, bool]]) -> dict:
+    subject = str(claims["sub"])
+    current = versions.get(subject)
+    if current is None or not current[1]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+    if claims.get("tv") != current[0]:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked")
+    return {
+        "id": claims.get("uid"),
+        "username": subject,
+        "role": claims.get("role"),
+        "can_write": bool(claims.get("can_write")),
+        "can_update": bool(claims.get("can_update")),
+        "active": True,
+    }
+
+
+def _ensure_active_user(row):
     if not row or not row.get("active"):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
     return row
 
 
-def _require_admin(subject: str = Depends(_require_auth)) -> str:
-    row = _get_user_by_subject(subject)
-    if row.get("role") != "admin":
+def _get_user_by_subject(subject: str):
+    row = _cached_user(subject)
+    if row is None:
+        row = _store_cached_user(subject, fetch_one(_USER_BY_SUBJECT_SQL, (subject,)))
+    return _ensure_active_user(row)
+
+
+async def _get_user_by_subject_async(subject: str):
+    row = _cached_user(subject)
+    if row is None:
+        row = _store_cached_user(subject, await async_db.fetch_one(_USER_BY_SUBJECT_SQL, (subject,)))
+    return _ensure_active_user(row)
+
+
+def _current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(auth_scheme),
+) -> dict:
+    # FastAPI caches dependency results per request, so every guard below shares this row.
+    claims = decode_access_token(credentials.credentials)
+    if "role" not in claims:
+        # Tokens issued before permission claims existed still resolve through the DB.
+        return _get_user_by_subject(str(claims["sub"]))
+    return _user_from_claims(claims, _token_versions())
+
+
+async def _current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(auth_scheme),
+) -> dict:
+    # Async routes must not fall back to a threadpool dependency for auth.
+    claims = decode_access_token(credentials.credentials)
+    if "role" not in claims:
+        return await _get_user_by_subject_async(str(claims["sub"]))
+    return _user_from_claims(claims, await _token_versions_async())
+
+
+def _require_auth(user: dict = Depends(_current_user)) -> str:
+    return str(user["username"])
+
+
+async def _require_auth_async(user: dict = Depends(_current_user_async)) -> str:
+    return str(user["username"])
+
+
+def _require_admin(user: dict = Depends(_current_user)) -> str:
+    if user.get("role") != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin role required")
-    return subject
+    return str(user["username"])
 
 
-def _require_write_access(subject: str = Depends(_require_auth)) -> str:
-    row = _get_user_by_subject(subject)
-    if row.get("role") == "admin":
-        return subject
-    if not bool(row.get("can_write")):
+def _require_write_access(user: dict = Depends(_current_user)) -> str:
+    if user.get("role") == "admin":
+        return str(user["username"])
+    if not bool(user.get("can_write")):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Write permission required",
         )
-    return subject
+    return str(user["username"])
 
 
-def _require_update_access(subject: str = Depends(_require_auth)) -> str:
-    row = _get_user_by_subject(subject)
-    if row.get("role") == "admin":
-        return subject
-    if not bool(row.get("can_update")):
+def _require_update_access(user: dict = Depends(_current_user)) -> str:
+    if user.get("role") == "admin":
+        return str(user["username"])
+    if not bool(user.get("can_update")):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Update permission required",
         )
-    return subject
+    return str(user["username"])
 
 
 def _audit_cud(
@@ -520,6 +1246,49 @@ def _audit_cud(
     )
 
 
+_VERSIONED_TABLES = ("t_locations", "t_coaches", "t_classes", "t_class_sessions", "t_students")
+_TABLE_VERSIONS_SQL = "SELECT table_name, version FROM t_table_versions WHERE table_name = ANY(%s)"
+_ATTENDANCE_ROLLUP_MARKER = "attendance_rollups_backfill"
+_SYNC_TABLES = ("t_students", "t_coaches", "t_locations", "t_classes", "t_class_sessions")
+
+
+def _weak_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:24]
+    return f'W/"{digest}"'
+
+
+def _versions_key(rows: list[dict], tables: tuple[str, ...]) -> str:
+    versions = {row["table_name"]: row["version"] for row in rows}
+    return ",".join(f"{table}:{versions.get(table, 0)}" for table in tables)
+
+
+def _table_versions(*tables: str) -> str:
+    rows = fetch_all(_TABLE_VERSIONS_SQL, (list(tables),))
+    return _versions_key(rows, tables)
+
+
+async def _table_versions_async(*tables: str) -> str:
+    rows = await async_db.fetch_all(_TABLE_VERSIONS_SQL, (list(tables),))
+    return _versions_key(rows, tables)
+
+
+def _not_modified(request: Request, response: Response, etag: str) -> Response | None:
+    """Tag the response; return a bare 304 when the client already holds this representation."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    header = request.headers.get("if-none-match", "")
+    if not header:
+        return None
+    # Weak comparison (RFC 9110 8.8.3.2): the W/ prefix is ignored on both sides.
+    opaque = etag.removeprefix("W/")
+    if header.strip() == "*" or any(tag.strip().removeprefix("W/") == opaque for tag in header.split(",")):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": response.headers["Cache-Control"]},
+        )
+    return None
+
+
 def _student_program_progress(enrollment_date: date | None) -> tuple[int | None, bool, int | None]:
     if not enrollment_date:
         return None, False, None
@@ -530,18 +1299,118 @@ def _student_program_progress(enrollment_date: date | None) -> tuple[int | None,
     return int(stage), False, days_since
 
 
-def _student_exists(student_id: int) -> dict:
-    row = fetch_one(
-        """
-        SELECT id, created_at::date AS enrollment_date
-        FROM t_students
-        WHERE id = %s
-        """,
-        (student_id,),
-    )
-    if not row:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
-    return row
+_STUDENT_DETAIL_SQL = """
+    SELECT s.id, s.name, s.sex, s.direction, s.postalcode, s.belt, s.email, s.phone, s.phone2,
+           s.weight, s.country, s.taxid, s.birthday, s.location_id, l.name AS location,
+           s.newsletter_opt_in, s.is_minor, s.guardian_name, s.guardian_email, s.guardian_phone,
+           s.guardian_phone2, s.guardian_relationship, s.active, s.created_at,
+           s.created_at::date AS enrollment_date
+    FROM t_students s
+    LEFT JOIN t_locations l ON s.location_id = l.id
+    WHERE s.id = %s
+"""
+_STUDENT_FOLLOWUPS_SQL = """
+    SELECT id, student_id, stage_number, call_date, points_of_interest, main_reason, goals,
+           goal_details, welcome_packet_read, questions, benefits_seen, attendance_summary,
+           equipment_status, events_discussed, motivation_notes, issues_detected,
+           referral_requested, upgrade_appointment_scheduled, upgrade_appointment_date,
+           notes, created_at, updated_at
+    FROM t_student_followups
+    WHERE student_id = %s
+    ORDER BY stage_number
+"""
+_STUDENT_ATTENDANCE_SQL = """
+    SELECT c.name AS c1, cs.session_date::text AS c2, a.status AS c3, cs.session_date, a.session_id
+    FROM t_attendance a
+    JOIN t_class_sessions cs ON a.session_id = cs.id
+    JOIN t_classes c ON cs.class_id = c.id
+    WHERE a.student_id = %s{after}
+    ORDER BY cs.session_date DESC, a.session_id DESC
+    LIMIT %s
+"""
+_SESSION_ATTENDANCE_SQL = """
+    SELECT st.name AS c1, a.status AS c2, a.checkin_time::text AS c3, a.student_id
+    FROM t_attendance a
+    JOIN t_students st ON a.student_id = st.id
+    WHERE a.session_id = %s{after}
+    ORDER BY st.name, a.student_id
+    LIMIT %s
+"""
+_ATTENDED_STATUSES = ["present", "late"]
+# "Last N days" is today and the N - 1 days before it; the window starts are passed in as dates.
+_STUDENT_ATTENDANCE_TOTALS_SQL = """
+    SELECT
+        COUNT(*) FILTER (WHERE cs.session_date >= %s) AS last_30_days,
+        COUNT(*) FILTER (WHERE cs.session_date >= %s) AS last_90_days,
+        COUNT(*) AS last_365_days
+    FROM t_attendance a
+    JOIN t_class_sessions cs ON a.session_id = cs.id
+    WHERE a.student_id = %s
+      AND a.status = ANY(%s)
+      AND cs.session_date BETWEEN %s AND %s
+"""
+
+
+def _attendance_totals_params(student_id: int, today: date) -> tuple:
+    def _start(days: int) -> date:
+        return today - timedelta(days=days - 1)
+
+    return (_start(30), _start(90), student_id, _ATTENDED_STATUSES, _start(365), today)
+_STUDENT_OVERVIEW_FIELDS = ("detail", "followups", "attendance")
+
+
+def _build_followup_roadmap(
+    student_id: int, enrollment_date: date | None, rows: list[dict]
+) -> StudentFollowupRoadmapOut:
+    followups = [StudentFollowupOut.model_validate(row) for row in rows]
+
+    completed_map = {item.stage_number: item for item in followups}
+    current_stage, program_completed, days_since = _student_program_progress(enrollment_date)
+    stages: list[StudentFollowupStageStatus] = []
+    for stage_number in range(1, 6):
+        row = completed_map.get(stage_number)
+        if row:
+            status_value = "completed"
+        elif (not program_completed) and current_stage == stage_number:
+            status_value = "current"
+        else:
+            status_value = "pending"
+        stages.append(
+            StudentFollowupStageStatus(
+                stage_number=stage_number,
+                status=status_value,
+                followup_id=row.id if row else None,
+                call_date=row.call_date if row else None,
+            )
+        )
+
+    last_call_date = None
+    if followups:
+        last_call_date = max((item.call_date for item in followups if item.call_date), default=None)
+    return StudentFollowupRoadmapOut(
+        student_id=student_id,
+        enrollment_date=enrollment_date,
+        days_since_enrollment=days_since,
+        current_stage=current_stage,
+        program_completed=program_completed,
+        last_call_date=last_call_date,
+        stages=stages,
+        followups=followups,
+    )
+
+
+def _student_exists(student_id: int) -> dict:
+    row = fetch_one(
+        """
+        SELECT id, created_at::date AS enrollment_date
+        FROM t_students
+        WHERE id = %s
+        """,
+        (student_id,),
+    )
+    if not row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
+    return row
 
 
 def _build_audit_where(
@@ -552,10 +1421,15 @@ def _build_audit_where(
     action: str,
     resource_type: str,
     result: str,
+    before: tuple[datetime, int] | None = None,
 ) -> tuple[str, list[object]]:
     where_clauses = []
     params: list[object] = []
 
+    if before is not None:
+        where_clauses.append("(created_at, id) < (%s, %s)")
+        params.extend(before)
+
     if date_from:
         where_clauses.append("created_at >= %s")
         params.append(date_from)
@@ -587,6 +1461,53 @@ def _build_audit_where(
     return where_sql, params
 
 
+def _encode_audit_cursor(row: dict) -> str:
+    raw = json.dumps([row["created_at"].isoformat(), int(row["id"])], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _encode_attendance_cursor(key, row_id: int) -> str:
+    raw = json.dumps([str(key), int(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_attendance_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return str(key), int(row_id)
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid cursor") from exc
+
+
+def _decode_audit_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid cursor") from exc
+
+
+def _estimate_audit_total(where_sql: str, params: list[object]) -> int:
+    # The planner's row estimate costs one EXPLAIN regardless of how many rows match.
+    plan_rows = fetch_all(
+        f"""
+        EXPLAIN (FORMAT JSON)
+        SELECT 1
+        FROM audit_log
+        {where_sql}
+        """,
+        tuple(params),
+    )
+    if not plan_rows:
+        return 0
+    plan = plan_rows[0]["QUERY PLAN"]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
 def _fetch_audit_total(where_sql: str, params: list[object]) -> int:
     count_row = fetch_all(
         f"""
@@ -606,19 +1527,24 @@ def _fetch_audit_rows(where_sql: str, params: list[object], limit: int, offset:
                ip_address, correlation_id, details, created_at
         FROM audit_log
         {where_sql}
-        ORDER BY created_at DESC
+        ORDER BY created_at DESC, id DESC
         LIMIT %s OFFSET %s
         """,
         tuple(params + [limit, offset]),
     )
 
 
+# Matches the generated, unaccented and lower-cased t_students.name_search column so
+# "muller" finds "Müller" and the trigram index serves the substring match.
+_STUDENT_NAME_MATCH_SQL = "s.name_search LIKE lower(f_unaccent(%s))"
+
+
 def _build_reports_student_filters(payload: ReportsStudentSearchIn):
     params = []
     where_clauses = []
     term = (payload.term or "").strip()
     if term:
-        where_clauses.append("s.name ILIKE %s")
+        where_clauses.append(_STUDENT_NAME_MATCH_SQL)
         params.append(f"%{term}%")
 
     if payload.consent_value is not None:
@@ -652,33 +1578,86 @@ def health_check():
     return {"status": "ok"}
 
 
+@app.get("/health/audit-queue", response_model=AuditQueueStatsOut)
+def health_audit_queue(_: str = Depends(_require_admin)):
+    return AuditQueueStatsOut.model_validate(audit_queue_stats())
+
+
+@app.get("/health/hashing", response_model=HashingStatsOut)
+def health_hashing(_: str = Depends(_require_admin)):
+    return HashingStatsOut.model_validate(hashing.stats())
+
+
+@app.get("/health/db-pool", response_model=DbPoolsStatsOut)
+def health_db_pool(_: str = Depends(_require_admin)):
+    return DbPoolsStatsOut(
+        sync_pool=DbPoolStatsOut.model_validate(pool_stats()),
+        async_pool=DbPoolStatsOut.model_validate(async_db.pool_stats()),
+    )
+
+
+def _birthday_window(today: date, days: int | None) -> list[tuple[int, int]]:
+    """Inclusive MMDD ranges for the current month (days=None) or the next `days` days from today."""
+    if days is None:
+        return [(today.month * 100 + 1, today.month * 100 + 31)]
+    if days >= 366:
+        return [(101, 1231)]
+    start = today.month * 100 + today.day
+    last = today + timedelta(days=days - 1)
+    end = last.month * 100 + last.day
+    if end >= start:
+        return [(start, end)]
+    # The window crosses New Year: the rest of December, then January onwards.
+    return [(start, 1231), (101, end)]
+
+
+def _seconds_until_midnight(now: datetime) -> float:
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return max((midnight - now).total_seconds(), 1.0)
+
+
 @app.get("/news/birthdays", response_model=list[BirthdayNotificationRow])
-def news_birthdays(_: str = Depends(_require_auth)):
+def news_birthdays(
+    days: int | None = Query(default=None, ge=1, le=366),
+    _: str = Depends(_require_auth),
+):
+    now = datetime.now()
+    key = (now.date(), days)
+    cached = _cached_birthdays(key)
+    if cached is not None:
+        return cached
+
+    ranges = _birthday_window(now.date(), days)
+    where = " OR ".join("s.birthday_md BETWEEN %s AND %s" for _range in ranges)
+    params: list = [bound for item in ranges for bound in item]
+    # Birthdays after New Year sort behind the December ones when the window wraps.
     rows = fetch_all(
-        """
+        f"""
         SELECT s.name, s.belt, s.birthday, s.active
         FROM t_students s
-        WHERE s.birthday IS NOT NULL
-          AND EXTRACT(MONTH FROM s.birthday) = EXTRACT(MONTH FROM CURRENT_DATE)
-        ORDER BY EXTRACT(DAY FROM s.birthday), s.name
-        """
+        WHERE {where}
+        ORDER BY s.birthday_md < %s, s.birthday_md, s.name
+        """,
+        (*params, ranges[0][0]),
     )
-    return [BirthdayNotificationRow.model_validate(row) for row in rows]
+    result = [BirthdayNotificationRow.model_validate(row) for row in rows]
+    _store_birthdays(key, result, _seconds_until_midnight(now))
+    return result
 
 
 @app.post("/reports/students/search", response_model=ReportsStudentSearchOut)
-def reports_students_search(payload: ReportsStudentSearchIn, _: str = Depends(_require_auth)):
+async def reports_students_search(payload: ReportsStudentSearchIn, _: str = Depends(_require_auth_async)):
     where_sql, params = _build_reports_student_filters(payload)
-    count_row = fetch_all(
+    count_rows = await async_db.fetch_all(
         f"""
         SELECT COUNT(*) AS total
         FROM t_students s
         {where_sql}
         """,
         tuple(params),
-    )[0]
-    total = int(count_row["total"])
-    rows = fetch_all(
+    )
+    total = int(count_rows[0]["total"])
+    rows = await async_db.fetch_all(
         f"""
         SELECT 'Student' AS type,
                s.name AS name,
@@ -734,7 +1713,7 @@ def reports_students_export(payload: ReportsStudentSearchIn, _: str = Depends(_r
 
 
 @app.post("/auth/login", response_model=TokenResponse)
-def login(payload: LoginRequest, request: Request):
+async def login(payload: LoginRequest, request: Request):
     username = payload.username.strip()
     identity = _login_identity(username, request)
     ctx = build_request_context(request)
@@ -753,10 +1732,10 @@ def login(payload: LoginRequest, request: Request):
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Too many failed login attempts. Try again later.",
         )
-    row = fetch_one(
+    row = await async_db.fetch_one(
         """
         SELECT id, username, password_hash, active
-               , role
+               , role, can_write, can_update, token_version
         FROM t_api_users
         WHERE username = %s
         """,
@@ -795,7 +1774,7 @@ def login(payload: LoginRequest, request: Request):
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user",
         )
-    if not verify_password(payload.password, row["password_hash"]):
+    if not await verify_password_async(payload.password, row["password_hash"]):
         _record_failed_login(identity)
         audit_log_event(
             action="auth.login",
@@ -813,7 +1792,8 @@ def login(payload: LoginRequest, request: Request):
             detail="Invalid credentials",
         )
     _clear_failed_logins(identity)
-    token = create_access_token(subject=row["username"])
+    token = create_access_token(subject=row["username"], claims=_token_claims(row))
+    refresh_token = await _issue_refresh_token(row["id"])
     audit_log_event(
         action="auth.login",
         result="success",
@@ -830,26 +1810,126 @@ def login(payload: LoginRequest, request: Request):
         expires_in_minutes=API_TOKEN_MINUTES,
         username=row["username"],
         role=row["role"],
+        refresh_token=refresh_token,
+        refresh_expires_in_minutes=API_REFRESH_TOKEN_DAYS * 24 * 60,
+    )
+
+
+async def _issue_refresh_token(user_id: int, family_id: str | None = None) -> str:
+    refresh_token = new_refresh_token()
+    await async_db.execute(
+        """
+        WITH pruned AS (
+            DELETE FROM t_api_refresh_tokens
+            WHERE user_id = %s AND expires_at < now()
+        )
+        INSERT INTO t_api_refresh_tokens (user_id, family_id, token_hash, expires_at)
+        VALUES (%s, %s, %s, now() + (%s * interval '1 day'))
+        """,
+        (
+            user_id,
+            user_id,
+            family_id or uuid.uuid4().hex,
+            hash_refresh_token(refresh_token),
+            API_REFRESH_TOKEN_DAYS,
+        ),
+    )
+    return refresh_token
+
+
+def _revoke_refresh_tokens(user_id: int) -> None:
+    execute(
+        """
+        UPDATE t_api_refresh_tokens
+        SET revoked_at = now()
+        WHERE user_id = %s AND revoked_at IS NULL
+        """,
+        (user_id,),
+    )
+
+
+@app.post("/auth/refresh", response_model=TokenResponse)
+async def refresh_access_token(payload: RefreshTokenIn):
+    presented_hash = hash_refresh_token(payload.refresh_token)
+    # Consuming the presented token and reading the user is one statement, so two
+    # concurrent refreshes with the same token cannot both succeed.
+    row = await async_db.execute_returning_one(
+        """
+        UPDATE t_api_refresh_tokens t
+        SET revoked_at = now()
+        FROM t_api_users u
+        WHERE t.token_hash = %s
+          AND t.revoked_at IS NULL
+          AND t.expires_at > now()
+          AND u.id = t.user_id
+          AND u.active
+        RETURNING t.family_id, u.id, u.username, u.role, u.can_write, u.can_update, u.token_version
+        """,
+        (presented_hash,),
+    )
+    if not row:
+        reused = await async_db.execute_returning_one(
+            """
+            WITH family AS (
+                SELECT family_id, user_id
+                FROM t_api_refresh_tokens
+                WHERE token_hash = %s AND revoked_at IS NOT NULL
+            ), revoked AS (
+                UPDATE t_api_refresh_tokens t
+                SET revoked_at = now()
+                FROM family f
+                WHERE t.family_id = f.family_id AND t.revoked_at IS NULL
+                RETURNING t.id
+            )
+            SELECT f.user_id, (SELECT COUNT(*) FROM revoked)::int AS revoked_count
+            FROM family f
+            """,
+            (presented_hash,),
+        )
+        if reused:
+            # A rotated-out token came back: assume it leaked and end the whole session family.
+            audit_log_event(
+                action="auth.refresh",
+                result="failed",
+                actor_user_id=reused.get("user_id"),
+                resource_type="auth",
+                details={"reason": "refresh_token_reuse", "revoked": reused.get("revoked_count")},
+            )
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+        )
+    refresh_token = await _issue_refresh_token(row["id"], family_id=row["family_id"])
+    return TokenResponse(
+        access_token=create_access_token(subject=row["username"], claims=_token_claims(row)),
+        expires_in_minutes=API_TOKEN_MINUTES,
+        username=row["username"],
+        role=row["role"],
+        refresh_token=refresh_token,
+        refresh_expires_in_minutes=API_REFRESH_TOKEN_DAYS * 24 * 60,
     )
 
 
 @app.get("/auth/me", response_model=AuthUserOut)
-def auth_me(subject: str = Depends(_require_auth)):
-    row = _get_user_by_subject(subject)
-    return AuthUserOut.model_validate(row)
+def auth_me(user: dict = Depends(_current_user)):
+    return AuthUserOut.model_validate(user)
 
 
 @app.get("/users/me/preferences", response_model=UserPreferencesOut)
-def get_my_preferences(subject: str = Depends(_require_auth)):
-    user = _get_user_by_subject(subject)
+def get_my_preferences(request: Request, response: Response, user: dict = Depends(_current_user)):
     row = fetch_one(
         """
-        SELECT theme, language, palette_light, palette_dark
+        SELECT theme, language, palette_light, palette_dark, updated_at
         FROM t_api_user_preferences
         WHERE user_id = %s
         """,
         (user["id"],),
     )
+    # Per-user row: its updated_at is the version, so a match skips only the body, not the lookup.
+    etag = _weak_etag(request.url.path, user["id"], row["updated_at"].isoformat() if row else "default")
+    not_modified = _not_modified(request, response, etag)
+    if not_modified is not None:
+        return not_modified
     if not row:
         return UserPreferencesOut()
     return UserPreferencesOut.model_validate(
@@ -865,9 +1945,8 @@ def get_my_preferences(subject: str = Depends(_require_auth)):
 @app.put("/users/me/preferences", response_model=UserPreferencesOut)
 def upsert_my_preferences(
     payload: UserPreferencesIn,
-    subject: str = Depends(_require_auth),
+    user: dict = Depends(_current_user),
 ):
-    user = _get_user_by_subject(subject)
     palette_light_json = json.dumps(payload.palette_light or {})
     palette_dark_json = json.dumps(payload.palette_dark or {})
     row = execute_returning_one(
@@ -923,22 +2002,38 @@ def list_audit_logs(
     result: str = Query(default=""),
     limit: int = Query(default=50, ge=1, le=500),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, max_length=200),
+    exact_total: bool = Query(default=False),
 ):
     # keep `subject` explicit so this endpoint is always protected by admin auth
     _ = subject
-    where_sql, params = _build_audit_where(
-        date_from=date_from,
-        date_to=date_to,
-        actor_username=actor_username,
-        action=action,
-        resource_type=resource_type,
-        result=result,
-    )
-    total = _fetch_audit_total(where_sql, params)
-    rows = _fetch_audit_rows(where_sql, params, limit, offset)
+    filters = {
+        "date_from": date_from,
+        "date_to": date_to,
+        "actor_username": actor_username,
+        "action": action,
+        "resource_type": resource_type,
+        "result": result,
+    }
+    where_sql, params = _build_audit_where(**filters)
+    if exact_total:
+        total = _fetch_audit_total(where_sql, params)
+    else:
+        total = _estimate_audit_total(where_sql, params)
+
+    # A cursor replaces the offset: rows continue strictly after the last (created_at, id) seen.
+    if cursor:
+        page_where, page_params = _build_audit_where(**filters, before=_decode_audit_cursor(cursor))
+        offset = 0
+    else:
+        page_where, page_params = where_sql, params
+    rows = _fetch_audit_rows(page_where, page_params, limit + 1, offset)
+    next_cursor = _encode_audit_cursor(rows[limit - 1]) if len(rows) > limit else None
     return AuditLogSearchOut(
         total=total,
-        rows=[AuditLogRow.model_validate(row) for row in rows],
+        total_is_estimate=not exact_total,
+        next_cursor=next_cursor,
+        rows=[AuditLogRow.model_validate(row) for row in rows[:limit]],
     )
 
 
@@ -1023,6 +2118,44 @@ def export_audit_logs(
     )
 
 
+def _audit_partitions_before(retention_days: int) -> tuple[datetime | None, list[dict]]:
+    rows = fetch_all(
+        """
+        SELECT
+            c.relname AS partition_name,
+            (now() - (%s * interval '1 day'))::timestamp AS cutoff
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'audit_log'::regclass
+        ORDER BY c.relname
+        """,
+        (retention_days,),
+    )
+    if not rows:
+        return None, []
+    cutoff = rows[0]["cutoff"]
+    expired = []
+    for row in rows:
+        bounds = audit_partition_bounds(row["partition_name"])
+        # Only whole months past the cutoff go; the boundary month waits for the next purge.
+        if bounds is not None and datetime.combine(bounds[1], datetime.min.time()) <= cutoff:
+            expired.append(
+                {"partition": row["partition_name"], "range_start": bounds[0], "range_end": bounds[1]}
+            )
+    if not expired:
+        return cutoff, []
+    counts = fetch_all(
+        " UNION ALL ".join(
+            f"SELECT '{item['partition']}' AS partition_name, COUNT(*)::int AS row_count FROM {item['partition']}"
+            for item in expired
+        )
+    )
+    by_name = {row["partition_name"]: int(row["row_count"] or 0) for row in counts}
+    for item in expired:
+        item["rows"] = by_name.get(item["partition"], 0)
+    return cutoff, expired
+
+
 @app.post("/audit/logs/purge", response_model=AuditLogPurgeOut)
 def purge_audit_logs(
     subject: str = Depends(_require_admin),
@@ -1030,32 +2163,18 @@ def purge_audit_logs(
     dry_run: bool = Query(default=True),
 ):
     actor = _get_user_by_subject(subject)
-    preview = fetch_one(
-        """
-        SELECT COUNT(*)::int AS to_delete
-        FROM audit_log
-        WHERE created_at < now() - (%s * interval '1 day')
-        """,
-        (retention_days,),
-    ) or {"to_delete": 0}
-    to_delete = int(preview.get("to_delete") or 0)
+    cutoff, partitions = _audit_partitions_before(retention_days)
+    to_delete = sum(item["rows"] for item in partitions)
 
     deleted = 0
     action = "audit.purge.preview" if dry_run else "audit.purge"
     if not dry_run:
-        deleted_row = execute_returning_one(
-            """
-            WITH deleted AS (
-                DELETE FROM audit_log
-                WHERE created_at < now() - (%s * interval '1 day')
-                RETURNING id
+        for item in partitions:
+            execute(
+                f"ALTER TABLE audit_log DETACH PARTITION {item['partition']}; "
+                f"DROP TABLE {item['partition']}"
             )
-            SELECT COUNT(*)::int AS deleted_count
-            FROM deleted
-            """,
-            (retention_days,),
-        ) or {"deleted_count": 0}
-        deleted = int(deleted_row.get("deleted_count") or 0)
+            deleted += item["rows"]
 
     audit_log_event(
         action=action,
@@ -1068,13 +2187,16 @@ def purge_audit_logs(
             "dry_run": dry_run,
             "to_delete": to_delete,
             "deleted": deleted,
+            "partitions": [item["partition"] for item in partitions],
         },
     )
     return AuditLogPurgeOut(
         dry_run=dry_run,
         retention_days=retention_days,
+        cutoff=cutoff,
         to_delete=to_delete,
         deleted=deleted,
+        partitions=[AuditLogPartitionOut.model_validate(item) for item in partitions],
     )
 
 
@@ -1129,6 +2251,16 @@ def batch_create_users(
     existing = {str(row["username"]) for row in existing_rows}
     seen: set[str] = set()
 
+    # Hash every password that will actually be inserted in parallel on the hashing pool.
+    pending_passwords: dict[str, str] = {}
+    for item in payload.users:
+        username = item.username.strip()
+        if username not in existing and username not in pending_passwords:
+            pending_passwords[username] = item.password
+    password_hashes: dict[str, str] = {}
+    if not dry_run and pending_passwords:
+        password_hashes = dict(zip(pending_passwords, hash_passwords(list(pending_passwords.values()))))
+
     results: list[ApiUserBatchCreateResult] = []
     created = 0
     skipped = 0
@@ -1171,7 +2303,7 @@ def batch_create_users(
                     """,
                     (
                         username,
-                        hash_password(item.password),
+                        password_hashes[username],
                         item.role,
                         item.can_write,
                         item.can_update,
@@ -1237,6 +2369,14 @@ def update_user(user_id: int, payload: ApiUserUpdateIn, subject: str = Depends(_
     can_update = payload.can_update if payload.can_update is not None else existing["can_update"]
     active = payload.active if payload.active is not None else existing["active"]
 
+    revoke_tokens = (
+        role != existing["role"]
+        or can_write != existing["can_write"]
+        or can_update != existing["can_update"]
+        or (existing["active"] and not active)
+        or username != existing["username"]
+    )
+
     username_conflict = fetch_one(
         """
         SELECT id
@@ -1258,11 +2398,21 @@ def update_user(user_id: int, payload: ApiUserUpdateIn, subject: str = Depends(_
                 can_update = %s,
                 active = %s,
                 password_hash = %s,
+                token_version = token_version + %s,
                 updated_at = now()
             WHERE id = %s
             RETURNING id, username, role, can_write, can_update, active, created_at
             """,
-            (username, role, can_write, can_update, active, hash_password(payload.new_password), user_id),
+            (
+                username,
+                role,
+                can_write,
+                can_update,
+                active,
+                hash_password(payload.new_password),
+                int(revoke_tokens),
+                user_id,
+            ),
         )
     else:
         row = execute_returning_one(
@@ -1273,12 +2423,16 @@ def update_user(user_id: int, payload: ApiUserUpdateIn, subject: str = Depends(_
                 can_write = %s,
                 can_update = %s,
                 active = %s,
+                token_version = token_version + %s,
                 updated_at = now()
             WHERE id = %s
             RETURNING id, username, role, can_write, can_update, active, created_at
             """,
-            (username, role, can_write, can_update, active, user_id),
+            (username, role, can_write, can_update, active, int(revoke_tokens), user_id),
         )
+    _invalidate_user_cache(existing["username"], row["username"])
+    if not row["active"] or payload.new_password is not None:
+        _revoke_refresh_tokens(user_id)
     _audit_cud(
         subject=subject,
         action="users.update",
@@ -1301,12 +2455,14 @@ def reset_user_password(
         SET password_hash = %s,
             updated_at = now()
         WHERE id = %s
-        RETURNING id
+        RETURNING id, username
         """,
         (hash_password(payload.new_password), user_id),
     )
     if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    _invalidate_user_cache(row["username"])
+    _revoke_refresh_tokens(row["id"])
     _audit_cud(
         subject=subject,
         action="users.update_password",
@@ -1317,14 +2473,116 @@ def reset_user_password(
     return {"status": "ok", "id": row["id"]}
 
 
-@app.get("/students/list", response_model=list[StudentOut])
-def list_students(
-    _: str = Depends(_require_auth),
-    limit: int = Query(default=50, ge=1, le=200),
-    offset: int = Query(default=0, ge=0),
-    status_filter: str = Query(default="Active"),
-    name_query: str = Query(default=""),
-):
+_STUDENT_LIST_COLUMNS = """
+    s.id, s.name, s.sex, s.direction, s.postalcode, s.belt, s.email, s.phone, s.phone2,
+    s.weight, s.country, s.taxid, l.name AS location, s.birthday, s.active, s.is_minor,
+    s.newsletter_opt_in, s.created_at
+"""
+_STUDENT_COUNT_CACHE_LOCK = threading.Lock()
+_STUDENT_COUNT_CACHE: dict[tuple[str, str], tuple[float, int]] = {}
+_STUDENT_STATS_CACHE: dict[int, tuple[float, StudentStatsOut]] = {}
+# Until local midnight, or until a student write clears it with the counts.
+_BIRTHDAY_CACHE: dict[tuple[date, int | None], tuple[float, list[BirthdayNotificationRow]]] = {}
+
+
+def _cached_student_count(key: tuple[str, str]) -> int | None:
+    with _STUDENT_COUNT_CACHE_LOCK:
+        entry = _STUDENT_COUNT_CACHE.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            _STUDENT_COUNT_CACHE.pop(key, None)
+            return None
+        return entry[1]
+
+
+def _store_student_count(key: tuple[str, str], total: int) -> None:
+    if API_STUDENT_COUNT_CACHE_SECONDS <= 0:
+        return
+    with _STUDENT_COUNT_CACHE_LOCK:
+        _STUDENT_COUNT_CACHE[key] = (time.monotonic() + API_STUDENT_COUNT_CACHE_SECONDS, total)
+
+
+def _invalidate_student_counts() -> None:
+    with _STUDENT_COUNT_CACHE_LOCK:
+        _STUDENT_COUNT_CACHE.clear()
+        _STUDENT_STATS_CACHE.clear()
+        _BIRTHDAY_CACHE.clear()
+
+
+def _cached_birthdays(key: tuple[date, int | None]) -> list[BirthdayNotificationRow] | None:
+    with _STUDENT_COUNT_CACHE_LOCK:
+        entry = _BIRTHDAY_CACHE.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+    return None
+
+
+def _store_birthdays(key: tuple[date, int | None], rows: list[BirthdayNotificationRow], ttl: float) -> None:
+    with _STUDENT_COUNT_CACHE_LOCK:
+        # Keys carry the date, so yesterday's windows are dead weight once the day changes.
+        for stale in [item for item in _BIRTHDAY_CACHE if item[0] != key[0]]:
+            del _BIRTHDAY_CACHE[stale]
+        _BIRTHDAY_CACHE[key] = (time.monotonic() + ttl, rows)
+
+
+def _month_add(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _build_student_stats(rows, months: int) -> StudentStatsOut:
+    active = inactive = 0
+    by_location: list[StudentStatsBucket] = []
+    by_belt: list[StudentStatsBucket] = []
+    enrolled_by_month: dict[date, int] = {}
+    for row in rows:
+        total = int(row["total"] or 0)
+        if row["g_active"] == 0:
+            if row["active"]:
+                active += total
+            else:
+                inactive += total
+        elif row["g_location"] == 0:
+            by_location.append(
+                StudentStatsBucket(key=row["location"], total=total, active=int(row["active_total"] or 0))
+            )
+        elif row["g_belt"] == 0:
+            by_belt.append(StudentStatsBucket(key=row["belt"], total=total, active=int(row["active_total"] or 0)))
+        elif row["g_month"] == 0 and row["month"] is not None:
+            enrolled_by_month[row["month"]] = total
+
+    # Fill empty months so the series is continuous, then keep the last `months` points
+    # with the running total carried in from the months before the window.
+    series = []
+    if enrolled_by_month:
+        month = min(enrolled_by_month)
+        last = max(max(enrolled_by_month), date.today().replace(day=1))
+        cumulative = 0
+        while month <= last:
+            enrolled = enrolled_by_month.get(month, 0)
+            cumulative += enrolled
+            series.append(StudentEnrollmentPoint(month=month, enrolled=enrolled, cumulative=cumulative))
+            month = _month_add(month, 1)
+    by_location.sort(key=lambda item: (-item.total, item.key or ""))
+    by_belt.sort(key=lambda item: (-item.total, item.key or ""))
+    return StudentStatsOut(
+        total=active + inactive,
+        active=active,
+        inactive=inactive,
+        by_location=by_location,
+        by_belt=by_belt,
+        enrollments=series[-months:],
+    )
+
+
+def _build_students_where(
+    status_filter: str,
+    name_query: str,
+    *,
+    after_id: int | None = None,
+    before_id: int | None = None,
+) -> tuple[str, list[object]]:
     where_clauses = []
     params: list[object] = []
     if status_filter == "Active":
@@ -1333,79 +2591,322 @@ def list_students(
         where_clauses.append("s.active = false")
     term = name_query.strip()
     if term:
-        where_clauses.append("s.name ILIKE %s")
+        where_clauses.append(_STUDENT_NAME_MATCH_SQL)
         params.append(f"%{term}%")
+    if after_id is not None:
+        where_clauses.append("s.id > %s")
+        params.append(after_id)
+    if before_id is not None:
+        where_clauses.append("s.id < %s")
+        params.append(before_id)
     where = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
-    params.extend([limit, offset])
+    return where, params
 
-    rows = fetch_all(
-        f"""
-        SELECT s.id, s.name, s.sex, s.direction, s.postalcode, s.belt, s.email, s.phone, s.phone2,
-               s.weight, s.country, s.taxid, l.name AS location, s.birthday, s.active, s.is_minor,
-               s.newsletter_opt_in, s.created_at
+
+def _students_page_sql(where: str, backward: bool) -> str:
+    # Keyset paging walks the primary key; going back reads the previous rows in
+    # descending order and the caller flips them.
+    return f"""
+        SELECT {_STUDENT_LIST_COLUMNS}
         FROM t_students s
         LEFT JOIN t_locations l ON s.location_id = l.id
         {where}
-        ORDER BY s.id
+        ORDER BY s.id {"DESC" if backward else "ASC"}
         LIMIT %s OFFSET %s
-        """,
-        tuple(params),
+    """
+
+
+def _check_student_cursor(after_id: int | None, before_id: int | None) -> None:
+    if after_id is not None and before_id is not None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Use either after_id or before_id, not both",
+        )
+
+
+@app.get("/students/list", response_model=list[StudentOut])
+async def list_students(
+    _: str = Depends(_require_auth_async),
+    limit: int = Query(default=50, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
+    status_filter: str = Query(default="Active"),
+    name_query: str = Query(default=""),
+    after_id: int | None = Query(default=None, ge=0),
+    before_id: int | None = Query(default=None, ge=1),
+):
+    _check_student_cursor(after_id, before_id)
+    where, params = _build_students_where(
+        status_filter, name_query, after_id=after_id, before_id=before_id
     )
+    if after_id is not None or before_id is not None:
+        offset = 0
+    backward = before_id is not None
+    rows = await async_db.fetch_all(_students_page_sql(where, backward), tuple(params + [limit, offset]))
+    if backward:
+        rows = list(reversed(rows))
     return [StudentOut.model_validate(row) for row in rows]
 
 
 @app.get("/students/count", response_model=CountResponse)
-def students_count(
-    _: str = Depends(_require_auth),
+async def students_count(
+    _: str = Depends(_require_auth_async),
     status_filter: str = Query(default="Active"),
     name_query: str = Query(default=""),
 ):
-    where_clauses = []
-    params: list[object] = []
-    if status_filter == "Active":
-        where_clauses.append("s.active = true")
-    elif status_filter == "Inactive":
-        where_clauses.append("s.active = false")
-    term = name_query.strip()
-    if term:
-        where_clauses.append("s.name ILIKE %s")
-        params.append(f"%{term}%")
-    where = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
-    row = fetch_all(
+    where, params = _build_students_where(status_filter, name_query)
+    row = await async_db.fetch_one(
         f"""
         SELECT COUNT(s.id) AS total
         FROM t_students s
         {where}
         """,
         tuple(params),
-    )[0]
+    )
     return CountResponse(total=int(row["total"]))
 
 
-@app.get("/locations/active", response_model=list[LocationOut])
-def active_locations(_: str = Depends(_require_auth)):
-    rows = fetch_all(
-        """
-        SELECT id, name
-        FROM t_locations
-        WHERE active = true
-        ORDER BY name
-        """
+@app.get("/students/page", response_model=StudentPageOut)
+async def students_page(
+    _: str = Depends(_require_auth_async),
+    limit: int = Query(default=50, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
+    status_filter: str = Query(default="Active"),
+    name_query: str = Query(default=""),
+    after_id: int | None = Query(default=None, ge=0),
+    before_id: int | None = Query(default=None, ge=1),
+):
+    # One round trip for the students tab: the page plus its total. The total is cached
+    # per filter so flipping pages only re-reads the page itself.
+    _check_student_cursor(after_id, before_id)
+    if after_id is not None or before_id is not None:
+        offset = 0
+    backward = before_id is not None
+    count_where, count_params = _build_students_where(status_filter, name_query)
+    where, params = _build_students_where(
+        status_filter, name_query, after_id=after_id, before_id=before_id
+    )
+    page_sql = _students_page_sql(where, backward)
+    count_key = (status_filter, name_query.strip().lower())
+    total = _cached_student_count(count_key)
+    if total is None:
+        rows = await async_db.fetch_all(
+            f"""
+            WITH total AS (
+                SELECT COUNT(s.id)::int AS total_count
+                FROM t_students s
+                {count_where}
+            ),
+            page AS ({page_sql})
+            SELECT total.total_count, page.*
+            FROM total
+            LEFT JOIN page ON true
+            ORDER BY page.id
+            """,
+            tuple(count_params + params + [limit + 1, offset]),
+        )
+        total = int(rows[0]["total_count"]) if rows else 0
+        _store_student_count(count_key, total)
+        rows = [row for row in rows if row.get("id") is not None]
+    else:
+        rows = await async_db.fetch_all(page_sql, tuple(params + [limit + 1, offset]))
+        if backward:
+            rows = list(reversed(rows))
+
+    # One extra row was read in the paging direction to learn whether more exist.
+    has_more = len(rows) > limit
+    if backward:
+        rows = rows[-limit:]
+        has_before, has_after = has_more, bool(rows)
+    else:
+        rows = rows[:limit]
+        has_before, has_after = bool(rows) and (after_id is not None or offset > 0), has_more
+    return StudentPageOut(
+        total=total,
+        rows=[StudentOut.model_validate(row) for row in rows],
+        next_cursor=int(rows[-1]["id"]) if has_after else None,
+        prev_cursor=int(rows[0]["id"]) if has_before else None,
     )
-    return [LocationOut.model_validate(row) for row in rows]
 
 
-@app.get("/locations/list", response_model=list[LocationOut])
-def list_locations(_: str = Depends(_require_auth)):
-    rows = fetch_all(
+@app.get("/students/stats", response_model=StudentStatsOut)
+async def students_stats(
+    _: str = Depends(_require_auth_async),
+    months: int = Query(default=24, ge=1, le=240),
+):
+    with _STUDENT_COUNT_CACHE_LOCK:
+        entry = _STUDENT_STATS_CACHE.get(months)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+
+    # A single pass over t_students feeds every breakdown through GROUPING SETS.
+    rows = await async_db.fetch_all(
         """
-        SELECT id, name, phone, address, active
-        FROM t_locations
-        ORDER BY name
+        SELECT
+            s.active,
+            l.name AS location,
+            s.belt,
+            date_trunc('month', s.created_at)::date AS month,
+            COUNT(*)::int AS total,
+            (COUNT(*) FILTER (WHERE s.active))::int AS active_total,
+            GROUPING(s.active) AS g_active,
+            GROUPING(l.name) AS g_location,
+            GROUPING(s.belt) AS g_belt,
+            GROUPING(date_trunc('month', s.created_at)::date) AS g_month
+        FROM t_students s
+        LEFT JOIN t_locations l ON s.location_id = l.id
+        GROUP BY GROUPING SETS (
+            (s.active),
+            (l.name),
+            (s.belt),
+            (date_trunc('month', s.created_at)::date)
+        )
         """
     )
-    return [LocationOut.model_validate(row) for row in rows]
-
+    stats = _build_student_stats(rows, months)
+    if API_STUDENT_COUNT_CACHE_SECONDS > 0:
+        with _STUDENT_COUNT_CACHE_LOCK:
+            _STUDENT_STATS_CACHE[months] = (time.monotonic() + API_STUDENT_COUNT_CACHE_SECONDS, stats)
+    return stats
+
+
+# Resource name -> (change_seq column, row query). Joined names are a convenience for a first sync;
+# clients keep their own copies of the referenced tables and should resolve names from those.
+_SYNC_QUERIES: dict[str, tuple[str, str]] = {
+    "students": (
+        "s.change_seq",
+        """
+        SELECT s.id, s.name, s.sex, s.direction, s.postalcode, s.belt, s.email, s.phone, s.phone2,
+               s.weight, s.country, s.taxid, s.location_id, l.name AS location, s.birthday, s.active,
+               s.is_minor, s.newsletter_opt_in, s.created_at
+        FROM t_students s
+        LEFT JOIN t_locations l ON s.location_id = l.id
+        """,
+    ),
+    "teachers": (
+        "change_seq",
+        "SELECT id, name, sex, email, phone, belt, hire_date, active FROM public.t_coaches",
+    ),
+    "locations": ("change_seq", "SELECT id, name, phone, address, active FROM t_locations"),
+    "classes": (
+        "c.change_seq",
+        """
+        SELECT c.id, c.name, c.belt_level, c.coach_id, c.duration_min, c.active, t.name AS coach_name
+        FROM t_classes c
+        LEFT JOIN public.t_coaches t ON c.coach_id = t.id
+        """,
+    ),
+    "sessions": (
+        "cs.change_seq",
+        """
+        SELECT cs.id, cs.class_id, c.name AS class_name, cs.session_date, cs.start_time::text,
+               cs.end_time::text, cs.location_id, l.name AS location_name, cs.cancelled
+        FROM t_class_sessions cs
+        JOIN t_classes c ON cs.class_id = c.id
+        LEFT JOIN t_locations l ON cs.location_id = l.id
+        """,
+    ),
+}
+_SYNC_RESOURCE_BY_TABLE = dict(zip(_SYNC_TABLES, ("students", "teachers", "locations", "classes", "sessions")))
+_SYNC_HORIZON_SQL = """
+    SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint AS horizon,
+           (SELECT tombstone_floor FROM t_sync_state) AS floor
+"""
+
+
+def _purge_sync_tombstones() -> None:
+    # Daily, from the audit writer thread: drop tombstones past the retention window and raise the
+    # floor in the same statement, so a reader sees both changes or neither.
+    execute(
+        """
+        WITH purged AS (
+            DELETE FROM t_sync_tombstones
+            WHERE deleted_at < now() - make_interval(days => %s)
+            RETURNING change_seq
+        )
+        INSERT INTO t_sync_state AS st (id, tombstone_floor)
+        SELECT true, MAX(change_seq) FROM purged HAVING COUNT(*) > 0
+        ON CONFLICT (id) DO UPDATE SET tombstone_floor = GREATEST(st.tombstone_floor, EXCLUDED.tombstone_floor)
+        """,
+        (API_SYNC_TOMBSTONE_DAYS,),
+    )
+
+
+register_daily_task("sync_tombstones", _purge_sync_tombstones)
+
+
+@app.get("/sync/changes", response_model=SyncChangesOut)
+async def sync_changes(
+    since: int = Query(default=0, ge=0),
+    _: str = Depends(_require_auth_async),
+):
+    """Rows written at or after `since` (0 = everything) plus hard-delete tombstones.
+
+    The returned cursor is the oldest transaction id still running when the feed was read: every
+    write stamped below it is committed and included, anything at or above it shows up on the next
+    call. A row can therefore arrive twice, never zero times; applying it is an upsert.
+    Tombstones are kept API_SYNC_TOMBSTONE_DAYS; a cursor older than the purged ones gets a full snapshot.
+    """
+    full = since == 0
+    statements: list[tuple[str, tuple]] = [(_SYNC_HORIZON_SQL, ())]
+    for seq_column, query in _SYNC_QUERIES.values():
+        if full:
+            statements.append((query, ()))
+        else:
+            statements.append((f"{query} WHERE {seq_column} >= %s", (since,)))
+    if not full:
+        statements.append(("SELECT table_name, row_id FROM t_sync_tombstones WHERE change_seq >= %s", (since,)))
+    results = await async_db.fetch_all_many(statements)
+    floor = results[0][0].get("floor")
+    if not full and floor is not None and since <= int(floor):
+        # Deletes this client has not seen may already be purged; only a fresh snapshot is safe.
+        return await sync_changes(since=0, _=_)
+
+    out = SyncChangesOut(cursor=int(results[0][0]["horizon"]), full=full)
+    out.students = [StudentOut.model_validate(row) for row in results[1]]
+    out.teachers = [TeacherOut.model_validate(row) for row in results[2]]
+    out.locations = [LocationOut.model_validate(row) for row in results[3]]
+    out.classes = [ClassOut.model_validate(row) for row in results[4]]
+    out.sessions = [SessionOut.model_validate(row) for row in results[5]]
+    if not full:
+        for row in results[6]:
+            resource = _SYNC_RESOURCE_BY_TABLE.get(row["table_name"])
+            if resource:
+                out.deleted.setdefault(resource, []).append(int(row["row_id"]))
+    return out
+
+
+@app.get("/locations/active", response_model=list[LocationOut])
+def active_locations(request: Request, response: Response, _: str = Depends(_require_auth)):
+    etag = _weak_etag(request.url.path, request.url.query, _table_versions("t_locations"))
+    not_modified = _not_modified(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+    rows = fetch_all(
+        """
+        SELECT id, name
+        FROM t_locations
+        WHERE active = true
+        ORDER BY name
+        """
+    )
+    return [LocationOut.model_validate(row) for row in rows]
+
+
+@app.get("/locations/list", response_model=list[LocationOut])
+def list_locations(request: Request, response: Response, _: str = Depends(_require_auth)):
+    etag = _weak_etag(request.url.path, request.url.query, _table_versions("t_locations"))
+    not_modified = _not_modified(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+    rows = fetch_all(
+        """
+        SELECT id, name, phone, address, active
+        FROM t_locations
+        ORDER BY name
+        """
+    )
+    return [LocationOut.model_validate(row) for row in rows]
+
 
 @app.post("/locations/create", response_model=LocationCreateResponse, status_code=201)
 def create_location(payload: LocationIn, subject: str = Depends(_require_write_access)):
@@ -1508,7 +3009,11 @@ def reactivate_location(location_id: int, subject: str = Depends(_require_update
 
 
 @app.get("/teachers/list", response_model=list[TeacherOut])
-def list_teachers(_: str = Depends(_require_auth)):
+def list_teachers(request: Request, response: Response, _: str = Depends(_require_auth)):
+    etag = _weak_etag(request.url.path, request.url.query, _table_versions("t_coaches"))
+    not_modified = _not_modified(request, response, etag)
+    if not_modified is not None:
+        return not_modified
     rows = fetch_all(
         """
         SELECT id, name, sex, email, phone, belt, hire_date, active
@@ -1520,7 +3025,11 @@ def list_teachers(_: str = Depends(_require_auth)):
 
 
 @app.get("/teachers/active", response_model=list[IdNameOut])
-def active_teachers(_: str = Depends(_require_auth)):
+def active_teachers(request: Request, response: Response, _: str = Depends(_require_auth)):
+    etag = _weak_etag(request.url.path, request.url.query, _table_versions("t_coaches"))
+    not_modified = _not_modified(request, response, etag)
+    if not_modified is not None:
+        return not_modified
     rows = fetch_all(
         """
         SELECT id, name
@@ -1641,7 +3150,11 @@ def reactivate_teacher(teacher_id: int, subject: str = Depends(_require_update_a
 
 
 @app.get("/classes/list", response_model=list[ClassOut])
-def list_classes(_: str = Depends(_require_auth)):
+def list_classes(request: Request, response: Response, _: str = Depends(_require_auth)):
+    etag = _weak_etag(request.url.path, request.url.query, _table_versions("t_classes", "t_coaches"))
+    not_modified = _not_modified(request, response, etag)
+    if not_modified is not None:
+        return not_modified
     rows = fetch_all(
         """
         SELECT c.id, c.name, c.belt_level, c.coach_id, c.duration_min, c.active, t.name AS coach_name
@@ -1654,7 +3167,11 @@ def list_classes(_: str = Depends(_require_auth)):
 
 
 @app.get("/classes/active", response_model=list[IdNameOut])
-def active_classes(_: str = Depends(_require_auth)):
+def active_classes(request: Request, response: Response, _: str = Depends(_require_auth)):
+    etag = _weak_etag(request.url.path, request.url.query, _table_versions("t_classes"))
+    not_modified = _not_modified(request, response, etag)
+    if not_modified is not None:
+        return not_modified
     rows = fetch_all(
         """
         SELECT id, name
@@ -1718,16 +3235,52 @@ def reactivate_class(class_id: int, _: str = Depends(_require_update_access)):
 
 
 @app.get("/sessions/list", response_model=list[SessionOut])
-def list_sessions(_: str = Depends(_require_auth)):
-    rows = fetch_all(
-        """
+async def list_sessions(
+    request: Request,
+    response: Response,
+    _: str = Depends(_require_auth_async),
+    date_from: date | None = Query(default=None),
+    date_to: date | None = Query(default=None),
+    location_id: int | None = Query(default=None, ge=1),
+    class_id: int | None = Query(default=None, ge=1),
+):
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="date_from is after date_to")
+    etag = _weak_etag(
+        request.url.path,
+        request.url.query,
+        await _table_versions_async("t_class_sessions", "t_classes", "t_locations"),
+    )
+    not_modified = _not_modified(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+    # A date range is served by idx_class_sessions_date_start instead of reading every session ever held.
+    where_clauses = []
+    params: list[object] = []
+    if date_from:
+        where_clauses.append("cs.session_date >= %s")
+        params.append(date_from)
+    if date_to:
+        where_clauses.append("cs.session_date <= %s")
+        params.append(date_to)
+    if location_id is not None:
+        where_clauses.append("cs.location_id = %s")
+        params.append(location_id)
+    if class_id is not None:
+        where_clauses.append("cs.class_id = %s")
+        params.append(class_id)
+    where = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+    rows = await async_db.fetch_all(
+        f"""
         SELECT cs.id, cs.class_id, c.name AS class_name, cs.session_date, cs.start_time::text, cs.end_time::text,
                cs.location_id, l.name AS location_name, cs.cancelled
         FROM t_class_sessions cs
         JOIN t_classes c ON cs.class_id = c.id
         LEFT JOIN t_locations l ON cs.location_id = l.id
+        {where}
         ORDER BY cs.session_date DESC, cs.start_time DESC
-        """
+        """,
+        tuple(params),
     )
     return [SessionOut.model_validate(row) for row in rows]
 
@@ -1758,6 +3311,231 @@ def create_session(payload: SessionIn, subject: str = Depends(_require_write_acc
     return IdNameOut.model_validate(row)
 
 
+_SCHEDULE_MAX_DAYS = 366
+# One row per (template, matching date) in the requested range. already_exists is probed through
+# idx_class_sessions_date_start, so re-running a generate only adds what is missing.
+_SCHEDULE_SLOTS_SQL = """
+    SELECT t.id AS template_id, t.class_id, c.name AS class_name, d::date AS session_date,
+           t.start_time, t.end_time, t.location_id, l.name AS location_name,
+           EXISTS (
+               SELECT 1
+               FROM t_class_sessions cs
+               WHERE cs.session_date = d::date
+                 AND cs.start_time = t.start_time
+                 AND cs.class_id = t.class_id
+                 AND cs.location_id = t.location_id
+           ) AS already_exists,
+           COUNT(*) OVER (PARTITION BY t.class_id, d, t.start_time, t.location_id) AS copies
+    FROM t_schedule_templates t
+    JOIN t_classes c ON c.id = t.class_id
+    LEFT JOIN t_locations l ON l.id = t.location_id
+    CROSS JOIN LATERAL generate_series(
+        GREATEST(t.valid_from, %s::date), LEAST(t.valid_to, %s::date), interval '1 day'
+    ) AS d
+    WHERE t.active = true
+      AND EXTRACT(ISODOW FROM d) = t.weekday
+"""
+
+
+def _check_schedule_template(payload: ScheduleTemplateIn) -> None:
+    if payload.end_time <= payload.start_time:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="end_time must be after start_time")
+    if payload.valid_to < payload.valid_from:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="valid_to is before valid_from")
+
+
+@app.get("/schedule-templates/list", response_model=list[ScheduleTemplateOut])
+def list_schedule_templates(_: str = Depends(_require_auth)):
+    rows = fetch_all(
+        """
+        SELECT t.id, t.class_id, c.name AS class_name, t.weekday, t.start_time::text, t.end_time::text,
+               t.location_id, l.name AS location_name, t.valid_from, t.valid_to, t.active
+        FROM t_schedule_templates t
+        JOIN t_classes c ON c.id = t.class_id
+        LEFT JOIN t_locations l ON l.id = t.location_id
+        ORDER BY t.active DESC, t.weekday, t.start_time, c.name
+        """
+    )
+    return [ScheduleTemplateOut.model_validate(row) for row in rows]
+
+
+@app.post("/schedule-templates/create", response_model=IdNameOut, status_code=201)
+def create_schedule_template(payload: ScheduleTemplateIn, subject: str = Depends(_require_write_access)):
+    _check_schedule_template(payload)
+    row = execute_returning_one(
+        """
+        INSERT INTO t_schedule_templates (class_id, weekday, start_time, end_time, location_id, valid_from, valid_to)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        RETURNING id, id::text AS name
+        """,
+        (
+            payload.class_id,
+            payload.weekday,
+            payload.start_time,
+            payload.end_time,
+            payload.location_id,
+            payload.valid_from,
+            payload.valid_to,
+        ),
+    )
+    _audit_cud(
+        subject=subject,
+        action="schedule_templates.create",
+        resource_type="schedule_template",
+        resource_id=row["id"],
+        details={"class_id": payload.class_id, "location_id": payload.location_id, "weekday": payload.weekday},
+    )
+    return IdNameOut.model_validate(row)
+
+
+@app.put("/schedule-templates/{template_id}", response_model=IdNameOut)
+def update_schedule_template(
+    template_id: int,
+    payload: ScheduleTemplateIn,
+    subject: str = Depends(_require_update_access),
+):
+    _check_schedule_template(payload)
+    row = execute_returning_one(
+        """
+        UPDATE t_schedule_templates
+        SET class_id=%s, weekday=%s, start_time=%s, end_time=%s, location_id=%s, valid_from=%s, valid_to=%s,
+            updated_at=now()
+        WHERE id=%s
+        RETURNING id, id::text AS name
+        """,
+        (
+            payload.class_id,
+            payload.weekday,
+            payload.start_time,
+            payload.end_time,
+            payload.location_id,
+            payload.valid_from,
+            payload.valid_to,
+            template_id,
+        ),
+    )
+    if not row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Schedule template not found")
+    _audit_cud(
+        subject=subject,
+        action="schedule_templates.update",
+        resource_type="schedule_template",
+        resource_id=template_id,
+    )
+    return IdNameOut.model_validate(row)
+
+
+@app.post("/schedule-templates/{template_id}/deactivate")
+def deactivate_schedule_template(template_id: int, subject: str = Depends(_require_update_access)):
+    row = execute_returning_one(
+        "UPDATE t_schedule_templates SET active=false, updated_at=now() WHERE id=%s RETURNING id",
+        (template_id,),
+    )
+    if not row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Schedule template not found")
+    _audit_cud(
+        subject=subject,
+        action="schedule_templates.deactivate",
+        resource_type="schedule_template",
+        resource_id=row["id"],
+        details={"active": False},
+    )
+    return {"status": "ok", "id": row["id"], "active": False}
+
+
+@app.post("/schedule-templates/generate", response_model=ScheduleGenerateOut)
+def generate_sessions_from_templates(
+    payload: ScheduleGenerateIn,
+    subject: str = Depends(_require_write_access),
+):
+    """Preview (dry_run) or materialize every templated session in a date range with one INSERT ... SELECT."""
+    if payload.date_to < payload.date_from:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="date_to is before date_from")
+    if (payload.date_to - payload.date_from).days >= _SCHEDULE_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Generate at most {_SCHEDULE_MAX_DAYS} days at a time",
+        )
+    slots_sql = _SCHEDULE_SLOTS_SQL
+    params: list[object] = [payload.date_from, payload.date_to]
+    if payload.template_ids:
+        slots_sql += " AND t.id = ANY(%s)"
+        params.append(list(payload.template_ids))
+    # Overlapping templates can yield the same session; keep one (lowest template id) and count the rest.
+    slots_sql = f"""
+        SELECT DISTINCT ON (class_id, session_date, start_time, location_id) *
+        FROM ({slots_sql}) AS raw
+        ORDER BY class_id, session_date, start_time, location_id, template_id
+    """
+
+    if payload.dry_run:
+        rows = fetch_all(
+            f"""
+            SELECT template_id, class_id, class_name, session_date, start_time::text, end_time::text,
+                   location_id, location_name, already_exists, copies
+            FROM ({slots_sql}) AS slots
+            ORDER BY session_date, start_time, class_name
+            """,
+            tuple(params),
+        )
+        slots = [ScheduleSlotOut.model_validate(row) for row in rows]
+        existing = sum(1 for slot in slots if slot.already_exists)
+        return ScheduleGenerateOut(
+            dry_run=True,
+            total_slots=len(slots),
+            created=0,
+            skipped_existing=existing,
+            duplicate_slots=sum(int(row.get("copies") or 1) - 1 for row in rows),
+            slots=slots,
+        )
+
+    with transaction() as cur:
+        # Two overlapping generates would both see a slot as missing; take turns instead.
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext('schedule_templates.generate'))")
+        cur.execute(
+            f"""
+            WITH slots AS ({slots_sql}),
+            inserted AS (
+                INSERT INTO t_class_sessions (class_id, session_date, start_time, end_time, location_id)
+                SELECT class_id, session_date, start_time, end_time, location_id
+                FROM slots
+                WHERE NOT already_exists
+                RETURNING id
+            )
+            SELECT (SELECT COUNT(*) FROM slots)::int AS total_slots,
+                   (SELECT COUNT(*) FILTER (WHERE already_exists) FROM slots)::int AS skipped_existing,
+                   (SELECT COALESCE(SUM(copies - 1), 0) FROM slots)::int AS duplicate_slots,
+                   (SELECT COUNT(*) FROM inserted)::int AS created
+            """,
+            tuple(params),
+        )
+        counts = cur.fetchone()
+    total_slots = int(counts["total_slots"])
+    created = int(counts["created"])
+    skipped_existing = int(counts["skipped_existing"])
+    duplicate_slots = int(counts["duplicate_slots"])
+    _audit_cud(
+        subject=subject,
+        action="sessions.generate",
+        resource_type="session",
+        details={
+            "date_from": payload.date_from.isoformat(),
+            "date_to": payload.date_to.isoformat(),
+            "template_ids": payload.template_ids,
+            "created": created,
+            "skipped_existing": skipped_existing,
+            "duplicate_slots": duplicate_slots,
+        },
+    )
+    return ScheduleGenerateOut(
+        dry_run=False,
+        total_slots=total_slots,
+        created=created,
+        skipped_existing=skipped_existing,
+        duplicate_slots=duplicate_slots,
+    )
+
+
 @app.put("/sessions/{session_id}", response_model=IdNameOut)
 def update_session(
     session_id: int,
@@ -1846,35 +3624,154 @@ def register_attendance(payload: AttendanceRegisterIn, _: str = Depends(_require
     return {"status": "ok"}
 
 
-@app.get("/attendance/by-session/{session_id}", response_model=list[AttendanceRow])
-def attendance_by_session(session_id: int, _: str = Depends(_require_auth)):
-    rows = fetch_all(
-        """
-        SELECT st.name AS c1, a.status AS c2, a.checkin_time::text AS c3
-        FROM t_attendance a
-        JOIN t_students st ON a.student_id = st.id
-        WHERE a.session_id = %s
-        ORDER BY st.name
-        """,
-        (session_id,),
+@app.post("/attendance/register-bulk", response_model=AttendanceBulkOut)
+def register_attendance_bulk(payload: AttendanceBulkIn, subject: str = Depends(_require_write_access)):
+    # A whole roster in one statement: unknown students are filtered by the join and rows that
+    # already exist are left alone, so the caller learns each student's outcome from one round trip.
+    student_ids: list[int] = []
+    statuses: list[str] = []
+    seen: set[int] = set()
+    for entry in payload.entries:
+        if entry.student_id in seen:
+            continue
+        seen.add(entry.student_id)
+        student_ids.append(entry.student_id)
+        statuses.append(entry.status.strip())
+
+    with transaction() as cur:
+        cur.execute("SELECT id FROM t_class_sessions WHERE id = %s", (payload.session_id,))
+        if cur.fetchone() is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+        cur.execute(
+            """
+            WITH input AS (
+                SELECT i.student_id, i.status, i.ord
+                FROM unnest(%s::int[], %s::text[]) WITH ORDINALITY AS i(student_id, status, ord)
+            ),
+            known AS (
+                SELECT input.* FROM input JOIN t_students st ON st.id = input.student_id
+            ),
+            inserted AS (
+                INSERT INTO t_attendance (session_id, student_id, status, checkin_source)
+                SELECT %s, known.student_id, known.status, %s
+                FROM known
+                ON CONFLICT DO NOTHING
+                RETURNING student_id
+            )
+            SELECT
+                input.student_id,
+                EXISTS (SELECT 1 FROM known WHERE known.student_id = input.student_id) AS known,
+                EXISTS (SELECT 1 FROM inserted WHERE inserted.student_id = input.student_id) AS inserted
+            FROM input
+            ORDER BY input.ord
+            """,
+            (student_ids, statuses, payload.session_id, payload.source.strip()),
+        )
+        rows = cur.fetchall()
+
+    outcome = {}
+    for row in rows:
+        if not row["known"]:
+            outcome[int(row["student_id"])] = "unknown_student"
+        elif row["inserted"]:
+            outcome[int(row["student_id"])] = "registered"
+        else:
+            outcome[int(row["student_id"])] = "already_registered"
+    results = []
+    reported: set[int] = set()
+    for entry in payload.entries:
+        if entry.student_id in reported:
+            results.append(AttendanceBulkResult(student_id=entry.student_id, result="duplicate"))
+            continue
+        reported.add(entry.student_id)
+        results.append(AttendanceBulkResult(student_id=entry.student_id, result=outcome[entry.student_id]))
+
+    registered = sum(1 for item in results if item.result == "registered")
+    already = sum(1 for item in results if item.result == "already_registered")
+    errors = len(results) - registered - already
+    _audit_cud(
+        subject=subject,
+        action="attendance.register_bulk",
+        resource_type="session",
+        resource_id=payload.session_id,
+        details={"total": len(results), "registered": registered, "already_registered": already, "errors": errors},
+    )
+    return AttendanceBulkOut(
+        session_id=payload.session_id,
+        total=len(results),
+        registered=registered,
+        already_registered=already,
+        errors=errors,
+        results=results,
     )
-    return [AttendanceRow(c1=str(r["c1"]), c2=str(r["c2"]), c3=str(r["c3"])) for r in rows]
 
 
-@app.get("/attendance/by-student/{student_id}", response_model=list[AttendanceRow])
-def attendance_by_student(student_id: int, _: str = Depends(_require_auth)):
-    rows = fetch_all(
-        """
-        SELECT c.name AS c1, cs.session_date::text AS c2, a.status AS c3
-        FROM t_attendance a
-        JOIN t_class_sessions cs ON a.session_id = cs.id
-        JOIN t_classes c ON cs.class_id = c.id
-        WHERE a.student_id = %s
-        ORDER BY cs.session_date DESC
-        """,
-        (student_id,),
+@app.get("/attendance/by-session/{session_id}", response_model=AttendancePageOut)
+async def attendance_by_session(
+    session_id: int,
+    limit: int = Query(default=100, ge=1, le=500),
+    cursor: str | None = Query(default=None, max_length=400),
+    _: str = Depends(_require_auth_async),
+):
+    # Keyset on (name, student_id): the cursor continues after the last row of the previous page.
+    if cursor:
+        name, after_id = _decode_attendance_cursor(cursor)
+        query = _SESSION_ATTENDANCE_SQL.format(after=" AND (st.name, a.student_id) > (%s, %s)")
+        params: tuple = (session_id, name, after_id, limit + 1)
+    else:
+        query = _SESSION_ATTENDANCE_SQL.format(after="")
+        params = (session_id, limit + 1)
+    rows = await async_db.fetch_all(query, params)
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = _encode_attendance_cursor(rows[limit - 1]["c1"], rows[limit - 1]["student_id"])
+    return AttendancePageOut(
+        rows=[AttendanceRow(c1=str(r["c1"]), c2=str(r["c2"]), c3=str(r["c3"])) for r in rows[:limit]],
+        next_cursor=next_cursor,
+    )
+
+
+@app.get("/attendance/by-student/{student_id}", response_model=AttendancePageOut)
+async def attendance_by_student(
+    student_id: int,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = Query(default=None, max_length=400),
+    _: str = Depends(_require_auth_async),
+):
+    # The first page also carries the 30/90/365-day totals, read on the same connection;
+    # later pages only continue the history after (session_date, session_id).
+    if cursor:
+        key, after_id = _decode_attendance_cursor(cursor)
+        try:
+            after_date = date.fromisoformat(key)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid cursor") from exc
+        statements = [
+            (
+                _STUDENT_ATTENDANCE_SQL.format(after=" AND (cs.session_date, a.session_id) < (%s, %s)"),
+                (student_id, after_date, after_id, limit + 1),
+            )
+        ]
+    else:
+        statements = [
+            (_STUDENT_ATTENDANCE_SQL.format(after=""), (student_id, limit + 1)),
+            (
+                _STUDENT_ATTENDANCE_TOTALS_SQL,
+                _attendance_totals_params(student_id, datetime.now(timezone.utc).date()),
+            ),
+        ]
+    results = await async_db.fetch_all_many(statements)
+    rows = results[0]
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = _encode_attendance_cursor(last["session_date"].isoformat(), last["session_id"])
+    totals = AttendanceTotalsOut.model_validate(results[1][0]) if len(results) > 1 else None
+    return AttendancePageOut(
+        rows=[AttendanceRow(c1=str(r["c1"]), c2=str(r["c2"]), c3=str(r["c3"])) for r in rows[:limit]],
+        next_cursor=next_cursor,
+        totals=totals,
     )
-    return [AttendanceRow(c1=str(r["c1"]), c2=str(r["c2"]), c3=str(r["c3"])) for r in rows]
 
 
 @app.post("/students/create", response_model=StudentCreateResponse, status_code=201)
@@ -1917,6 +3814,7 @@ def create_student(
             payload.guardian_relationship,
         ),
     )
+    _invalidate_student_counts()
     _audit_cud(
         subject=subject,
         action="students.create",
@@ -1927,89 +3825,141 @@ def create_student(
     return StudentCreateResponse.model_validate(row)
 
 
+_STUDENT_INSERT_COLUMNS = """
+    name, sex, direction, postalcode, belt, email, phone, phone2, weight,
+    country, taxid, birthday, location_id, newsletter_opt_in, is_minor,
+    guardian_name, guardian_email, guardian_phone, guardian_phone2, guardian_relationship
+"""
+_STUDENT_BATCH_CHUNK_SIZE = 500
+
+
+def _student_insert_params(item: StudentCreateRequest, sex: str) -> tuple:
+    return (
+        item.name.strip(),
+        sex,
+        item.direction,
+        item.postalcode,
+        item.belt,
+        item.email.strip(),
+        item.phone,
+        item.phone2,
+        item.weight,
+        item.country,
+        item.taxid,
+        item.birthday,
+        item.location_id,
+        item.newsletter_opt_in,
+        item.is_minor,
+        item.guardian_name,
+        item.guardian_email,
+        item.guardian_phone,
+        item.guardian_phone2,
+        item.guardian_relationship,
+    )
+
+
+def _insert_students_bulk(rows: list[tuple]) -> list[tuple[int | None, str | None]]:
+    """Insert rows in one transaction and return (id, error) per row, in input order."""
+    outcomes: list[tuple[int | None, str | None]] = []
+    with transaction() as cur:
+        for start in range(0, len(rows), _STUDENT_BATCH_CHUNK_SIZE):
+            chunk = rows[start:start + _STUDENT_BATCH_CHUNK_SIZE]
+            cur.execute("SAVEPOINT student_chunk")
+            try:
+                returned = execute_values(
+                    cur,
+                    f"INSERT INTO t_students ({_STUDENT_INSERT_COLUMNS}) VALUES %s RETURNING id",
+                    chunk,
+                    page_size=len(chunk),
+                    fetch=True,
+                )
+                cur.execute("RELEASE SAVEPOINT student_chunk")
+                # ids come from one sequence within a single statement, so ascending order is input order.
+                outcomes.extend((int(row["id"]), None) for row in sorted(returned, key=lambda row: row["id"]))
+                continue
+            except Exception:
+                cur.execute("ROLLBACK TO SAVEPOINT student_chunk")
+            # Something in this chunk violates a constraint; retry row by row to pin it down.
+            for params in chunk:
+                cur.execute("SAVEPOINT student_row")
+                try:
+                    cur.execute(
+                        f"INSERT INTO t_students ({_STUDENT_INSERT_COLUMNS}) "
+                        f"VALUES ({', '.join(['%s'] * len(params))}) RETURNING id",
+                        params,
+                    )
+                    outcomes.append((int(cur.fetchone()["id"]), None))
+                    cur.execute("RELEASE SAVEPOINT student_row")
+                except Exception:
+                    cur.execute("ROLLBACK TO SAVEPOINT student_row")
+                    outcomes.append((None, "Insert failed"))
+    return outcomes
+
+
 @app.post("/students/batch-create", response_model=StudentBatchCreateOut)
 def batch_create_students(
     payload: StudentBatchCreateIn,
     subject: str = Depends(_require_write_access),
     dry_run: bool = Query(default=False),
 ):
-    created = 0
-    errors = 0
-    results: list[StudentBatchCreateResult] = []
+    results: list[StudentBatchCreateResult | None] = [None] * len(payload.students)
+    pending: list[tuple[int, tuple]] = []
 
-    for item in payload.students:
-        name = item.name.strip()
-        email = item.email.strip()
+    # Validate everything up front so the insert itself only sees rows expected to succeed.
+    for index, item in enumerate(payload.students):
         try:
             sex = _normalize_sex(item.sex)
-            if dry_run:
-                row = {"id": None}
-            else:
-                row = execute_returning_one(
-                    """
-                    INSERT INTO t_students (
-                        name, sex, direction, postalcode, belt, email, phone, phone2, weight,
-                        country, taxid, birthday, location_id, newsletter_opt_in, is_minor,
-                        guardian_name, guardian_email, guardian_phone, guardian_phone2, guardian_relationship
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                    )
-                    RETURNING id
-                    """,
-                    (
-                        name,
-                        sex,
-                        item.direction,
-                        item.postalcode,
-                        item.belt,
-                        email,
-                        item.phone,
-                        item.phone2,
-                        item.weight,
-                        item.country,
-                        item.taxid,
-                        item.birthday,
-                        item.location_id,
-                        item.newsletter_opt_in,
-                        item.is_minor,
-                        item.guardian_name,
-                        item.guardian_email,
-                        item.guardian_phone,
-                        item.guardian_phone2,
-                        item.guardian_relationship,
-                    ),
-                )
-            created += 1
-            results.append(
-                StudentBatchCreateResult(
-                    name=name,
-                    email=email,
-                    status="would_create" if dry_run else "created",
-                    id=int(row["id"]) if row and row.get("id") is not None else None,
-                    detail="Dry-run only" if dry_run else None,
-                )
-            )
         except HTTPException as exc:
-            errors += 1
-            results.append(
-                StudentBatchCreateResult(
-                    name=name,
-                    email=email,
-                    status="error",
-                    detail=str(exc.detail),
-                )
+            results[index] = StudentBatchCreateResult(
+                name=item.name.strip(),
+                email=item.email.strip(),
+                status="error",
+                detail=str(exc.detail),
             )
-        except Exception:
-            errors += 1
-            results.append(
-                StudentBatchCreateResult(
-                    name=name,
-                    email=email,
-                    status="error",
-                    detail="Insert failed",
+            continue
+        pending.append((index, _student_insert_params(item, sex)))
+
+    location_ids = sorted({params[12] for _index, params in pending if params[12] is not None})
+    if location_ids:
+        known = {
+            int(row["id"])
+            for row in fetch_all("SELECT id FROM t_locations WHERE id = ANY(%s)", (location_ids,))
+        }
+        valid = []
+        for index, params in pending:
+            if params[12] is not None and params[12] not in known:
+                results[index] = StudentBatchCreateResult(
+                    name=params[0], email=params[5], status="error", detail="Unknown location_id"
                 )
+            else:
+                valid.append((index, params))
+        pending = valid
+
+    if dry_run:
+        outcomes = [(None, None)] * len(pending)
+    elif pending:
+        outcomes = _insert_students_bulk([params for _index, params in pending])
+    else:
+        outcomes = []
+
+    for (index, params), (student_id, error) in zip(pending, outcomes):
+        if error:
+            results[index] = StudentBatchCreateResult(
+                name=params[0], email=params[5], status="error", detail=error
+            )
+        else:
+            results[index] = StudentBatchCreateResult(
+                name=params[0],
+                email=params[5],
+                status="would_create" if dry_run else "created",
+                id=student_id,
+                detail="Dry-run only" if dry_run else None,
             )
 
+    created = sum(1 for item in results if item and item.status in {"created", "would_create"})
+    errors = len(results) - created
+    if created and not dry_run:
+        _invalidate_student_counts()
     _audit_cud(
         subject=subject,
         action="students.batch_create",
@@ -2031,24 +3981,54 @@ def batch_create_students(
 
 
 @app.get("/students/{student_id}", response_model=StudentDetailOut)
-def get_student(student_id: int, _: str = Depends(_require_auth)):
-    rows = fetch_all(
-        """
-        SELECT s.id, s.name, s.sex, s.direction, s.postalcode, s.belt, s.email, s.phone, s.phone2,
-               s.weight, s.country, s.taxid, s.birthday, s.location_id, l.name AS location,
-               s.newsletter_opt_in, s.is_minor, s.guardian_name, s.guardian_email, s.guardian_phone,
-               s.guardian_phone2, s.guardian_relationship, s.active, s.created_at
-        FROM t_students s
-        LEFT JOIN t_locations l ON s.location_id = l.id
-        WHERE s.id = %s
-        """,
-        (student_id,),
-    )
+def get_student(student_id: int, request: Request, response: Response, _: str = Depends(_require_auth)):
+    etag = _weak_etag(request.url.path, request.url.query, _table_versions("t_students", "t_locations"))
+    not_modified = _not_modified(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+    rows = fetch_all(_STUDENT_DETAIL_SQL, (student_id,))
     if not rows:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
     return StudentDetailOut.model_validate(rows[0])
 
 
+@app.get("/students/{student_id}/overview", response_model=StudentOverviewOut)
+async def student_overview(
+    student_id: int,
+    fields: str = Query(default=",".join(_STUDENT_OVERVIEW_FIELDS)),
+    attendance_limit: int = Query(default=20, ge=1, le=200),
+    _: str = Depends(_require_auth_async),
+):
+    wanted = {item.strip() for item in fields.split(",") if item.strip()}
+    unknown = wanted - set(_STUDENT_OVERVIEW_FIELDS)
+    if unknown or not wanted:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"fields must be a comma separated subset of {', '.join(_STUDENT_OVERVIEW_FIELDS)}",
+        )
+    # The detail row doubles as the existence check and carries the enrollment date for the roadmap.
+    statements: list[tuple[str, tuple]] = [(_STUDENT_DETAIL_SQL, (student_id,))]
+    if "followups" in wanted:
+        statements.append((_STUDENT_FOLLOWUPS_SQL, (student_id,)))
+    if "attendance" in wanted:
+        statements.append((_STUDENT_ATTENDANCE_SQL.format(after=""), (student_id, attendance_limit)))
+    results = await async_db.fetch_all_many(statements)
+    if not results[0]:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
+    student = results[0][0]
+    out = StudentOverviewOut(student_id=student_id)
+    if "detail" in wanted:
+        out.detail = StudentDetailOut.model_validate(student)
+    rest = iter(results[1:])
+    if "followups" in wanted:
+        out.followups = _build_followup_roadmap(student_id, student.get("enrollment_date"), next(rest))
+    if "attendance" in wanted:
+        out.attendance = [
+            AttendanceRow(c1=str(r["c1"]), c2=str(r["c2"]), c3=str(r["c3"])) for r in next(rest)
+        ]
+    return out
+
+
 @app.put("/students/{student_id}", response_model=StudentCreateResponse)
 def update_student(
     student_id: int,
@@ -2092,6 +4072,7 @@ def update_student(
     )
     if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
+    _invalidate_student_counts()
     _audit_cud(
         subject=subject,
         action="students.update",
@@ -2115,6 +4096,7 @@ def deactivate_student(student_id: int, subject: str = Depends(_require_update_a
     )
     if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
+    _invalidate_student_counts()
     _audit_cud(
         subject=subject,
         action="students.deactivate",
@@ -2138,6 +4120,7 @@ def reactivate_student(student_id: int, subject: str = Depends(_require_update_a
     )
     if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
+    _invalidate_student_counts()
     _audit_cud(
         subject=subject,
         action="students.reactivate",
@@ -2151,55 +4134,232 @@ def reactivate_student(student_id: int, subject: str = Depends(_require_update_a
 @app.get("/students/{student_id}/followups", response_model=StudentFollowupRoadmapOut)
 def list_student_followups(student_id: int, _: str = Depends(_require_auth)):
     student = _student_exists(student_id)
-    rows = fetch_all(
-        """
-        SELECT id, student_id, stage_number, call_date, points_of_interest, main_reason, goals,
-               goal_details, welcome_packet_read, questions, benefits_seen, attendance_summary,
-               equipment_status, events_discussed, motivation_notes, issues_detected,
-               referral_requested, upgrade_appointment_scheduled, upgrade_appointment_date,
-               notes, created_at, updated_at
-        FROM t_student_followups
-        WHERE student_id = %s
-        ORDER BY stage_number
+    rows = fetch_all(_STUDENT_FOLLOWUPS_SQL, (student_id,))
+    return _build_followup_roadmap(student_id, student.get("enrollment_date"), rows)
+
+
+@app.get("/followups/due", response_model=FollowupDuePageOut)
+async def followups_due(
+    _: str = Depends(_require_auth_async),
+    limit: int = Query(default=50, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
+    location_id: int | None = Query(default=None, ge=1),
+    order: str = Query(default="desc"),
+):
+    """Active students whose current 14-day stage has no followup yet, most overdue first.
+
+    Same stage arithmetic as _student_program_progress, done in SQL for every student at once;
+    the NOT EXISTS probe is an index lookup on (student_id, stage_number).
+    """
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="order must be asc or desc")
+    today = datetime.now(timezone.utc).date()
+    where = ["s.active = true", "s.created_at >= %s"]
+    params: list[object] = [today, today - timedelta(days=69)]
+    if location_id is not None:
+        where.append("s.location_id = %s")
+        params.append(location_id)
+    direction = "DESC" if order == "desc" else "ASC"
+    rows = await async_db.fetch_all(
+        f"""
+        WITH progress AS (
+            SELECT s.id, s.name, s.phone, s.email, s.location_id,
+                   s.created_at::date AS enrollment_date,
+                   GREATEST(%s::date - s.created_at::date, 0) AS days_since
+            FROM t_students s
+            WHERE {" AND ".join(where)}
+        ),
+        due AS (
+            SELECT p.*, LEAST(p.days_since / 14 + 1, 5) AS current_stage
+            FROM progress p
+            WHERE p.days_since < 70
+        ),
+        open_stage AS (
+            SELECT d.*, d.days_since - (d.current_stage - 1) * 14 AS days_overdue
+            FROM due d
+            WHERE NOT EXISTS (
+                SELECT 1
+                FROM t_student_followups f
+                WHERE f.student_id = d.id AND f.stage_number = d.current_stage
+            )
+        ),
+        total AS (
+            SELECT COUNT(*)::int AS total_count FROM open_stage
+        ),
+        page AS (
+            SELECT o.id AS student_id, o.name, o.phone, o.email, o.location_id, l.name AS location,
+                   o.enrollment_date, o.current_stage,
+                   o.enrollment_date + (o.current_stage - 1) * 14 AS stage_started, o.days_overdue,
+                   (SELECT MAX(f.call_date) FROM t_student_followups f WHERE f.student_id = o.id)
+                       AS last_call_date
+            FROM open_stage o
+            LEFT JOIN t_locations l ON o.location_id = l.id
+            ORDER BY o.days_overdue {direction}, o.id
+            LIMIT %s OFFSET %s
+        )
+        SELECT total.total_count, page.*
+        FROM total
+        LEFT JOIN page ON true
+        ORDER BY page.days_overdue {direction}, page.student_id
         """,
-        (student_id,),
+        tuple(params + [limit, offset]),
+    )
+    total = int(rows[0]["total_count"]) if rows else 0
+    return FollowupDuePageOut(
+        total=total,
+        rows=[FollowupDueRow.model_validate(row) for row in rows if row.get("student_id") is not None],
     )
-    followups = [StudentFollowupOut.model_validate(row) for row in rows]
 
-    completed_map = {item.stage_number: item for item in followups}
-    enrollment_date = student.get("enrollment_date")
-    current_stage, program_completed, days_since = _student_program_progress(enrollment_date)
-    stages: list[StudentFollowupStageStatus] = []
-    for stage_number in range(1, 6):
-        row = completed_map.get(stage_number)
-        if row:
-            status_value = "completed"
-        elif (not program_completed) and current_stage == stage_number:
-            status_value = "current"
-        else:
-            status_value = "pending"
-        stages.append(
-            StudentFollowupStageStatus(
-                stage_number=stage_number,
-                status=status_value,
-                followup_id=row.id if row else None,
-                call_date=row.call_date if row else None,
-            )
+
+@app.post("/analytics/rebuild")
+def rebuild_attendance_rollups(subject: str = Depends(_require_admin)):
+    """Recompute every attendance rollup from t_attendance; attendance writes wait while it runs."""
+    with transaction() as cur:
+        cur.execute("SELECT f_attendance_rollup_rebuild()")
+        cur.execute(
+            """
+            SELECT (SELECT COUNT(*) FROM t_attendance_student_span)::int AS students,
+                   (SELECT COUNT(*) FROM t_attendance_session_counts)::int AS sessions
+            """
         )
+        counts = cur.fetchone()
+    _audit_cud(
+        subject=subject,
+        action="analytics.rebuild",
+        resource_type="attendance_rollup",
+        details={"students": counts["students"], "sessions": counts["sessions"]},
+    )
+    return {"status": "ok", "students": counts["students"], "sessions": counts["sessions"]}
 
-    last_call_date = None
-    if followups:
-        last_call_date = max((item.call_date for item in followups if item.call_date), default=None)
-    return StudentFollowupRoadmapOut(
+
+@app.get("/analytics/students/{student_id}", response_model=StudentAttendanceAnalyticsOut)
+async def analytics_student(
+    student_id: int,
+    weeks: int = Query(default=12, ge=1, le=260),
+    _: str = Depends(_require_auth_async),
+):
+    """Weekly attended/recorded counts (zero-filled) plus first/last attendance, from the rollups."""
+    this_week = datetime.now(timezone.utc).date()
+    this_week -= timedelta(days=this_week.weekday())
+    first_week = this_week - timedelta(weeks=weeks - 1)
+    span_rows, week_rows = await async_db.fetch_all_many(
+        [
+            (
+                """
+                SELECT first_attended, last_attended, attended_total
+                FROM t_attendance_student_span
+                WHERE student_id = %s
+                """,
+                (student_id,),
+            ),
+            (
+                """
+                SELECT g.week_start::date AS week_start,
+                       COALESCE(w.attended, 0) AS attended,
+                       COALESCE(w.recorded, 0) AS recorded
+                FROM generate_series(%s::date, %s::date, interval '1 week') AS g(week_start)
+                LEFT JOIN t_attendance_student_weekly w
+                    ON w.student_id = %s AND w.week_start = g.week_start::date
+                ORDER BY g.week_start
+                """,
+                (first_week, this_week, student_id),
+            ),
+        ]
+    )
+    out = StudentAttendanceAnalyticsOut(
         student_id=student_id,
-        enrollment_date=enrollment_date,
-        days_since_enrollment=days_since,
-        current_stage=current_stage,
-        program_completed=program_completed,
-        last_call_date=last_call_date,
-        stages=stages,
-        followups=followups,
+        weeks=[AttendanceWeekOut.model_validate(row) for row in week_rows],
+    )
+    if span_rows:
+        out.first_attended = span_rows[0]["first_attended"]
+        out.last_attended = span_rows[0]["last_attended"]
+        out.attended_total = int(span_rows[0]["attended_total"])
+    return out
+
+
+@app.get("/analytics/retention", response_model=RetentionPageOut)
+async def analytics_retention(
+    _: str = Depends(_require_auth_async),
+    inactive_days: int = Query(default=30, ge=1, le=3650),
+    limit: int = Query(default=50, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
+    location_id: int | None = Query(default=None, ge=1),
+):
+    """Active students who have attended before but not in the last `inactive_days`, most recently lapsed first."""
+    today = datetime.now(timezone.utc).date()
+    where = ["sp.last_attended < %s", "s.active = true"]
+    params: list[object] = [today, today - timedelta(days=inactive_days)]
+    if location_id is not None:
+        where.append("s.location_id = %s")
+        params.append(location_id)
+    rows = await async_db.fetch_all(
+        f"""
+        SELECT COUNT(*) OVER ()::int AS total_count,
+               sp.student_id, s.name, s.location_id, l.name AS location,
+               sp.first_attended, sp.last_attended, sp.attended_total,
+               %s::date - sp.last_attended AS days_since_last
+        FROM t_attendance_student_span sp
+        JOIN t_students s ON s.id = sp.student_id
+        LEFT JOIN t_locations l ON s.location_id = l.id
+        WHERE {" AND ".join(where)}
+        ORDER BY sp.last_attended DESC, sp.student_id
+        LIMIT %s OFFSET %s
+        """,
+        tuple(params + [limit, offset]),
+    )
+    total = int(rows[0]["total_count"]) if rows else 0
+    return RetentionPageOut(total=total, rows=[RetentionRow.model_validate(row) for row in rows])
+
+
+@app.get("/analytics/occupancy", response_model=list[OccupancySlotOut])
+async def analytics_occupancy(
+    _: str = Depends(_require_auth_async),
+    date_from: date | None = Query(default=None),
+    date_to: date | None = Query(default=None),
+    location_id: int | None = Query(default=None, ge=1),
+    class_id: int | None = Query(default=None, ge=1),
+):
+    """Per class/location/weekday/start time: sessions held and attendance, over the last 90 days by default.
+
+    Reads one rollup row per session, so the cost follows the number of sessions in range.
+    """
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=89)
+    if date_to < date_from:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="date_to must not be before date_from")
+    if (date_to - date_from).days >= _SCHEDULE_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Date range is limited to {_SCHEDULE_MAX_DAYS} days",
+        )
+    where = ["cs.session_date BETWEEN %s AND %s", "COALESCE(cs.cancelled, false) = false"]
+    params: list[object] = [date_from, date_to]
+    if location_id is not None:
+        where.append("cs.location_id = %s")
+        params.append(location_id)
+    if class_id is not None:
+        where.append("cs.class_id = %s")
+        params.append(class_id)
+    rows = await async_db.fetch_all(
+        f"""
+        SELECT cs.class_id, c.name AS class_name, cs.location_id, l.name AS location_name,
+               EXTRACT(ISODOW FROM cs.session_date)::int AS weekday,
+               cs.start_time::text AS start_time,
+               COUNT(*)::int AS sessions,
+               COALESCE(SUM(sc.attended), 0)::int AS attended_total,
+               ROUND(COALESCE(AVG(COALESCE(sc.attended, 0)), 0), 2)::float AS avg_attended,
+               COALESCE(MAX(sc.attended), 0)::int AS max_attended
+        FROM t_class_sessions cs
+        JOIN t_classes c ON cs.class_id = c.id
+        LEFT JOIN t_locations l ON cs.location_id = l.id
+        LEFT JOIN t_attendance_session_counts sc ON sc.session_id = cs.id
+        WHERE {" AND ".join(where)}
+        GROUP BY cs.class_id, c.name, cs.location_id, l.name, 5, 6
+        ORDER BY weekday, start_time, c.name
+        """,
+        tuple(params),
     )
+    return [OccupancySlotOut.model_validate(row) for row in rows]
 
 
 @app.post("/students/{student_id}/followups/upsert", response_model=StudentFollowupOut)
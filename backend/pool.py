@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+from psycopg2.pool import PoolError
+
+
+class PoolTimeoutError(PoolError):
+    pass
+
+
+class BoundedConnectionPool:
+    # psycopg2's SimpleConnectionPool is not thread-safe and ThreadedConnectionPool
+    # fails fast when exhausted; this one queues callers up to a bounded depth.
+    def __init__(
+        self,
+        minconn: int,
+        maxconn: int,
+        *,
+        connect: Callable[[], Any],
+        timeout: float = 10.0,
+        max_waiters: int = 100,
+    ):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("Invalid pool size: require 0 <= minconn <= maxconn and maxconn >= 1")
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_waiters = max_waiters
+        self._connect = connect
+        self._cond = threading.Condition(threading.Lock())
+        self._idle: deque = deque()
+        self._in_use: dict[int, Any] = {}
+        self._size = 0
+        self._waiters = 0
+        self._closed = False
+        self._acquired = 0
+        self._timeouts = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        for _ in range(minconn):
+            self._idle.append(self._connect())
+            self._size += 1
+
+    def getconn(self, timeout: float | None = None):
+        wait_limit = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + wait_limit
+        create = False
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolError("connection pool is closed")
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._size < self.maxconn:
+                    self._size += 1
+                    create = True
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"Timed out after {wait_limit:.1f}s waiting for a database connection"
+                    )
+                if self._waiters >= self.max_waiters:
+                    self._rejected += 1
+                    raise PoolTimeoutError("Database connection wait queue is full")
+                self._waiters += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiters -= 1
+            waited = time.monotonic() - started
+            self._acquired += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        if create:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+        with self._cond:
+            self._in_use[id(conn)] = conn
+        return conn
+
+    def putconn(self, conn, close: bool = False) -> None:
+        with self._cond:
+            if self._in_use.pop(id(conn), None) is None:
+                raise PoolError("trying to put unkeyed connection")
+        reusable = not close and not self._closed and self._reset(conn)
+        if not reusable and not conn.closed:
+            conn.close()
+        with self._cond:
+            if reusable:
+                self._idle.append(conn)
+            else:
+                self._size -= 1
+            self._cond.notify()
+
+    def closeall(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            if not conn.closed:
+                conn.close()
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            acquired = self._acquired
+            return {
+                "min_size": self.minconn,
+                "max_size": self.maxconn,
+                "size": self._size,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                "waiters": self._waiters,
+                "max_waiters": self.max_waiters,
+                "acquired": acquired,
+                "timeouts": self._timeouts,
+                "rejected": self._rejected,
+                "avg_wait_ms": round((self._wait_total / acquired) * 1000, 3) if acquired else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 3),
+            }
+
+    @staticmethod
+    def _reset(conn) -> bool:
+        if conn.closed:
+            return False
+        try:
+            status = conn.info.transaction_status
+            if status == TRANSACTION_STATUS_UNKNOWN:
+                return False
+            if status != TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+        except Exception:
+            return False
+        return True
@@ -1,3 +1,6 @@
+import asyncio
+import sys
+
 from backend.config import (
     APP_ENV,
     API_HOST,
@@ -28,6 +31,10 @@ def main():
 
     validate_security_settings()
 
+    if sys.platform == "win32":
+        # psycopg async mode cannot run on the default Proactor event loop.
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
     env_sources = ", ".join(ENV_FILES_PRESENT) if ENV_FILES_PRESENT else "none"
     print(
         f"[backend] startup env={APP_ENV} db={DB_NAME}@{DB_HOST}:{DB_PORT} "
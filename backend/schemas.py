@@ -1,4 +1,4 @@
-from datetime import date, datetime
+from datetime import date, datetime, time
 from typing import Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
@@ -17,6 +17,12 @@ class TokenResponse(BaseModel):
     expires_in_minutes: int
     username: str
     role: UserRole
+    refresh_token: Optional[str] = None
+    refresh_expires_in_minutes: Optional[int] = None
+
+
+class RefreshTokenIn(BaseModel):
+    refresh_token: str = Field(min_length=20, max_length=256)
 
 
 class ApiUserCreateIn(BaseModel):
@@ -162,6 +168,7 @@ class StudentOut(BaseModel):
     weight: Optional[float] = None
     country: Optional[str] = None
     taxid: Optional[str] = None
+    location_id: Optional[int] = None
     location: Optional[str] = None
     birthday: Optional[date] = None
     active: Optional[bool] = True
@@ -176,6 +183,75 @@ class CountResponse(BaseModel):
     total: int
 
 
+class StudentStatsBucket(BaseModel):
+    key: Optional[str] = None
+    total: int
+    active: int
+
+
+class StudentEnrollmentPoint(BaseModel):
+    month: date
+    enrolled: int
+    cumulative: int
+
+
+class StudentStatsOut(BaseModel):
+    total: int
+    active: int
+    inactive: int
+    by_location: list[StudentStatsBucket]
+    by_belt: list[StudentStatsBucket]
+    enrollments: list[StudentEnrollmentPoint]
+
+
+class StudentPageOut(BaseModel):
+    total: int
+    rows: list[StudentOut]
+    next_cursor: Optional[int] = None
+    prev_cursor: Optional[int] = None
+
+
+class DbPoolStatsOut(BaseModel):
+    min_size: int
+    max_size: int
+    size: int
+    in_use: int
+    idle: int
+    waiters: int
+    max_waiters: int
+    acquired: int
+    timeouts: int
+    rejected: int
+    avg_wait_ms: float
+    max_wait_ms: float
+
+
+class HashingStatsOut(BaseModel):
+    workers: int
+    max_pending: int
+    pending: int
+    queued: int
+    completed: int
+    rejected: int
+    avg_ms: float
+
+
+class AuditQueueStatsOut(BaseModel):
+    policy: str
+    capacity: int
+    queued: int
+    enqueued: int
+    flushed: int
+    batches: int
+    dropped: int
+    failed: int
+
+
+class DbPoolsStatsOut(BaseModel):
+    sync_pool: DbPoolStatsOut
+    async_pool: DbPoolStatsOut
+
+
 class LocationOut(BaseModel):
     id: int
     name: str
@@ -276,6 +352,73 @@ class SessionOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ScheduleTemplateIn(BaseModel):
+    class_id: int
+    weekday: int = Field(ge=1, le=7, description="ISO weekday, 1 = Monday")
+    start_time: time
+    end_time: time
+    location_id: int
+    valid_from: date
+    valid_to: date
+
+
+class ScheduleTemplateOut(BaseModel):
+    id: int
+    class_id: int
+    class_name: Optional[str] = None
+    weekday: int
+    start_time: str
+    end_time: str
+    location_id: int
+    location_name: Optional[str] = None
+    valid_from: date
+    valid_to: date
+    active: bool = True
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ScheduleGenerateIn(BaseModel):
+    date_from: date
+    date_to: date
+    template_ids: Optional[list[int]] = None
+    dry_run: bool = True
+
+
+class ScheduleSlotOut(BaseModel):
+    template_id: int
+    class_id: int
+    class_name: Optional[str] = None
+    session_date: date
+    start_time: str
+    end_time: str
+    location_id: int
+    location_name: Optional[str] = None
+    already_exists: bool = False
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ScheduleGenerateOut(BaseModel):
+    dry_run: bool
+    total_slots: int
+    created: int
+    skipped_existing: int
+    duplicate_slots: int = 0
+    slots: list[ScheduleSlotOut] = Field(default_factory=list)
+
+
+class SyncChangesOut(BaseModel):
+    cursor: int
+    full: bool = False
+    students: list[StudentOut] = Field(default_factory=list)
+    teachers: list[TeacherOut] = Field(default_factory=list)
+    locations: list[LocationOut] = Field(default_factory=list)
+    classes: list[ClassOut] = Field(default_factory=list)
+    sessions: list[SessionOut] = Field(default_factory=list)
+    deleted: dict[str, list[int]] = Field(default_factory=dict)
+
+
 class AttendanceRegisterIn(BaseModel):
     session_id: int
     student_id: int
@@ -283,12 +426,49 @@ class AttendanceRegisterIn(BaseModel):
     source: str = Field(min_length=1, max_length=30)
 
 
+class AttendanceBulkEntry(BaseModel):
+    student_id: int
+    status: str = Field(min_length=1, max_length=30)
+
+
+class AttendanceBulkIn(BaseModel):
+    session_id: int
+    source: str = Field(min_length=1, max_length=30)
+    entries: list[AttendanceBulkEntry] = Field(min_length=1, max_length=500)
+
+
+class AttendanceBulkResult(BaseModel):
+    student_id: int
+    result: Literal["registered", "already_registered", "unknown_student", "duplicate"]
+
+
+class AttendanceBulkOut(BaseModel):
+    session_id: int
+    total: int
+    registered: int
+    already_registered: int
+    errors: int
+    results: list[AttendanceBulkResult]
+
+
 class AttendanceRow(BaseModel):
     c1: str
     c2: str
     c3: str
 
 
+class AttendanceTotalsOut(BaseModel):
+    last_30_days: int = 0
+    last_90_days: int = 0
+    last_365_days: int = 0
+
+
+class AttendancePageOut(BaseModel):
+    rows: list[AttendanceRow]
+    next_cursor: Optional[str] = None
+    totals: Optional[AttendanceTotalsOut] = None
+
+
 class BirthdayNotificationRow(BaseModel):
     name: Optional[str] = None
     belt: Optional[str] = None
@@ -422,6 +602,75 @@ class StudentFollowupRoadmapOut(BaseModel):
     followups: list[StudentFollowupOut]
 
 
+class StudentOverviewOut(BaseModel):
+    student_id: int
+    detail: Optional[StudentDetailOut] = None
+    followups: Optional[StudentFollowupRoadmapOut] = None
+    attendance: Optional[list[AttendanceRow]] = None
+
+
+class FollowupDueRow(BaseModel):
+    student_id: int
+    name: Optional[str] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    location_id: Optional[int] = None
+    location: Optional[str] = None
+    enrollment_date: date
+    current_stage: int
+    stage_started: date
+    days_overdue: int
+    last_call_date: Optional[date] = None
+
+
+class FollowupDuePageOut(BaseModel):
+    total: int
+    rows: list[FollowupDueRow]
+
+
+class AttendanceWeekOut(BaseModel):
+    week_start: date
+    attended: int = 0
+    recorded: int = 0
+
+
+class StudentAttendanceAnalyticsOut(BaseModel):
+    student_id: int
+    first_attended: Optional[date] = None
+    last_attended: Optional[date] = None
+    attended_total: int = 0
+    weeks: list[AttendanceWeekOut] = Field(default_factory=list)
+
+
+class RetentionRow(BaseModel):
+    student_id: int
+    name: Optional[str] = None
+    location_id: Optional[int] = None
+    location: Optional[str] = None
+    first_attended: date
+    last_attended: date
+    attended_total: int
+    days_since_last: int
+
+
+class RetentionPageOut(BaseModel):
+    total: int
+    rows: list[RetentionRow]
+
+
+class OccupancySlotOut(BaseModel):
+    class_id: int
+    class_name: Optional[str] = None
+    location_id: Optional[int] = None
+    location_name: Optional[str] = None
+    weekday: int
+    start_time: str
+    sessions: int
+    attended_total: int
+    avg_attended: float
+    max_attended: int
+
+
 class AuditLogRow(BaseModel):
     id: int
     actor_user_id: Optional[int] = None
@@ -440,11 +689,22 @@ class AuditLogRow(BaseModel):
 
 class AuditLogSearchOut(BaseModel):
     total: int
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
     rows: list[AuditLogRow]
 
 
+class AuditLogPartitionOut(BaseModel):
+    partition: str
+    range_start: date
+    range_end: date
+    rows: int
+
+
 class AuditLogPurgeOut(BaseModel):
     dry_run: bool
     retention_days: int
+    cutoff: Optional[datetime] = None
     to_delete: int
     deleted: int
+    partitions: list[AuditLogPartitionOut] = Field(default_factory=list)
@@ -3,6 +3,7 @@ import base64
 import hashlib
 import hmac
 import os
+import secrets
 
 import jwt
 from fastapi import HTTPException, status
@@ -14,16 +15,28 @@ _PBKDF2_ITERATIONS = 300000
 _SALT_BYTES = 16
 
 
-def create_access_token(subject: str) -> str:
+def create_access_token(subject: str, claims: dict | None = None) -> str:
     now = datetime.now(timezone.utc)
-    payload = {
-        "sub": subject,
-        "iat": int(now.timestamp()),
-        "exp": int((now + timedelta(minutes=API_TOKEN_MINUTES)).timestamp()),
-    }
+    payload = dict(claims or {})
+    payload.update(
+        {
+            "sub": subject,
+            "iat": int(now.timestamp()),
+            "exp": int((now + timedelta(minutes=API_TOKEN_MINUTES)).timestamp()),
+        }
+    )
     return jwt.encode(payload, API_JWT_SECRET, algorithm=API_JWT_ALGORITHM)
 
 
+def new_refresh_token() -> str:
+    return secrets.token_urlsafe(48)
+
+
+def hash_refresh_token(token: str) -> str:
+    # Refresh tokens are 384 random bits, so a fast digest is enough; PBKDF2 would defeat the purpose.
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
 def hash_password(password: str) -> str:
     if not password:
         raise ValueError("Password cannot be empty")
@@ -59,7 +72,7 @@ def verify_password(password: str, encoded_hash: str) -> bool:
     return hmac.compare_digest(actual, expected)
 
 
-def verify_access_token(token: str) -> str:
+def decode_access_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, API_JWT_SECRET, algorithms=[API_JWT_ALGORITHM])
     except jwt.InvalidTokenError as exc:
@@ -67,10 +80,13 @@ def verify_access_token(token: str) -> str:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         ) from exc
-    subject = payload.get("sub")
-    if not subject:
+    if not payload.get("sub"):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token missing subject",
         )
-    return str(subject)
+    return payload
+
+
+def verify_access_token(token: str) -> str:
+    return str(decode_access_token(token)["sub"])
@@ -348,8 +348,10 @@ def main():
         sessions_api["refresh_location_options"]()
         sessions_api["load_classes"]()
         sessions_api["load_sessions"]()
+        sessions_api["load_timetable"]()
         attendance_week_api["load_week"]()
         news_api["load_birthdays"]()
+        news_api["load_followups_due"]()
         if current_user and (current_user.get("role") or "").strip() == "admin":
             users_api["load_users"]()
         about_api["refresh_about_panel"]()
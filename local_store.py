@@ -0,0 +1,107 @@
+"""In-memory replica of the reference tables, kept current through GET /sync/changes.
+
+Tabs call refresh() and then read a table; each refresh transfers only rows written since the last
+cursor, so it costs in proportion to what changed rather than to table size.
+"""
+
+import threading
+
+from api_client import get_current_session_user, sync_changes
+
+_RESOURCES = ("students", "teachers", "locations", "classes", "sessions")
+
+_LOCK = threading.Lock()
+_cursor = 0
+_owner = None
+_tables = {name: {} for name in _RESOURCES}
+
+
+def reset():
+    global _cursor, _owner
+    with _LOCK:
+        _cursor = 0
+        _owner = None
+        for rows in _tables.values():
+            rows.clear()
+
+
+def apply_changes(delta):
+    global _cursor
+    with _LOCK:
+        if delta.get("full"):
+            for rows in _tables.values():
+                rows.clear()
+        for name in _RESOURCES:
+            rows = _tables[name]
+            for row in delta.get(name) or []:
+                rows[row["id"]] = dict(row)
+            for row_id in (delta.get("deleted") or {}).get(name, []):
+                rows.pop(row_id, None)
+        _cursor = int(delta.get("cursor", _cursor))
+
+
+def refresh():
+    """Pull and apply changes since the last refresh; a different login starts over from scratch."""
+    global _owner
+    user = (get_current_session_user() or {}).get("username")
+    if user != _owner:
+        reset()
+        _owner = user
+    with _LOCK:
+        since = _cursor
+    apply_changes(sync_changes(since))
+
+
+def _snapshot(name):
+    with _LOCK:
+        return [dict(row) for row in _tables[name].values()]
+
+
+def _names(name):
+    with _LOCK:
+        return {row_id: row.get("name") for row_id, row in _tables[name].items()}
+
+
+def _sort_text(value):
+    return (value or "").lower()
+
+
+def students():
+    locations_by_id = _names("locations")
+    rows = _snapshot("students")
+    for row in rows:
+        if row.get("location_id") is not None:
+            row["location"] = locations_by_id.get(row["location_id"], row.get("location"))
+    return sorted(rows, key=lambda row: (_sort_text(row.get("name")), row["id"]))
+
+
+def teachers():
+    return sorted(_snapshot("teachers"), key=lambda row: _sort_text(row.get("name")))
+
+
+def locations():
+    return sorted(_snapshot("locations"), key=lambda row: _sort_text(row.get("name")))
+
+
+def classes():
+    coaches_by_id = _names("teachers")
+    rows = _snapshot("classes")
+    for row in rows:
+        row["coach_name"] = coaches_by_id.get(row.get("coach_id"), row.get("coach_name"))
+    return sorted(rows, key=lambda row: _sort_text(row.get("name")))
+
+
+def sessions():
+    # Same order as /sessions/list: newest date first, then latest start time.
+    classes_by_id = _names("classes")
+    locations_by_id = _names("locations")
+    rows = _snapshot("sessions")
+    for row in rows:
+        row["class_name"] = classes_by_id.get(row.get("class_id"), row.get("class_name"))
+        if row.get("location_id") is not None:
+            row["location_name"] = locations_by_id.get(row["location_id"], row.get("location_name"))
+    return sorted(
+        rows,
+        key=lambda row: (row.get("session_date") or "", row.get("start_time") or ""),
+        reverse=True,
+    )
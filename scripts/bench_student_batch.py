@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Measure student insert throughput: one commit per row vs. chunked multi-row INSERT."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+COLUMNS = (
+    "name, sex, direction, postalcode, belt, email, phone, phone2, weight, country, taxid, birthday, "
+    "location_id, newsletter_opt_in, is_minor, guardian_name, guardian_email, guardian_phone, "
+    "guardian_phone2, guardian_relationship"
+)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark per-row vs bulk student inserts.")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma separated row counts")
+    parser.add_argument("--chunk", type=int, default=500, help="Rows per multi-row INSERT (API uses 500)")
+    parser.add_argument(
+        "--per-row-limit",
+        type=int,
+        default=10000,
+        help="Skip the per-row baseline above this size (it takes minutes)",
+    )
+    return parser.parse_args()
+
+
+def _rows(count: int) -> list[tuple]:
+    return [
+        (
+            f"Bench Student {i}", "M" if i % 2 else "F", "Hauptstraße 1", "1010", "White",
+            f"bench{i}@example.com", "+431234567", None, 70.0, "Austria", None, date(2000, 1, 1),
+            None, True, False, None, None, None, None, None,
+        )
+        for i in range(count)
+    ]
+
+
+def _create_table(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute("DROP TABLE IF EXISTS bench_students")
+        cur.execute(
+            "CREATE TEMP TABLE bench_students "
+            "(LIKE t_students INCLUDING DEFAULTS EXCLUDING IDENTITY EXCLUDING GENERATED)"
+        )
+        cur.execute("ALTER TABLE bench_students ADD COLUMN bench_id bigserial")
+    conn.commit()
+
+
+def _per_row(conn, rows: list[tuple]) -> float:
+    placeholders = ", ".join(["%s"] * len(rows[0]))
+    started = time.perf_counter()
+    for row in rows:
+        with conn.cursor() as cur:
+            cur.execute(f"INSERT INTO bench_students ({COLUMNS}) VALUES ({placeholders}) RETURNING bench_id", row)
+            cur.fetchone()
+        conn.commit()
+    return time.perf_counter() - started
+
+
+def _bulk(conn, rows: list[tuple], chunk: int) -> float:
+    from psycopg2.extras import execute_values
+
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        for start in range(0, len(rows), chunk):
+            part = rows[start:start + chunk]
+            execute_values(
+                cur,
+                f"INSERT INTO bench_students ({COLUMNS}) VALUES %s RETURNING bench_id",
+                part,
+                page_size=len(part),
+                fetch=True,
+            )
+    conn.commit()
+    return time.perf_counter() - started
+
+
+def main() -> int:
+    args = _parse_args()
+    from backend.db import get_conn
+
+    sizes = [int(item) for item in args.sizes.split(",") if item.strip()]
+    print(f"{'rows':>8} {'per-row s':>10} {'rows/s':>10} {'bulk s':>10} {'rows/s':>10}")
+    with get_conn() as conn:
+        for size in sizes:
+            rows = _rows(size)
+            _create_table(conn)
+            if size <= args.per_row_limit:
+                per_row = _per_row(conn, rows)
+                per_row_cols = f"{per_row:>10.2f} {size / per_row:>10.0f}"
+            else:
+                per_row_cols = f"{'skipped':>10} {'-':>10}"
+            _create_table(conn)
+            bulk = _bulk(conn, rows, args.chunk)
+            print(f"{size:>8} {per_row_cols} {bulk:>10.2f} {size / bulk:>10.0f}")
+        with conn.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS bench_students")
+        conn.commit()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
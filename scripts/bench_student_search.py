@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Compare student name search before/after the trigram index on a synthetic table."""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+FIRST_NAMES = [
+    "Anna", "Lukas", "Sophie", "Jonas", "Lea", "Maximilian", "Jürgen", "Bärbel",
+    "Günther", "Hannah", "Matthäus", "Zoë", "Felix", "Marie", "Tobias", "Ömer",
+]
+LAST_NAMES = [
+    "Müller", "Gruber", "Huber", "Wagner", "Pichler", "Steiner", "Moser", "Mayer",
+    "Hofer", "Bauer", "Schön", "Größl", "Fuchs", "Brandstätter", "Weiß", "Öztürk",
+]
+
+OLD_COUNT_SQL = "SELECT COUNT(s.id) AS total FROM bench_students s WHERE s.name ILIKE %s"
+NEW_COUNT_SQL = (
+    "SELECT COUNT(s.id) AS total FROM bench_students s "
+    "WHERE s.name_search LIKE lower(f_unaccent(%s))"
+)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark ILIKE vs trigram student name search.")
+    parser.add_argument("--rows", type=int, default=100_000, help="Synthetic students to generate")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per query; the median is reported")
+    parser.add_argument(
+        "--terms",
+        default="muller,gruber,brandst,weiss,an",
+        help="Comma separated search terms, typed the way users do (no umlauts)",
+    )
+    return parser.parse_args()
+
+
+def _seed(cur, rows: int) -> None:
+    cur.execute(
+        """
+        CREATE TEMP TABLE bench_students (
+            id serial PRIMARY KEY,
+            name varchar(120) NOT NULL,
+            active boolean NOT NULL DEFAULT true,
+            name_search text GENERATED ALWAYS AS (lower(f_unaccent(COALESCE(name, '')))) STORED
+        )
+        """
+    )
+    cur.execute(
+        """
+        INSERT INTO bench_students (name, active)
+        SELECT
+            (%s::text[])[1 + (g * 7) %% array_length(%s::text[], 1)] || ' '
+                || (%s::text[])[1 + (g * 13) %% array_length(%s::text[], 1)] || ' ' || g,
+            g %% 5 <> 0
+        FROM generate_series(1, %s) AS g
+        """,
+        (FIRST_NAMES, FIRST_NAMES, LAST_NAMES, LAST_NAMES, rows),
+    )
+    cur.execute("ANALYZE bench_students")
+
+
+def _time_query(cur, query: str, term: str, repeat: int) -> tuple[float, int, str]:
+    pattern = f"%{term}%"
+    cur.execute(f"EXPLAIN (FORMAT JSON) {query}", (pattern,))
+    plan = cur.fetchone()[0][0]["Plan"]
+    node = plan.get("Plans", [plan])[0].get("Node Type", plan.get("Node Type", "?"))
+    timings = []
+    total = 0
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        cur.execute(query, (pattern,))
+        total = int(cur.fetchone()[0])
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), total, node
+
+
+def main() -> int:
+    args = _parse_args()
+    from backend.db import get_conn
+
+    terms = [item.strip() for item in args.terms.split(",") if item.strip()]
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            _seed(cur, args.rows)
+            before = {term: _time_query(cur, OLD_COUNT_SQL, term, args.repeat) for term in terms}
+            cur.execute("CREATE INDEX ON bench_students USING gin (name_search gin_trgm_ops)")
+            cur.execute("ANALYZE bench_students")
+            after = {term: _time_query(cur, NEW_COUNT_SQL, term, args.repeat) for term in terms}
+        conn.rollback()
+
+    print(f"Student name search, {args.rows} rows, median of {args.repeat} runs")
+    print(f"{'term':<12} {'before ms':>10} {'matches':>8} {'plan':<18} {'after ms':>10} {'matches':>8} plan")
+    for term in terms:
+        old_ms, old_total, old_node = before[term]
+        new_ms, new_total, new_node = after[term]
+        print(
+            f"{term:<12} {old_ms:>10.2f} {old_total:>8} {old_node:<18} "
+            f"{new_ms:>10.2f} {new_total:>8} {new_node}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
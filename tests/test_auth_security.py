@@ -1,5 +1,7 @@
+import asyncio
 import json
-from datetime import datetime
+import time
+from datetime import datetime, timedelta, timezone
 
 import jwt
 import pytest
@@ -10,8 +12,14 @@ import sys
 import types
 
 from backend import config
-from backend.schemas import LocationIn, LoginRequest
-from backend.security import create_access_token, hash_password, verify_access_token, verify_password
+from backend.schemas import LocationIn, LoginRequest, RefreshTokenIn
+from backend.security import (
+    create_access_token,
+    hash_password,
+    hash_refresh_token,
+    verify_access_token,
+    verify_password,
+)
 
 _BACKEND_MAIN = None
 _AUDIT_MODULE = None
@@ -25,6 +33,13 @@ class _DummyRequest:
     client = _DummyClient()
 
 
+def _async_return(value):
+    async def _fake(*_args, **_kwargs):
+        return value
+
+    return _fake
+
+
 def _load_backend_main_with_stubbed_db():
     global _BACKEND_MAIN
     if _BACKEND_MAIN is not None:
@@ -34,6 +49,8 @@ def _load_backend_main_with_stubbed_db():
         execute_returning_one=lambda *args, **kwargs: None,
         fetch_all=lambda *args, **kwargs: [],
         fetch_one=lambda *args, **kwargs: None,
+        pool_stats=lambda: {},
+        transaction=lambda: None,
     )
     sys.modules["backend.db"] = stub_db
     _BACKEND_MAIN = importlib.import_module("backend.main")
@@ -76,27 +93,118 @@ def test_require_auth_checks_active_user(monkeypatch):
 
     monkeypatch.setattr(backend_main, "_get_user_by_subject", _fake_get_user_by_subject)
     credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
-    subject = backend_main._require_auth(credentials)
-    assert subject == "activeuser"
+    user = backend_main._current_user(credentials)
+    assert backend_main._require_auth(user) == "activeuser"
     assert called["checked"] is True
 
 
+def test_claims_token_authorizes_without_user_row_lookup(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    token = create_access_token(
+        "coach1",
+        claims={"uid": 4, "role": "coach", "can_write": True, "can_update": False, "tv": 2},
+    )
+    monkeypatch.setattr(
+        backend_main,
+        "fetch_all",
+        lambda *_args, **_kwargs: [{"username": "coach1", "token_version": 2, "active": True}],
+    )
+    monkeypatch.setattr(
+        backend_main,
+        "fetch_one",
+        lambda *_args, **_kwargs: pytest.fail("user row lookup should not run for claims tokens"),
+    )
+    backend_main._invalidate_user_cache()
+
+    user = backend_main._current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+
+    assert user["id"] == 4
+    assert backend_main._require_write_access(user) == "coach1"
+    with pytest.raises(HTTPException) as exc:
+        backend_main._require_update_access(user)
+    assert exc.value.status_code == 403
+
+
+def test_claims_token_rejected_after_token_version_bump(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    token = create_access_token(
+        "coach1",
+        claims={"uid": 4, "role": "admin", "can_write": True, "can_update": True, "tv": 0},
+    )
+    monkeypatch.setattr(
+        backend_main,
+        "fetch_all",
+        lambda *_args, **_kwargs: [{"username": "coach1", "token_version": 1, "active": True}],
+    )
+    backend_main._invalidate_user_cache()
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    with pytest.raises(HTTPException) as exc:
+        backend_main._current_user(credentials)
+    assert exc.value.status_code == 401
+
+    monkeypatch.setattr(
+        backend_main,
+        "fetch_all",
+        lambda *_args, **_kwargs: [{"username": "coach1", "token_version": 0, "active": False}],
+    )
+    backend_main._invalidate_user_cache()
+    with pytest.raises(HTTPException) as exc:
+        backend_main._current_user(credentials)
+    assert exc.value.status_code == 403
+    backend_main._invalidate_user_cache()
+
+
+def test_user_lookup_is_cached_until_invalidated(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    lookups = []
+
+    def _fake_fetch_one(_query, params=()):
+        lookups.append(params)
+        return {"id": 3, "username": params[0], "role": "coach", "can_write": True, "can_update": False, "active": True}
+
+    monkeypatch.setattr(backend_main, "fetch_one", _fake_fetch_one)
+    monkeypatch.setattr(backend_main, "API_AUTH_CACHE_SECONDS", 30)
+    backend_main._USER_CACHE.clear()
+
+    user = backend_main._get_user_by_subject("coach1")
+    assert backend_main._require_write_access(user) == "coach1"
+    backend_main._get_user_by_subject("coach1")
+    assert len(lookups) == 1
+
+    backend_main._invalidate_user_cache("coach1")
+    backend_main._get_user_by_subject("coach1")
+    assert len(lookups) == 2
+    backend_main._USER_CACHE.clear()
+
+
+def test_update_access_uses_resolved_user_without_lookup():
+    backend_main = _load_backend_main_with_stubbed_db()
+    user = {"id": 3, "username": "desk", "role": "receptionist", "can_write": True, "can_update": False, "active": True}
+
+    with pytest.raises(HTTPException) as exc:
+        backend_main._require_update_access(user)
+    assert exc.value.status_code == 403
+
+
 def test_login_rate_limit_blocks_after_repeated_failures(monkeypatch):
     backend_main = _load_backend_main_with_stubbed_db()
     monkeypatch.setattr(backend_main, "API_LOGIN_RATE_LIMIT_ATTEMPTS", 2)
     monkeypatch.setattr(backend_main, "API_LOGIN_RATE_LIMIT_WINDOW_SECONDS", 300)
     monkeypatch.setattr(backend_main, "API_LOGIN_BLOCK_SECONDS", 60)
     monkeypatch.setattr(
-        backend_main,
+        backend_main.async_db,
         "fetch_one",
-        lambda *_args, **_kwargs: {
-            "username": "coach1",
-            "password_hash": "hash",
-            "active": True,
-            "role": "coach",
-        },
+        _async_return(
+            {
+                "username": "coach1",
+                "password_hash": "hash",
+                "active": True,
+                "role": "coach",
+            }
+        ),
     )
-    monkeypatch.setattr(backend_main, "verify_password", lambda *_args, **_kwargs: False)
+    monkeypatch.setattr(backend_main, "verify_password_async", _async_return(False))
 
     backend_main._LOGIN_FAILURES.clear()
     backend_main._LOGIN_BLOCKED_UNTIL.clear()
@@ -105,15 +213,15 @@ def test_login_rate_limit_blocks_after_repeated_failures(monkeypatch):
     request = _DummyRequest()
 
     with pytest.raises(HTTPException) as first:
-        backend_main.login(payload, request)
+        asyncio.run(backend_main.login(payload, request))
     assert first.value.status_code == 401
 
     with pytest.raises(HTTPException) as second:
-        backend_main.login(payload, request)
+        asyncio.run(backend_main.login(payload, request))
     assert second.value.status_code == 401
 
     with pytest.raises(HTTPException) as third:
-        backend_main.login(payload, request)
+        asyncio.run(backend_main.login(payload, request))
     assert third.value.status_code == 429
 
 
@@ -133,17 +241,19 @@ def test_login_writes_audit_event_on_failed_credentials(monkeypatch):
     monkeypatch.setattr(backend_main, "API_LOGIN_RATE_LIMIT_WINDOW_SECONDS", 300)
     monkeypatch.setattr(backend_main, "API_LOGIN_BLOCK_SECONDS", 60)
     monkeypatch.setattr(
-        backend_main,
+        backend_main.async_db,
         "fetch_one",
-        lambda *_args, **_kwargs: {
-            "id": 11,
-            "username": "coach1",
-            "password_hash": "hash",
-            "active": True,
-            "role": "coach",
-        },
+        _async_return(
+            {
+                "id": 11,
+                "username": "coach1",
+                "password_hash": "hash",
+                "active": True,
+                "role": "coach",
+            }
+        ),
     )
-    monkeypatch.setattr(backend_main, "verify_password", lambda *_args, **_kwargs: False)
+    monkeypatch.setattr(backend_main, "verify_password_async", _async_return(False))
     monkeypatch.setattr(backend_main, "audit_log_event", lambda **kwargs: events.append(kwargs))
     backend_main._LOGIN_FAILURES.clear()
     backend_main._LOGIN_BLOCKED_UNTIL.clear()
@@ -151,7 +261,7 @@ def test_login_writes_audit_event_on_failed_credentials(monkeypatch):
     payload = LoginRequest(username="coach1", password="wrong")
     request = _DummyRequest()
     with pytest.raises(HTTPException):
-        backend_main.login(payload, request)
+        asyncio.run(backend_main.login(payload, request))
 
     assert events
     assert events[-1]["action"] == "auth.login"
@@ -163,33 +273,96 @@ def test_login_writes_audit_event_on_success(monkeypatch):
     backend_main = _load_backend_main_with_stubbed_db()
     events = []
     monkeypatch.setattr(
-        backend_main,
+        backend_main.async_db,
         "fetch_one",
-        lambda *_args, **_kwargs: {
-            "id": 21,
-            "username": "admin",
-            "password_hash": "hash",
-            "active": True,
-            "role": "admin",
-        },
+        _async_return(
+            {
+                "id": 21,
+                "username": "admin",
+                "password_hash": "hash",
+                "active": True,
+                "role": "admin",
+            }
+        ),
     )
-    monkeypatch.setattr(backend_main, "verify_password", lambda *_args, **_kwargs: True)
+    monkeypatch.setattr(backend_main, "verify_password_async", _async_return(True))
     monkeypatch.setattr(backend_main, "create_access_token", lambda *_, **__: "token")
+    monkeypatch.setattr(backend_main.async_db, "execute", _async_return(None))
     monkeypatch.setattr(backend_main, "audit_log_event", lambda **kwargs: events.append(kwargs))
     backend_main._LOGIN_FAILURES.clear()
     backend_main._LOGIN_BLOCKED_UNTIL.clear()
 
     payload = LoginRequest(username="admin", password="correct")
     request = _DummyRequest()
-    result = backend_main.login(payload, request)
+    result = asyncio.run(backend_main.login(payload, request))
 
     assert result.access_token == "token"
+    assert result.refresh_token
     assert events
     assert events[-1]["action"] == "auth.login"
     assert events[-1]["result"] == "success"
     assert events[-1]["details"]["role"] == "admin"
 
 
+def test_refresh_rotates_token_without_password_check(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    inserted = []
+
+    async def _fake_execute(_query, params=()):
+        inserted.append(params)
+
+    monkeypatch.setattr(
+        backend_main.async_db,
+        "execute_returning_one",
+        _async_return(
+            {
+                "family_id": "fam1",
+                "id": 21,
+                "username": "admin",
+                "role": "admin",
+                "can_write": True,
+                "can_update": True,
+                "token_version": 3,
+            }
+        ),
+    )
+    monkeypatch.setattr(backend_main.async_db, "execute", _fake_execute)
+    monkeypatch.setattr(
+        backend_main,
+        "verify_password_async",
+        lambda *_args, **_kwargs: pytest.fail("refresh must not verify passwords"),
+    )
+
+    out = asyncio.run(backend_main.refresh_access_token(RefreshTokenIn(refresh_token="r" * 64)))
+
+    claims = jwt.decode(out.access_token, config.API_JWT_SECRET, algorithms=[config.API_JWT_ALGORITHM])
+    assert claims["sub"] == "admin"
+    assert claims["tv"] == 3
+    assert out.refresh_token and out.refresh_token != "r" * 64
+    # new token keeps the session family and is stored hashed, never in plaintext
+    assert inserted[0][2] == "fam1"
+    assert inserted[0][3] == hash_refresh_token(out.refresh_token)
+
+
+def test_refresh_reuse_revokes_family_and_audits(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    events = []
+    responses = [None, {"user_id": 21, "revoked_count": 1}]
+
+    async def _fake_execute_returning_one(_query, params=()):
+        return responses.pop(0)
+
+    monkeypatch.setattr(backend_main.async_db, "execute_returning_one", _fake_execute_returning_one)
+    monkeypatch.setattr(backend_main, "audit_log_event", lambda **kwargs: events.append(kwargs))
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(backend_main.refresh_access_token(RefreshTokenIn(refresh_token="r" * 64)))
+
+    assert exc.value.status_code == 401
+    assert events[-1]["action"] == "auth.refresh"
+    assert events[-1]["details"]["reason"] == "refresh_token_reuse"
+
+
 def test_locations_create_writes_audit_event(monkeypatch):
     backend_main = _load_backend_main_with_stubbed_db()
     events = []
@@ -287,9 +460,13 @@ def test_admin_audit_logs_returns_paginated_rows(monkeypatch):
         result="success",
         limit=10,
         offset=0,
+        cursor=None,
+        exact_total=True,
     )
 
     assert out.total == 2
+    assert out.total_is_estimate is False
+    assert out.next_cursor is None
     assert len(out.rows) == 2
     assert out.rows[0].action == "students.create"
     assert len(captured["calls"]) == 2
@@ -316,12 +493,14 @@ def test_admin_audit_logs_uses_limit_and_offset(monkeypatch):
         result="",
         limit=25,
         offset=50,
+        cursor=None,
+        exact_total=True,
     )
 
     assert out.total == 0
     assert out.rows == []
-    # second call is data query and includes pagination arguments at the end
-    assert captured["params"][1][-2:] == (25, 50)
+    # second call is data query and includes pagination arguments at the end (one extra row to detect a next page)
+    assert captured["params"][1][-2:] == (26, 50)
 
 
 def test_export_audit_logs_json(monkeypatch):
@@ -454,59 +633,75 @@ def test_audit_log_event_uses_current_request_context(monkeypatch):
     def _fake_execute(_query, params=()):
         captured["params"] = params
 
+    audit_module.flush_audit_events()
     monkeypatch.setattr(audit_module, "execute", _fake_execute)
     audit_module.set_current_request_context(correlation_id="cid-ctx-1", ip_address="192.168.1.1")
     try:
         audit_module.audit_log_event(action="students.update", result="success", details={"k": "v"})
     finally:
         audit_module.clear_current_request_context()
+    assert "params" not in captured
+    assert audit_module.flush_audit_events() == 1
 
     # params tuple: ..., ip_address, correlation_id, details_json
     assert captured["params"][6] == "192.168.1.1"
     assert captured["params"][7] == "cid-ctx-1"
 
 
+def _fake_audit_partitions(cutoff, counts):
+    def _fake_fetch_all(query, params=()):
+        if "pg_inherits" in query:
+            names = ["audit_log_p202401", "audit_log_p202402", "audit_log_p202403"]
+            return [{"partition_name": name, "cutoff": cutoff} for name in names]
+        return [{"partition_name": name, "row_count": count} for name, count in counts.items()]
+
+    return _fake_fetch_all
+
+
 def test_purge_audit_logs_dry_run(monkeypatch):
     backend_main = _load_backend_main_with_stubbed_db()
     events = []
-    called = {"execute_returning_one": False}
+    executed = []
     monkeypatch.setattr(
         backend_main,
         "_get_user_by_subject",
         lambda _subject: {"id": 7, "username": "admin", "active": True, "role": "admin"},
     )
-    monkeypatch.setattr(backend_main, "fetch_one", lambda *_args, **_kwargs: {"to_delete": 12})
     monkeypatch.setattr(
         backend_main,
-        "execute_returning_one",
-        lambda *_args, **_kwargs: called.__setitem__("execute_returning_one", True),
+        "fetch_all",
+        _fake_audit_partitions(datetime(2024, 3, 15), {"audit_log_p202401": 12, "audit_log_p202402": 3}),
     )
+    monkeypatch.setattr(backend_main, "execute", lambda query, params=(): executed.append(query))
     monkeypatch.setattr(backend_main, "audit_log_event", lambda **kwargs: events.append(kwargs))
 
     out = backend_main.purge_audit_logs("admin", retention_days=90, dry_run=True)
 
     assert out.dry_run is True
     assert out.retention_days == 90
-    assert out.to_delete == 12
+    assert out.to_delete == 15
     assert out.deleted == 0
-    assert called["execute_returning_one"] is False
+    assert [item.partition for item in out.partitions] == ["audit_log_p202401", "audit_log_p202402"]
+    assert out.partitions[0].rows == 12
+    assert executed == []
     assert events[-1]["action"] == "audit.purge.preview"
 
 
 def test_purge_audit_logs_execute(monkeypatch):
     backend_main = _load_backend_main_with_stubbed_db()
     events = []
+    executed = []
     monkeypatch.setattr(
         backend_main,
         "_get_user_by_subject",
         lambda _subject: {"id": 7, "username": "admin", "active": True, "role": "admin"},
     )
-    monkeypatch.setattr(backend_main, "fetch_one", lambda *_args, **_kwargs: {"to_delete": 5})
     monkeypatch.setattr(
         backend_main,
-        "execute_returning_one",
-        lambda *_args, **_kwargs: {"deleted_count": 5},
+        "fetch_all",
+        _fake_audit_partitions(datetime(2024, 2, 20), {"audit_log_p202401": 5}),
     )
+    monkeypatch.setattr(backend_main, "execute", lambda query, params=(): executed.append(query))
     monkeypatch.setattr(backend_main, "audit_log_event", lambda **kwargs: events.append(kwargs))
 
     out = backend_main.purge_audit_logs("admin", retention_days=180, dry_run=False)
@@ -515,10 +710,26 @@ def test_purge_audit_logs_execute(monkeypatch):
     assert out.retention_days == 180
     assert out.to_delete == 5
     assert out.deleted == 5
+    assert len(executed) == 1
+    assert "DETACH PARTITION audit_log_p202401" in executed[0]
+    assert "DROP TABLE audit_log_p202401" in executed[0]
     assert events[-1]["action"] == "audit.purge"
     assert events[-1]["details"]["deleted"] == 5
 
 
+def test_ensure_audit_partitions_creates_months_ahead(monkeypatch):
+    audit_module = _load_audit_with_stubbed_db()
+    executed = []
+    monkeypatch.setattr(audit_module, "execute", lambda query, params=(): executed.append(query))
+
+    names = audit_module.ensure_audit_partitions(months_ahead=2, start=datetime(2024, 11, 20).date())
+
+    assert names == ["audit_log_p202411", "audit_log_p202412", "audit_log_p202501"]
+    assert "FROM ('2024-12-01') TO ('2025-01-01')" in executed[0]
+    assert audit_module.audit_partition_bounds("audit_log_p202412")[1].isoformat() == "2025-01-01"
+    assert audit_module.audit_partition_bounds("audit_log_legacy") is None
+
+
 def test_audit_log_event_sanitizes_sensitive_and_truncates(monkeypatch):
     audit_module = _load_audit_with_stubbed_db()
     captured = {}
@@ -526,6 +737,7 @@ def test_audit_log_event_sanitizes_sensitive_and_truncates(monkeypatch):
     def _fake_execute(_query, params=()):
         captured["params"] = params
 
+    audit_module.flush_audit_events()
     monkeypatch.setattr(audit_module, "execute", _fake_execute)
     long_value = "x" * 400
     audit_module.audit_log_event(
@@ -538,6 +750,7 @@ def test_audit_log_event_sanitizes_sensitive_and_truncates(monkeypatch):
         },
     )
 
+    audit_module.flush_audit_events()
     details_json = captured["params"][8]
     payload = json.loads(details_json)
     assert payload["password"] == "***"
@@ -546,6 +759,40 @@ def test_audit_log_event_sanitizes_sensitive_and_truncates(monkeypatch):
     assert payload["safe"] == "ok"
 
 
+def test_audit_writer_batches_rows_and_drops_when_queue_full(monkeypatch):
+    audit_module = _load_audit_with_stubbed_db()
+    audit_module.flush_audit_events()
+    calls = []
+    monkeypatch.setattr(audit_module, "execute", lambda query, params=(): calls.append((query, params)))
+    monkeypatch.setattr(audit_module, "_QUEUE", audit_module.queue.Queue(maxsize=2))
+    dropped = audit_module.audit_queue_stats()["dropped"]
+
+    for index in range(3):
+        audit_module.audit_log_event(action="students.update", result="success", resource_id=str(index))
+
+    assert audit_module.audit_queue_stats()["dropped"] == dropped + 1
+    assert audit_module.flush_audit_events() == 2
+    assert len(calls) == 1
+    query, params = calls[0]
+    assert query.count("::jsonb") == 2
+    assert params[4] == "0"
+    assert params[14] == "1"
+
+
+def test_audit_writer_counts_failed_batches(monkeypatch):
+    audit_module = _load_audit_with_stubbed_db()
+    audit_module.flush_audit_events()
+
+    def _boom(*_args, **_kwargs):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(audit_module, "execute", _boom)
+    failed = audit_module.audit_queue_stats()["failed"]
+    audit_module.audit_log_event(action="students.update", result="success")
+    audit_module.flush_audit_events()
+    assert audit_module.audit_queue_stats()["failed"] == failed + 1
+
+
 def test_admin_audit_logs_ignores_whitespace_filters(monkeypatch):
     backend_main = _load_backend_main_with_stubbed_db()
     captured = {"calls": []}
@@ -567,6 +814,8 @@ def test_admin_audit_logs_ignores_whitespace_filters(monkeypatch):
         result=" ",
         limit=10,
         offset=5,
+        cursor=None,
+        exact_total=True,
     )
 
     assert out.total == 0
@@ -574,4 +823,923 @@ def test_admin_audit_logs_ignores_whitespace_filters(monkeypatch):
     # no string filters applied -> params for count query should stay empty
     assert captured["calls"][0][1] == ()
     # only pagination params in data query
-    assert captured["calls"][1][1] == (10, 5)
+    assert captured["calls"][1][1] == (11, 5)
+
+
+def test_admin_audit_logs_keyset_cursor_and_estimated_total(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    calls = []
+
+    def _row(row_id, minute):
+        return {
+            "id": row_id,
+            "actor_user_id": 7,
+            "actor_username": "admin",
+            "action": "auth.login",
+            "resource_type": "auth",
+            "resource_id": None,
+            "result": "success",
+            "ip_address": None,
+            "correlation_id": None,
+            "details": {},
+            "created_at": datetime(2026, 2, 25, 10, minute, 0),
+        }
+
+    def _fake_fetch_all(query, params=()):
+        calls.append((query, params))
+        if "EXPLAIN" in query:
+            return [{"QUERY PLAN": [{"Plan": {"Plan Rows": 120000}}]}]
+        return [_row(30, 30), _row(29, 29), _row(28, 28)]
+
+    monkeypatch.setattr(backend_main, "fetch_all", _fake_fetch_all)
+    kwargs = {
+        "date_from": None,
+        "date_to": None,
+        "actor_username": "",
+        "action": "",
+        "resource_type": "",
+        "result": "",
+        "limit": 2,
+        "offset": 0,
+        "exact_total": False,
+    }
+    first = backend_main.list_audit_logs("admin", cursor=None, **kwargs)
+
+    assert first.total == 120000
+    assert first.total_is_estimate is True
+    assert [row.id for row in first.rows] == [30, 29]
+    assert not any("COUNT(*)" in query for query, _params in calls)
+
+    calls.clear()
+    backend_main.list_audit_logs("admin", cursor=first.next_cursor, **kwargs)
+    query, params = calls[-1]
+    assert "(created_at, id) < (%s, %s)" in query
+    assert params == (datetime(2026, 2, 25, 10, 29, 0), 29, 3, 0)
+
+    with pytest.raises(HTTPException) as exc:
+        backend_main.list_audit_logs("admin", cursor="not-a-cursor", **kwargs)
+    assert exc.value.status_code == 422
+
+
+def test_students_list_reads_through_async_db(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    captured = {}
+
+    async def _fake_fetch_all(query, params=()):
+        captured["query"] = query
+        captured["params"] = params
+        return [{"id": 5, "name": "Ana", "active": True}]
+
+    monkeypatch.setattr(backend_main.async_db, "fetch_all", _fake_fetch_all)
+    rows = asyncio.run(
+        backend_main.list_students(
+            "coach1",
+            limit=10,
+            offset=20,
+            status_filter="Active",
+            name_query=" ana ",
+            after_id=None,
+            before_id=None,
+        )
+    )
+
+    assert [row.id for row in rows] == [5]
+    assert "s.active = true" in captured["query"]
+    assert "s.name_search LIKE lower(f_unaccent(%s))" in captured["query"]
+    assert captured["params"] == ("%ana%", 10, 20)
+
+
+def test_students_page_returns_total_in_one_query_then_caches_it(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    backend_main._invalidate_student_counts()
+    calls = []
+
+    async def _fake_fetch_all(query, params=()):
+        calls.append((query, params))
+        rows = [{"id": 5, "name": "Ana", "active": True}, {"id": 9, "name": "Bea", "active": True}]
+        if "total_count" in query:
+            return [dict(row, total_count=7) for row in rows]
+        return rows
+
+    monkeypatch.setattr(backend_main.async_db, "fetch_all", _fake_fetch_all)
+    first = asyncio.run(
+        backend_main.students_page("coach1", limit=1, offset=0, status_filter="Active", name_query="", after_id=None, before_id=None)
+    )
+    second = asyncio.run(
+        backend_main.students_page("coach1", limit=1, offset=1, status_filter="Active", name_query="", after_id=None, before_id=None)
+    )
+
+    assert first.total == 7
+    assert [row.id for row in first.rows] == [5]
+    assert first.next_cursor == 5
+    assert calls[0][1] == (2, 0)
+    assert second.total == 7
+    assert "total_count" not in calls[1][0]
+    assert calls[1][1] == (2, 1)
+
+    backend_main._invalidate_student_counts()
+    asyncio.run(backend_main.students_page("coach1", limit=1, offset=0, status_filter="Active", name_query="", after_id=None, before_id=None))
+    assert "total_count" in calls[2][0]
+
+
+def test_students_stats_splits_grouping_sets_and_fills_months(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    backend_main._invalidate_student_counts()
+    calls = []
+
+    def _row(g_active=1, g_location=1, g_belt=1, g_month=1, **values):
+        base = {"active": None, "location": None, "belt": None, "month": None, "active_total": 0}
+        base.update(values)
+        base.update(g_active=g_active, g_location=g_location, g_belt=g_belt, g_month=g_month)
+        return base
+
+    async def _fake_fetch_all(query, params=()):
+        calls.append(query)
+        return [
+            _row(g_active=0, active=True, total=8),
+            _row(g_active=0, active=False, total=2),
+            _row(g_location=0, location="Vienna", total=7, active_total=6),
+            _row(g_location=0, location=None, total=3, active_total=2),
+            _row(g_belt=0, belt="White", total=10, active_total=8),
+            _row(g_month=0, month=datetime(2026, 1, 1).date(), total=4),
+            _row(g_month=0, month=datetime(2026, 3, 1).date(), total=6),
+        ]
+
+    monkeypatch.setattr(backend_main.async_db, "fetch_all", _fake_fetch_all)
+    out = asyncio.run(backend_main.students_stats("coach1", months=240))
+    again = asyncio.run(backend_main.students_stats("coach1", months=240))
+
+    assert (out.total, out.active, out.inactive) == (10, 8, 2)
+    assert [(item.key, item.total, item.active) for item in out.by_location] == [("Vienna", 7, 6), (None, 3, 2)]
+    assert out.by_belt[0].key == "White"
+    assert [(p.month.month, p.enrolled, p.cumulative) for p in out.enrollments[:3]] == [
+        (1, 4, 4),
+        (2, 0, 4),
+        (3, 6, 10),
+    ]
+    assert again is out
+    assert len(calls) == 1
+    assert "GROUPING SETS" in calls[0]
+    backend_main._invalidate_student_counts()
+
+
+class _FakeBatchCursor:
+    def __init__(self, fail_names=()):
+        self.fail_names = set(fail_names)
+        self.statements = []
+        self.next_id = 100
+        self._row = None
+
+    def execute(self, query, params=None):
+        self.statements.append(query)
+        if params is not None:
+            if params[0] in self.fail_names:
+                raise RuntimeError("constraint violation")
+            self.next_id += 1
+            self._row = {"id": self.next_id}
+
+    def fetchone(self):
+        return self._row
+
+
+class _RecordingCursor:
+    """Transaction cursor that records (query, params) and hands back canned fetch results."""
+
+    def __init__(self, fetchone_result=None, fetchall_result=None):
+        self.fetchone_result = fetchone_result
+        self.fetchall_result = fetchall_result if fetchall_result is not None else []
+        self.statements = []
+
+    def execute(self, query, params=None):
+        self.statements.append((query, params))
+
+    def fetchone(self):
+        return self.fetchone_result
+
+    def fetchall(self):
+        return self.fetchall_result
+
+
+def _fake_transaction(cursor):
+    from contextlib import contextmanager
+
+    @contextmanager
+    def _transaction():
+        yield cursor
+
+    return _transaction
+
+
+def test_batch_create_students_validates_up_front_and_inserts_in_bulk(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    cursor = _FakeBatchCursor()
+    bulk_calls = []
+
+    def _fake_execute_values(cur, query, rows, page_size=100, fetch=False):
+        bulk_calls.append((query, rows))
+        return [{"id": 12}, {"id": 11}][: len(rows)]
+
+    monkeypatch.setattr(backend_main, "transaction", _fake_transaction(cursor))
+    monkeypatch.setattr(backend_main, "execute_values", _fake_execute_values)
+    monkeypatch.setattr(backend_main, "fetch_all", lambda *_args, **_kwargs: [{"id": 1}])
+    monkeypatch.setattr(backend_main, "_audit_cud", lambda **_kwargs: None)
+    payload = backend_main.StudentBatchCreateIn(
+        students=[
+            {"name": "Ana", "sex": "F", "email": "ana@example.com", "location_id": 1},
+            {"name": "Bad", "sex": "X", "email": "bad@example.com"},
+            {"name": "Nowhere", "sex": "M", "email": "no@example.com", "location_id": 99},
+            {"name": "Ben", "sex": "male", "email": "ben@example.com"},
+        ]
+    )
+
+    out = backend_main.batch_create_students(payload, "admin", dry_run=False)
+
+    assert (out.created, out.errors) == (2, 2)
+    assert [item.status for item in out.results] == ["created", "error", "error", "created"]
+    assert [item.id for item in out.results] == [11, None, None, 12]
+    assert out.results[2].detail == "Unknown location_id"
+    assert len(bulk_calls) == 1
+    assert [row[0] for row in bulk_calls[0][1]] == ["Ana", "Ben"]
+
+
+def test_batch_create_students_isolates_failing_rows_with_savepoints(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    cursor = _FakeBatchCursor(fail_names={"Dup"})
+
+    def _failing_execute_values(*_args, **_kwargs):
+        raise RuntimeError("constraint violation")
+
+    monkeypatch.setattr(backend_main, "transaction", _fake_transaction(cursor))
+    monkeypatch.setattr(backend_main, "execute_values", _failing_execute_values)
+    monkeypatch.setattr(backend_main, "_audit_cud", lambda **_kwargs: None)
+    payload = backend_main.StudentBatchCreateIn(
+        students=[
+            {"name": "Ana", "sex": "F", "email": "ana@example.com"},
+            {"name": "Dup", "sex": "F", "email": "dup@example.com"},
+        ]
+    )
+
+    out = backend_main.batch_create_students(payload, "admin", dry_run=False)
+
+    assert [item.status for item in out.results] == ["created", "error"]
+    assert out.results[1].detail == "Insert failed"
+    assert "ROLLBACK TO SAVEPOINT student_chunk" in cursor.statements
+    assert "ROLLBACK TO SAVEPOINT student_row" in cursor.statements
+
+
+def test_students_page_keyset_cursors(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    backend_main._store_student_count(("All", ""), 500)
+    calls = []
+
+    async def _fake_fetch_all(query, params=()):
+        calls.append((query, params))
+        if "ORDER BY s.id DESC" in query:
+            return [{"id": 40}, {"id": 39}, {"id": 38}]
+        return [{"id": 41}, {"id": 42}, {"id": 43}]
+
+    monkeypatch.setattr(backend_main.async_db, "fetch_all", _fake_fetch_all)
+    forward = asyncio.run(
+        backend_main.students_page(
+            "coach1", limit=2, offset=99, status_filter="All", name_query="", after_id=40, before_id=None
+        )
+    )
+    assert "s.id > %s" in calls[0][0]
+    assert calls[0][1] == (40, 3, 0)
+    assert [row.id for row in forward.rows] == [41, 42]
+    assert (forward.prev_cursor, forward.next_cursor) == (41, 42)
+
+    backward = asyncio.run(
+        backend_main.students_page(
+            "coach1", limit=2, offset=0, status_filter="All", name_query="", after_id=None, before_id=41
+        )
+    )
+    assert "s.id < %s" in calls[1][0]
+    assert [row.id for row in backward.rows] == [39, 40]
+    assert (backward.prev_cursor, backward.next_cursor) == (39, 40)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(
+            backend_main.list_students(
+                "coach1", limit=2, offset=0, status_filter="All", name_query="", after_id=1, before_id=9
+            )
+        )
+    assert exc.value.status_code == 422
+    backend_main._invalidate_student_counts()
+
+
+def test_student_overview_reads_sections_on_one_checkout(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    batches = []
+    enrolled = datetime.now(timezone.utc).date() - timedelta(days=20)
+
+    async def _fake_fetch_all_many(statements):
+        batches.append(statements)
+        results = [[{"id": 7, "name": "Anna", "enrollment_date": enrolled}]]
+        for query, _params in statements[1:]:
+            if "t_student_followups" in query:
+                results.append(
+                    [
+                        {
+                            "id": 3,
+                            "student_id": 7,
+                            "stage_number": 1,
+                            "call_date": enrolled,
+                            "created_at": datetime.now(timezone.utc),
+                            "updated_at": datetime.now(timezone.utc),
+                        }
+                    ]
+                )
+            else:
+                results.append([{"c1": "Kids", "c2": "2026-01-05", "c3": "present"}])
+        return results
+
+    monkeypatch.setattr(backend_main.async_db, "fetch_all_many", _fake_fetch_all_many)
+    out = asyncio.run(
+        backend_main.student_overview(7, fields="detail,followups,attendance", attendance_limit=5, _="coach1")
+    )
+    assert out.detail.name == "Anna"
+    assert out.followups.current_stage == 2
+    assert [stage.status for stage in out.followups.stages[:2]] == ["completed", "current"]
+    assert out.attendance[0].c3 == "present"
+    assert len(batches) == 1 and len(batches[0]) == 3
+    assert batches[0][2][1] == (7, 5)
+
+    only = asyncio.run(backend_main.student_overview(7, fields="followups", attendance_limit=5, _="coach1"))
+    assert only.detail is None and only.attendance is None
+    assert len(batches[1]) == 2
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(backend_main.student_overview(7, fields="detail,grades", attendance_limit=5, _="coach1"))
+    assert exc.value.status_code == 422
+
+
+def test_student_overview_missing_student_is_404(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    monkeypatch.setattr(backend_main.async_db, "fetch_all_many", _async_return([[], []]))
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(backend_main.student_overview(99, fields="detail,followups", attendance_limit=5, _="coach1"))
+    assert exc.value.status_code == 404
+
+
+def _get_request(path, if_none_match=None):
+    from starlette.requests import Request
+
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": headers})
+
+
+def test_list_locations_answers_304_when_table_version_unchanged(monkeypatch):
+    from fastapi import Response
+
+    backend_main = _load_backend_main_with_stubbed_db()
+    versions = {"t_locations": 4}
+    data_queries = []
+
+    def _fake_fetch_all(query, params=()):
+        if "t_table_versions" in query:
+            return [{"table_name": name, "version": versions[name]} for name in params[0] if name in versions]
+        data_queries.append(query)
+        return [{"id": 1, "name": "Vienna", "phone": None, "address": None, "active": True}]
+
+    monkeypatch.setattr(backend_main, "fetch_all", _fake_fetch_all)
+    first_response = Response()
+    rows = backend_main.list_locations(_get_request("/locations/list"), first_response, "coach1")
+    etag = first_response.headers["ETag"]
+    assert etag.startswith('W/"') and rows[0].name == "Vienna"
+
+    cached = backend_main.list_locations(_get_request("/locations/list", etag.removeprefix("W/")), Response(), "coach1")
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert len(data_queries) == 1
+
+    versions["t_locations"] = 5
+    response = Response()
+    rows = backend_main.list_locations(_get_request("/locations/list", etag), response, "coach1")
+    assert isinstance(rows, list) and response.headers["ETag"] != etag
+    assert len(data_queries) == 2
+
+
+def test_sync_changes_filters_by_cursor_and_reports_tombstones(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    batches = []
+
+    async def _fake_fetch_all_many(statements):
+        batches.append(statements)
+        results = [[{"horizon": 905}]]
+        for query, _params in statements[1:]:
+            if "t_sync_tombstones" in query:
+                results.append([{"table_name": "t_class_sessions", "row_id": 12}])
+            elif "FROM t_locations" in query and "t_students" not in query:
+                results.append([{"id": 3, "name": "Vienna", "phone": None, "address": None, "active": False}])
+            else:
+                results.append([])
+        return results
+
+    monkeypatch.setattr(backend_main.async_db, "fetch_all_many", _fake_fetch_all_many)
+    delta = asyncio.run(backend_main.sync_changes(since=880, _="coach1"))
+
+    assert (delta.cursor, delta.full) == (905, False)
+    assert delta.locations[0].active is False
+    assert delta.deleted == {"sessions": [12]}
+    assert all("change_seq >= %s" in query and params == (880,) for query, params in batches[0][1:])
+
+    full = asyncio.run(backend_main.sync_changes(since=0, _="coach1"))
+    assert full.full is True and full.deleted == {}
+    assert len(batches[1]) == 6
+    assert all("change_seq" not in query for query, _params in batches[1][1:])
+
+
+def test_birthday_window_wraps_new_year_and_month_mode():
+    backend_main = _load_backend_main_with_stubbed_db()
+    window = backend_main._birthday_window
+
+    assert window(datetime(2026, 12, 31).date(), 3) == [(1231, 1231), (101, 102)]
+    assert window(datetime(2026, 1, 31).date(), 2) == [(131, 201)]
+    assert window(datetime(2026, 5, 17).date(), None) == [(501, 531)]
+    assert window(datetime(2026, 3, 1).date(), 366) == [(101, 1231)]
+
+
+def test_news_birthdays_caches_until_student_write(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    backend_main._invalidate_student_counts()
+    calls = []
+
+    def _fake_fetch_all(query, params=()):
+        calls.append((query, params))
+        return [{"name": "Anna", "belt": "White", "birthday": datetime(2001, 1, 2).date(), "active": True}]
+
+    monkeypatch.setattr(backend_main, "fetch_all", _fake_fetch_all)
+    first = backend_main.news_birthdays(days=14, _="coach1")
+    again = backend_main.news_birthdays(days=14, _="coach1")
+
+    assert again is first and len(calls) == 1
+    assert "birthday_md BETWEEN" in calls[0][0] and "EXTRACT" not in calls[0][0]
+    backend_main._invalidate_student_counts()
+    backend_main.news_birthdays(days=14, _="coach1")
+    assert len(calls) == 2
+    backend_main._invalidate_student_counts()
+
+
+def test_followups_due_is_one_query_with_filters(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    calls = []
+    enrolled = datetime(2026, 1, 1).date()
+
+    async def _fake_fetch_all(query, params=()):
+        calls.append((query, params))
+        return [
+            {
+                "total_count": 1,
+                "student_id": 7,
+                "name": "Anna",
+                "phone": None,
+                "email": None,
+                "location_id": 2,
+                "location": "Vienna",
+                "enrollment_date": enrolled,
+                "current_stage": 2,
+                "stage_started": datetime(2026, 1, 15).date(),
+                "days_overdue": 3,
+                "last_call_date": None,
+            }
+        ]
+
+    monkeypatch.setattr(backend_main.async_db, "fetch_all", _fake_fetch_all)
+    out = asyncio.run(backend_main.followups_due("coach1", limit=20, offset=40, location_id=2, order="asc"))
+
+    assert out.total == 1 and out.rows[0].current_stage == 2
+    query, params = calls[0]
+    assert "NOT EXISTS" in query and "ORDER BY o.days_overdue ASC" in query
+    assert params[2:] == (2, 20, 40)
+
+    monkeypatch.setattr(backend_main.async_db, "fetch_all", _async_return([{"total_count": 0, "student_id": None}]))
+    empty = asyncio.run(backend_main.followups_due("coach1", limit=20, offset=0, location_id=None, order="desc"))
+    assert (empty.total, empty.rows) == (0, [])
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(backend_main.followups_due("coach1", limit=20, offset=0, location_id=None, order="sideways"))
+    assert exc.value.status_code == 422
+
+
+def test_list_sessions_filters_by_week_location_and_class(monkeypatch):
+    from fastapi import Response
+
+    backend_main = _load_backend_main_with_stubbed_db()
+    calls = []
+
+    async def _fake_fetch_all(query, params=()):
+        if "t_table_versions" in query:
+            return []
+        calls.append((query, params))
+        return []
+
+    monkeypatch.setattr(backend_main.async_db, "fetch_all", _fake_fetch_all)
+    week = datetime(2026, 3, 1).date()
+    asyncio.run(
+        backend_main.list_sessions(
+            _get_request("/sessions/list"),
+            Response(),
+            "coach1",
+            date_from=week,
+            date_to=week + timedelta(days=6),
+            location_id=2,
+            class_id=None,
+        )
+    )
+    query, params = calls[0]
+    assert "cs.session_date >= %s AND cs.session_date <= %s AND cs.location_id = %s" in query
+    assert params == (week, week + timedelta(days=6), 2)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(
+            backend_main.list_sessions(
+                _get_request("/sessions/list"),
+                Response(),
+                "coach1",
+                date_from=week,
+                date_to=week - timedelta(days=1),
+                location_id=None,
+                class_id=None,
+            )
+        )
+    assert exc.value.status_code == 422
+
+
+def test_generate_sessions_previews_then_inserts_set_based(monkeypatch):
+    from backend.schemas import ScheduleGenerateIn
+
+    backend_main = _load_backend_main_with_stubbed_db()
+    monkeypatch.setattr(backend_main, "_audit_cud", lambda **_kwargs: None)
+    term_start, term_end = datetime(2026, 9, 1).date(), datetime(2026, 12, 20).date()
+
+    def _slot(day, exists):
+        return {
+            "template_id": 1,
+            "class_id": 3,
+            "class_name": "Fundamentals",
+            "session_date": datetime(2026, 9, day).date(),
+            "start_time": "18:00:00",
+            "end_time": "19:00:00",
+            "location_id": 2,
+            "location_name": "Vienna",
+            "already_exists": exists,
+            "copies": 2 if day == 14 else 1,
+        }
+
+    preview_calls = []
+    monkeypatch.setattr(
+        backend_main,
+        "fetch_all",
+        lambda query, params=(): preview_calls.append((query, params)) or [_slot(7, True), _slot(14, False)],
+    )
+    preview = backend_main.generate_sessions_from_templates(
+        ScheduleGenerateIn(date_from=term_start, date_to=term_end, template_ids=[1]), "coach1"
+    )
+    assert (preview.dry_run, preview.total_slots, preview.skipped_existing) == (True, 2, 1)
+    assert preview.duplicate_slots == 1
+    assert "generate_series" in preview_calls[0][0] and preview_calls[0][1] == (term_start, term_end, [1])
+
+    cursor = _RecordingCursor({"total_slots": 16, "skipped_existing": 1, "duplicate_slots": 2, "created": 15})
+    monkeypatch.setattr(backend_main, "transaction", _fake_transaction(cursor))
+    applied = backend_main.generate_sessions_from_templates(
+        ScheduleGenerateIn(date_from=term_start, date_to=term_end, dry_run=False), "coach1"
+    )
+    assert (applied.created, applied.skipped_existing, applied.duplicate_slots, applied.slots) == (15, 1, 2, [])
+    assert "pg_advisory_xact_lock" in cursor.statements[0][0]
+    insert_sql, insert_params = cursor.statements[1]
+    assert "INSERT INTO t_class_sessions" in insert_sql and "WHERE NOT already_exists" in insert_sql
+    assert "DISTINCT ON (class_id, session_date, start_time, location_id)" in insert_sql
+    assert "COUNT(*) FILTER (WHERE already_exists)" in insert_sql
+    assert insert_params == (term_start, term_end)
+
+    with pytest.raises(HTTPException) as exc:
+        backend_main.generate_sessions_from_templates(
+            ScheduleGenerateIn(date_from=term_start, date_to=datetime(2027, 12, 31).date()), "coach1"
+        )
+    assert exc.value.status_code == 422
+
+
+def test_register_attendance_bulk_reports_each_student_from_one_insert(monkeypatch):
+    from backend.schemas import AttendanceBulkIn
+
+    backend_main = _load_backend_main_with_stubbed_db()
+    monkeypatch.setattr(backend_main, "_audit_cud", lambda **_kwargs: None)
+    cursor = _RecordingCursor(
+        {"id": 9},
+        [
+            {"student_id": 1, "known": True, "inserted": True},
+            {"student_id": 2, "known": True, "inserted": False},
+            {"student_id": 404, "known": False, "inserted": False},
+        ],
+    )
+    monkeypatch.setattr(backend_main, "transaction", _fake_transaction(cursor))
+
+    out = backend_main.register_attendance_bulk(
+        AttendanceBulkIn(
+            session_id=9,
+            source="coach",
+            entries=[
+                {"student_id": 1, "status": "present"},
+                {"student_id": 2, "status": "late"},
+                {"student_id": 404, "status": "present"},
+                {"student_id": 1, "status": "absent"},
+            ],
+        ),
+        "coach1",
+    )
+    assert [item.result for item in out.results] == [
+        "registered", "already_registered", "unknown_student", "duplicate",
+    ]
+    assert (out.total, out.registered, out.already_registered, out.errors) == (4, 1, 1, 2)
+    insert_sql, insert_params = cursor.statements[1]
+    assert insert_sql.count("INSERT INTO t_attendance") == 1 and "ON CONFLICT DO NOTHING" in insert_sql
+    assert insert_params == ([1, 2, 404], ["present", "late", "present"], 9, "coach")
+
+    missing = _RecordingCursor()
+    monkeypatch.setattr(backend_main, "transaction", _fake_transaction(missing))
+    with pytest.raises(HTTPException) as exc:
+        backend_main.register_attendance_bulk(
+            AttendanceBulkIn(session_id=10, source="coach", entries=[{"student_id": 1, "status": "present"}]),
+            "coach1",
+        )
+    assert exc.value.status_code == 404
+
+
+def test_attendance_by_student_pages_by_cursor_with_totals_on_first_page(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    batches = []
+
+    def _history_row(day, session_id):
+        session_date = datetime(2026, 10, day).date()
+        return {
+            "c1": "Kids",
+            "c2": session_date.isoformat(),
+            "c3": "present",
+            "session_date": session_date,
+            "session_id": session_id,
+        }
+
+    async def _fake_fetch_all_many(statements):
+        batches.append(statements)
+        results = [[_history_row(14, 30), _history_row(12, 29), _history_row(9, 27)]]
+        if len(statements) > 1:
+            results.append([{"last_30_days": 8, "last_90_days": 20, "last_365_days": 71}])
+        return results
+
+    monkeypatch.setattr(backend_main.async_db, "fetch_all_many", _fake_fetch_all_many)
+    first = asyncio.run(backend_main.attendance_by_student(7, limit=2, cursor=None, _="coach1"))
+    assert [row.c2 for row in first.rows] == ["2026-10-14", "2026-10-12"]
+    assert (first.totals.last_30_days, first.totals.last_365_days) == (8, 71)
+    assert batches[0][0][1] == (7, 3) and batches[0][1][1][2:4] == (7, ["present", "late"])
+    assert backend_main._decode_attendance_cursor(first.next_cursor) == ("2026-10-12", 29)
+
+    second = asyncio.run(backend_main.attendance_by_student(7, limit=5, cursor=first.next_cursor, _="coach1"))
+    assert second.totals is None and second.next_cursor is None
+    assert len(batches[1]) == 1
+    assert "(cs.session_date, a.session_id) <" in batches[1][0][0]
+    assert batches[1][0][1] == (7, datetime(2026, 10, 12).date(), 29, 6)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(backend_main.attendance_by_student(7, limit=5, cursor="not-a-cursor", _="coach1"))
+    assert exc.value.status_code == 422
+
+
+def test_analytics_read_rollups_not_attendance_rows(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    queries = []
+
+    async def _fake_fetch_all(query, params=()):
+        queries.append((query, params))
+        return [
+            {
+                "total_count": 3,
+                "student_id": 5,
+                "name": "Anna",
+                "location_id": 2,
+                "location": "Vienna",
+                "first_attended": datetime(2025, 1, 7).date(),
+                "last_attended": datetime(2026, 8, 3).date(),
+                "attended_total": 88,
+                "days_since_last": 74,
+            }
+        ]
+
+    monkeypatch.setattr(backend_main.async_db, "fetch_all", _fake_fetch_all)
+    page = asyncio.run(
+        backend_main.analytics_retention(_="coach1", inactive_days=30, limit=1, offset=0, location_id=2)
+    )
+    assert page.total == 3 and page.rows[0].attended_total == 88
+    assert "FROM t_attendance_student_span" in queries[0][0] and "t_attendance a" not in queries[0][0]
+    assert queries[0][1][-3:] == (2, 1, 0)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(
+            backend_main.analytics_occupancy(
+                _="coach1",
+                date_from=datetime(2026, 9, 1).date(),
+                date_to=datetime(2026, 8, 1).date(),
+                location_id=None,
+                class_id=None,
+            )
+        )
+    assert exc.value.status_code == 422
+
+    async def _fake_fetch_all_many(statements):
+        assert "t_attendance_student_span" in statements[0][0]
+        assert "generate_series" in statements[1][0]
+        first_week = statements[1][1][0]
+        return [
+            [{"first_attended": datetime(2025, 1, 7).date(), "last_attended": first_week, "attended_total": 40}],
+            [{"week_start": first_week, "attended": 2, "recorded": 3}],
+        ]
+
+    monkeypatch.setattr(backend_main.async_db, "fetch_all_many", _fake_fetch_all_many)
+    summary = asyncio.run(backend_main.analytics_student(5, weeks=4, _="coach1"))
+    assert summary.attended_total == 40 and summary.weeks[0].attended == 2
+    assert summary.weeks[0].week_start.weekday() == 0
+
+
+def test_audit_failed_batch_retries_row_by_row(monkeypatch):
+    audit_module = _load_audit_with_stubbed_db()
+    audit_module.flush_audit_events()
+    written = []
+
+    def _execute(query, params=()):
+        if query.count("::jsonb") > 1 or params[4] == "bad":
+            raise RuntimeError("rejected")
+        written.append(params[4])
+
+    monkeypatch.setattr(audit_module, "execute", _execute)
+    stats = audit_module.audit_queue_stats()
+    for resource_id in ("1", "bad", "3"):
+        audit_module.audit_log_event(action="students.update", result="success", resource_id=resource_id)
+    audit_module.flush_audit_events()
+
+    assert written == ["1", "3"]
+    after = audit_module.audit_queue_stats()
+    assert after["failed"] == stats["failed"] + 1
+    assert after["flushed"] == stats["flushed"] + 2
+
+
+def test_audit_block_policy_never_waits_on_event_loop(monkeypatch):
+    audit_module = _load_audit_with_stubbed_db()
+    audit_module.flush_audit_events()
+    monkeypatch.setattr(audit_module, "API_AUDIT_QUEUE_POLICY", "block")
+    monkeypatch.setattr(audit_module, "API_AUDIT_BLOCK_SECONDS", 5.0)
+    monkeypatch.setattr(audit_module, "_QUEUE", audit_module.queue.Queue(maxsize=1))
+    audit_module.audit_log_event(action="auth.login", result="success")
+    dropped = audit_module.audit_queue_stats()["dropped"]
+
+    async def _login_handler():
+        started = time.monotonic()
+        audit_module.audit_log_event(action="auth.login", result="success")
+        return time.monotonic() - started
+
+    assert asyncio.run(_login_handler()) < 1.0
+    assert audit_module.audit_queue_stats()["dropped"] == dropped + 1
+
+
+def test_audit_batch_creates_missing_partition_and_retries(monkeypatch):
+    audit_module = _load_audit_with_stubbed_db()
+    audit_module.flush_audit_events()
+    partitions = set()
+    statements = []
+
+    def _execute(query, params=()):
+        statements.append(query)
+        if query.startswith("CREATE TABLE"):
+            partitions.add(query.split()[5])
+            return
+        if not partitions:
+            raise RuntimeError("no partition of relation \"audit_log\" found for row")
+
+    monkeypatch.setattr(audit_module, "execute", _execute)
+    flushed = audit_module.audit_queue_stats()["flushed"]
+    audit_module.audit_log_event(action="students.update", result="success")
+    audit_module.audit_log_event(action="students.update", result="success")
+    audit_module.flush_audit_events()
+
+    month = datetime.now(timezone.utc).date()
+    assert audit_module.audit_partition_name(month) in partitions
+    assert audit_module.audit_queue_stats()["flushed"] == flushed + 2
+    assert sum(1 for query in statements if query.count("::jsonb") == 2) == 2
+
+
+def test_audit_missing_partitions_cover_server_timezone_month(monkeypatch):
+    audit_module = _load_audit_with_stubbed_db()
+    created = []
+    monkeypatch.setattr(
+        audit_module, "ensure_audit_partitions", lambda months_ahead, start: created.append(start.isoformat())
+    )
+    # 23:30 UTC on Oct 31 is already November in Vienna; 00:30 UTC on Dec 1 is still November in New York.
+    audit_module._ensure_partitions_for(
+        [
+            (None,) * 9 + (datetime(2026, 10, 31, 23, 30, tzinfo=timezone.utc),),
+            (None,) * 9 + (datetime(2026, 12, 1, 0, 30, tzinfo=timezone.utc),),
+        ]
+    )
+    assert created == ["2026-10-01", "2026-11-01", "2026-12-01"]
+
+
+def test_sync_changes_resyncs_cursor_older_than_purged_tombstones(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    batches = []
+
+    async def _fake_fetch_all_many(statements):
+        batches.append(statements)
+        return [[{"horizon": 905, "floor": 700}]] + [[] for _statement in statements[1:]]
+
+    monkeypatch.setattr(backend_main.async_db, "fetch_all_many", _fake_fetch_all_many)
+    delta = asyncio.run(backend_main.sync_changes(since=650, _="coach1"))
+
+    assert delta.full is True and delta.cursor == 905
+    assert all("DELETE" not in query for batch in batches for query, _params in batch)
+    assert len(batches[1]) == 6
+
+    fresh = asyncio.run(backend_main.sync_changes(since=880, _="coach1"))
+    assert fresh.full is False and len(batches) == 3
+
+
+def test_sync_tombstone_purge_runs_as_daily_task_and_retries_on_failure(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    audit_module = sys.modules["backend.audit"]
+    assert audit_module._DAILY_TASKS["sync_tombstones"] is backend_main._purge_sync_tombstones
+    calls = []
+
+    def _execute(query, params=()):
+        calls.append((query, params))
+        if len(calls) == 1:
+            raise RuntimeError("lock timeout")
+
+    monkeypatch.setattr(backend_main, "execute", _execute)
+    monkeypatch.setattr(audit_module, "_DAILY_TASKS_DONE_ON", {})
+    monkeypatch.setattr(audit_module, "_DAILY_TASKS", {"sync_tombstones": backend_main._purge_sync_tombstones})
+
+    audit_module._run_daily_tasks()
+    assert "sync_tombstones" not in audit_module._DAILY_TASKS_DONE_ON
+    audit_module._run_daily_tasks()
+    audit_module._run_daily_tasks()
+    assert len(calls) == 2
+    assert "DELETE FROM t_sync_tombstones" in calls[1][0]
+    assert calls[1][1] == (backend_main.API_SYNC_TOMBSTONE_DAYS,)
+
+
+def test_schedule_template_deactivate_writes_audit_event(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    events = []
+    monkeypatch.setattr(
+        backend_main,
+        "_get_user_by_subject",
+        lambda _subject: {"id": 7, "username": "admin", "active": True, "role": "admin"},
+    )
+    monkeypatch.setattr(backend_main, "execute_returning_one", lambda *_args, **_kwargs: {"id": 4})
+    monkeypatch.setattr(backend_main, "audit_log_event", lambda **kwargs: events.append(kwargs))
+
+    result = backend_main.deactivate_schedule_template(4, "admin")
+
+    assert result == {"status": "ok", "id": 4, "active": False}
+    assert events[-1]["action"] == "schedule_templates.deactivate"
+    assert (events[-1]["resource_type"], events[-1]["resource_id"]) == ("schedule_template", "4")
+
+
+def test_attendance_rollup_migration_locks_and_backfills_once(monkeypatch):
+    backend_main = _load_backend_main_with_stubbed_db()
+    executed = []
+    monkeypatch.setattr(backend_main, "execute", lambda query, params=(): executed.append(query))
+
+    first = _RecordingCursor({"name": "attendance_rollups_backfill"})
+    monkeypatch.setattr(backend_main, "transaction", _fake_transaction(first))
+    backend_main._migrate_attendance_rollups()
+    first_sql = [" ".join(query.split()) for query, _params in first.statements]
+    assert first_sql[0] == "LOCK TABLE t_attendance IN SHARE ROW EXCLUSIVE MODE"
+    assert any("CREATE TRIGGER trg_attendance_rollup_truncate" in query for query in first_sql)
+    assert first_sql[-1] == "SELECT f_attendance_rollup_rebuild()"
+    refresh = next(query for query in executed if "FUNCTION f_attendance_rollup_refresh" in query)
+    assert refresh.index("f_attendance_rollup_lock") < refresh.index("DELETE FROM")
+    insert = next(query for query in executed if "FUNCTION f_attendance_rollup_insert" in query)
+    assert insert.index("f_attendance_rollup_lock") < insert.index("ON CONFLICT")
+    moved = next(query for query in executed if "FUNCTION f_attendance_rollup_session_moved" in query)
+    assert moved.index("f_attendance_rollup_lock(ARRAY[]::integer[], ARRAY[NEW.id])") < moved.index(
+        "FROM t_attendance"
+    )
+    lock = next(query for query in executed if "FUNCTION f_attendance_rollup_lock" in query)
+    assert lock.index("attendance_rollup.session") < lock.index("attendance_rollup.student")
+
+    restart = _RecordingCursor()
+    monkeypatch.setattr(backend_main, "transaction", _fake_transaction(restart))
+    backend_main._migrate_attendance_rollups()
+    assert all("f_attendance_rollup_rebuild" not in query for query, _params in restart.statements)
+
+
+def test_attendance_totals_windows_cover_exactly_n_days():
+    backend_main = _load_backend_main_with_stubbed_db()
+    today = datetime(2026, 10, 17).date()
+    start_30, start_90, student_id, statuses, start_365, end = backend_main._attendance_totals_params(7, today)
+
+    assert (student_id, statuses, end) == (7, ["present", "late"], today)
+    for start, days in ((start_30, 30), (start_90, 90), (start_365, 365)):
+        assert (today - start).days + 1 == days
+        # A session exactly N days old falls outside "the last N days"; one N - 1 days old is inside.
+        assert today - timedelta(days=days) < start <= today - timedelta(days=days - 1)
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from backend import bulk_import
+
+
+def test_iter_records_streams_json_arrays_in_small_reads(tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk_import, "_READ_SIZE", 7)
+    path = tmp_path / "students.json"
+    rows = [{"name": f"Student {i}", "tags": ["a", "]"], "note": "x, y"} for i in range(5)]
+    path.write_text(json.dumps({"students": rows}, indent=2), encoding="utf-8")
+
+    assert list(bulk_import.iter_records(str(path), "students")) == rows
+
+
+def test_iter_records_reads_ndjson_and_csv(tmp_path):
+    ndjson = tmp_path / "users.ndjson"
+    ndjson.write_text('{"username": "ana"}\n\n{"username": "ben"}\n', encoding="utf-8")
+    csv_path = tmp_path / "users.csv"
+    csv_path.write_text("username,password,role\nana,Secret123!,\n", encoding="utf-8")
+
+    assert [row["username"] for row in bulk_import.iter_records(str(ndjson), "users")] == ["ana", "ben"]
+    assert list(bulk_import.iter_records(str(csv_path), "users")) == [
+        {"username": "ana", "password": "Secret123!", "role": None}
+    ]
+    with pytest.raises(ValueError):
+        list(bulk_import.iter_records(str(tmp_path / "users.txt"), "users"))
+
+
+def test_run_import_checkpoints_and_resumes_after_failure(tmp_path, capsys):
+    source = tmp_path / "students.ndjson"
+    source.write_text("".join(json.dumps({"n": i}) + "\n" for i in range(7)), encoding="utf-8")
+    checkpoint_path = str(tmp_path / "import.checkpoint.json")
+    sent = []
+
+    def _send(chunk):
+        if chunk[0]["n"] == 4:
+            raise RuntimeError("API down")
+        sent.append([row["n"] for row in chunk])
+        return {"created": len(chunk)}
+
+    checkpoint = bulk_import.Checkpoint(checkpoint_path, str(source), 2)
+    with pytest.raises(RuntimeError):
+        bulk_import.run_import(
+            bulk_import.iter_records(str(source), "students"),
+            send=_send,
+            chunk_size=2,
+            workers=1,
+            checkpoint=checkpoint,
+            on_result=lambda *_args: None,
+        )
+    assert sent == [[0, 1], [2, 3]]
+
+    resumed = bulk_import.Checkpoint(checkpoint_path, str(source), 2)
+    assert resumed.completed == {1, 2}
+    sent.clear()
+    totals = bulk_import.run_import(
+        bulk_import.iter_records(str(source), "students"),
+        send=lambda chunk: sent.append([row["n"] for row in chunk]) or {},
+        chunk_size=2,
+        workers=2,
+        checkpoint=resumed,
+        on_result=lambda *_args: None,
+    )
+    assert sorted(sent) == [[4, 5], [6]]
+    assert totals["skipped_chunks"] == 2
+    assert "rows/s" in capsys.readouterr().out
+
+    with pytest.raises(ValueError):
+        bulk_import.Checkpoint(checkpoint_path, str(source), 3)
@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+
+from backend.pool import BoundedConnectionPool, PoolTimeoutError
+
+
+class _FakeInfo:
+    def __init__(self):
+        self.transaction_status = TRANSACTION_STATUS_IDLE
+
+
+class _FakeConn:
+    def __init__(self):
+        self.closed = 0
+        self.info = _FakeInfo()
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+def test_pool_reuses_idle_connections_and_reports_stats():
+    pool = BoundedConnectionPool(1, 2, connect=_FakeConn, timeout=1)
+    first = pool.getconn()
+    stats = pool.stats()
+    assert stats["in_use"] == 1
+    assert stats["idle"] == 0
+    pool.putconn(first)
+    assert pool.getconn() is first
+    assert pool.stats()["acquired"] == 2
+
+
+def test_pool_rolls_back_dirty_connections_on_return():
+    pool = BoundedConnectionPool(0, 1, connect=_FakeConn, timeout=1)
+    conn = pool.getconn()
+    conn.info.transaction_status = TRANSACTION_STATUS_INTRANS
+    pool.putconn(conn)
+    assert conn.rollbacks == 1
+    assert pool.stats()["idle"] == 1
+
+
+def test_pool_times_out_when_exhausted():
+    pool = BoundedConnectionPool(0, 1, connect=_FakeConn, timeout=0.05)
+    pool.getconn()
+    with pytest.raises(PoolTimeoutError):
+        pool.getconn()
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_pool_waiter_receives_released_connection():
+    pool = BoundedConnectionPool(0, 1, connect=_FakeConn, timeout=2)
+    held = pool.getconn()
+    received = []
+
+    def _worker():
+        received.append(pool.getconn())
+
+    thread = threading.Thread(target=_worker)
+    thread.start()
+    for _ in range(100):
+        if pool.stats()["waiters"] == 1:
+            break
+        time.sleep(0.01)
+    assert pool.stats()["waiters"] == 1
+    pool.putconn(held)
+    thread.join(timeout=2)
+    assert received == [held]
+    assert pool.stats()["waiters"] == 0
+
+
+def test_pool_rejects_when_wait_queue_full():
+    pool = BoundedConnectionPool(0, 1, connect=_FakeConn, timeout=1, max_waiters=0)
+    pool.getconn()
+    with pytest.raises(PoolTimeoutError):
+        pool.getconn()
+    assert pool.stats()["rejected"] == 1
+
+
+def test_pool_discards_closed_connections():
+    pool = BoundedConnectionPool(0, 1, connect=_FakeConn, timeout=1)
+    conn = pool.getconn()
+    conn.close()
+    pool.putconn(conn)
+    stats = pool.stats()
+    assert stats["size"] == 0
+    assert pool.getconn() is not conn
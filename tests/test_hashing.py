@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from backend import hashing
+from backend.security import verify_password
+
+
+def test_hash_passwords_uses_process_pool(monkeypatch):
+    monkeypatch.setattr(hashing, "API_HASH_WORKERS", 2)
+    try:
+        hashed = hashing.hash_passwords(["FirstPassword1", "SecondPassword2", "ThirdPassword3"])
+        assert verify_password("SecondPassword2", hashed[1]) is True
+        assert asyncio.run(hashing.verify_password_async("FirstPassword1", hashed[0])) is True
+        assert asyncio.run(hashing.verify_password_async("wrong", hashed[0])) is False
+    finally:
+        hashing.shutdown()
+    stats = hashing.stats()
+    assert stats["pending"] == 0
+    assert stats["completed"] >= 5
+
+
+def test_hashing_rejects_when_pending_cap_reached(monkeypatch):
+    monkeypatch.setattr(hashing, "API_HASH_WORKERS", 0)
+    monkeypatch.setattr(hashing, "API_HASH_MAX_PENDING", 0)
+    rejected = hashing.stats()["rejected"]
+
+    with pytest.raises(hashing.HashingBusyError):
+        hashing.hash_password("StrongPwd123!")
+    assert hashing.stats()["rejected"] == rejected + 1
+
+
+def test_hashing_inline_mode_propagates_errors(monkeypatch):
+    monkeypatch.setattr(hashing, "API_HASH_WORKERS", 0)
+
+    with pytest.raises(ValueError):
+        hashing.hash_password("")
+    assert hashing.stats()["pending"] == 0
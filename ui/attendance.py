@@ -8,8 +8,10 @@ from api_client import (
     is_api_configured,
     list_students as api_list_students,
     register_attendance as api_register_attendance,
+    register_attendance_bulk as api_register_attendance_bulk,
 )
 from i18n import t
+import local_store
 
 
 def build(tab_attendance):
@@ -63,33 +65,50 @@ def build(tab_attendance):
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
-    # Load attendance rows for a session id into the table.
-    def search_by_session():
+    # The last history query and its cursor, so "Load More" can continue where the table ends.
+    history_page = {"fetch": None, "cursor": None}
+
+    def _load_history(fetch, append=False):
         if not is_api_configured():
             messagebox.showerror("API error", "API is not configured.")
-            rows = []
+            page = {}
         else:
             try:
-                api_rows = api_attendance_by_session(query_value.get())
-                rows = [(r.get("c1"), r.get("c2"), r.get("c3")) for r in api_rows]
+                page = fetch(history_page["cursor"] if append else None)
             except ApiError as ae:
                 messagebox.showerror("API error", str(ae))
-                rows = []
-        fill_attendance_table(rows)
+                page = {}
+        history_page["fetch"] = fetch
+        history_page["cursor"] = page.get("next_cursor")
+        load_more_btn.config(state="normal" if history_page["cursor"] else "disabled")
+        if not append:
+            totals = page.get("totals")
+            summary_text.set(
+                t(
+                    "label.attended_summary",
+                    d30=totals.get("last_30_days", 0),
+                    d90=totals.get("last_90_days", 0),
+                    d365=totals.get("last_365_days", 0),
+                )
+                if totals
+                else ""
+            )
+        rows = [(r.get("c1"), r.get("c2"), r.get("c3")) for r in page.get("rows") or []]
+        fill_attendance_table(rows, append=append)
 
-    # Load attendance rows for a student id into the table.
+    # Load attendance rows for a session id into the table.
+    def search_by_session():
+        session_value = query_value.get()
+        _load_history(lambda cursor: api_attendance_by_session(session_value, cursor=cursor))
+
+    # Load the first page of a student's history plus the attended totals.
     def search_by_student():
-        if not is_api_configured():
-            messagebox.showerror("API error", "API is not configured.")
-            rows = []
-        else:
-            try:
-                api_rows = api_attendance_by_student(query_value.get())
-                rows = [(r.get("c1"), r.get("c2"), r.get("c3")) for r in api_rows]
-            except ApiError as ae:
-                messagebox.showerror("API error", str(ae))
-                rows = []
-        fill_attendance_table(rows)
+        student_value = query_value.get()
+        _load_history(lambda cursor: api_attendance_by_student(student_value, cursor=cursor))
+
+    def load_more_history():
+        if history_page["fetch"] and history_page["cursor"]:
+            _load_history(history_page["fetch"], append=True)
 
     def open_for_session(selected_session_id):
         try:
@@ -101,6 +120,7 @@ def build(tab_attendance):
         student_id.set(0)
         student_name_query.set("")
         search_by_session()
+        roster_tree.delete(*roster_tree.get_children())
         widget = student_search_widget.get("ref")
         if widget is not None:
             try:
@@ -109,7 +129,11 @@ def build(tab_attendance):
                 pass
 
     # Replace the attendance table rows with the provided dataset.
-    def fill_attendance_table(rows):
+    def fill_attendance_table(rows, append=False):
+        if append:
+            for row in rows:
+                attendance_tree.insert("", tk.END, values=row)
+            return
         for r in attendance_tree.get_children():
             attendance_tree.delete(r)
         if not rows:
@@ -222,6 +246,12 @@ def build(tab_attendance):
     ttk.Button(search_frame, text=t("label.by_student"), command=search_by_student) \
         .grid(row=0, column=2, padx=5)
 
+    load_more_btn = ttk.Button(search_frame, text=t("button.load_more"), command=load_more_history, state="disabled")
+    load_more_btn.grid(row=0, column=3, padx=5)
+
+    summary_text = tk.StringVar(value="")
+    ttk.Label(search_frame, textvariable=summary_text).grid(row=1, column=0, columnspan=4, sticky="w", pady=(6, 0))
+
     search_frame.columnconfigure(0, weight=1)
 
     attendance_tree = ttk.Treeview(
@@ -237,6 +267,93 @@ def build(tab_attendance):
 
     attendance_tree.grid(row=3, column=0, sticky="nsew", pady=10)
 
+    # ---------- Roster ----------
+    # Every active student at the session's location, marked in place and sent as one request.
+    roster_frame = ttk.LabelFrame(attendance_frame, text=t("label.roster"), padding=10)
+    roster_frame.grid(row=2, column=0, sticky="nsew", pady=5)
+    attendance_frame.rowconfigure(2, weight=1)
+
+    roster_controls = ttk.Frame(roster_frame)
+    roster_controls.pack(fill=tk.X, pady=(0, 6))
+    roster_tree = ttk.Treeview(roster_frame, columns=("id", "name", "status"), show="headings", height=8)
+    roster_tree.heading("id", text=t("label.id"))
+    roster_tree.heading("name", text=t("label.name"))
+    roster_tree.heading("status", text=t("label.status"))
+    roster_tree.column("id", width=60, stretch=False)
+    roster_tree.pack(fill=tk.BOTH, expand=True)
+    roster_statuses = ("", "present", "late", "absent", "no_show")
+
+    def load_roster():
+        roster_tree.delete(*roster_tree.get_children())
+        if session_id.get() <= 0:
+            messagebox.showerror("Error", "Session ID is required")
+            return
+        try:
+            local_store.refresh()
+        except ApiError as ae:
+            messagebox.showerror("API error", str(ae))
+            return
+        session = next((r for r in local_store.sessions() if r.get("id") == session_id.get()), None)
+        if session is None:
+            messagebox.showerror("Error", "Session not found")
+            return
+        rows = [
+            r for r in local_store.students()
+            if r.get("active") and r.get("location_id") == session.get("location_id")
+        ]
+        if not rows:
+            roster_tree.insert("", tk.END, values=("", t("label.roster_empty"), ""))
+            return
+        for r in rows:
+            roster_tree.insert("", tk.END, iid=str(r["id"]), values=(r["id"], r.get("name"), ""))
+
+    # Double-click cycles a student through the statuses; blank rows are not submitted.
+    def cycle_roster_status(_event=None):
+        item = roster_tree.focus()
+        if not item or not roster_tree.item(item)["values"][0]:
+            return
+        values = list(roster_tree.item(item)["values"])
+        current = str(values[2]) if values[2] in roster_statuses else ""
+        values[2] = roster_statuses[(roster_statuses.index(current) + 1) % len(roster_statuses)]
+        roster_tree.item(item, values=values)
+
+    def mark_all_present():
+        for item in roster_tree.get_children():
+            values = list(roster_tree.item(item)["values"])
+            if values[0] and not values[2]:
+                values[2] = "present"
+                roster_tree.item(item, values=values)
+
+    def submit_roster():
+        entries = [
+            (values[0], values[2])
+            for values in (roster_tree.item(item)["values"] for item in roster_tree.get_children())
+            if values[0] and values[2]
+        ]
+        if not entries:
+            return
+        try:
+            result = api_register_attendance_bulk(session_id.get(), entries, source=source.get())
+        except ApiError as ae:
+            messagebox.showerror("API error", str(ae))
+            return
+        messagebox.showinfo(
+            "OK",
+            t(
+                "label.roster_done",
+                registered=result.get("registered", 0),
+                already=result.get("already_registered", 0),
+                errors=result.get("errors", 0),
+            ),
+        )
+        query_value.set(session_id.get())
+        search_by_session()
+
+    ttk.Button(roster_controls, text=t("button.load_roster"), command=load_roster).pack(side=tk.LEFT, padx=4)
+    ttk.Button(roster_controls, text=t("button.all_present"), command=mark_all_present).pack(side=tk.LEFT, padx=4)
+    ttk.Button(roster_controls, text=t("button.submit_roster"), command=submit_roster).pack(side=tk.RIGHT, padx=4)
+    roster_tree.bind("<Double-1>", cycle_roster_status)
+
     return {
         "search_by_session": search_by_session,
         "search_by_student": search_by_student,
@@ -1,3 +1,5 @@
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import date, datetime, timedelta
@@ -6,6 +8,9 @@ from api_client import ApiError, list_sessions as api_list_sessions
 from i18n import t
 from ui.local_app_settings import DEFAULT_CLASS_COLOR, get_class_color
 
+# Weeks fetched (or prefetched) within this many seconds are drawn without asking the API again.
+WEEK_CACHE_SECONDS = 60
+
 
 def _parse_date(value):
     if isinstance(value, date):
@@ -42,6 +47,9 @@ def build(tab_attendance_week, on_session_click=None):
     controls.pack(fill=tk.X, pady=(0, 8))
 
     week_start = {"value": _sunday_week_start(date.today())}
+    # week start date -> (fetched_at, rows); written by the prefetch thread, read on the Tk thread.
+    week_cache = {}
+    week_cache_lock = threading.Lock()
 
     week_label = ttk.Label(controls, text="")
     week_label.pack(side=tk.LEFT)
@@ -254,15 +262,56 @@ def build(tab_attendance_week, on_session_click=None):
                         pass
                 return
 
-    def load_week():
+    def _fetch_week(start):
+        rows = api_list_sessions(date_from=start, date_to=start + timedelta(days=6))
+        with week_cache_lock:
+            week_cache[start] = (time.monotonic(), rows)
+        return rows
+
+    def _cached_week(start):
+        with week_cache_lock:
+            entry = week_cache.get(start)
+        if entry and time.monotonic() - entry[0] < WEEK_CACHE_SECONDS:
+            return entry[1]
+        return None
+
+    # Load the weeks either side on a worker thread so prev/next flips draw from memory.
+    def _prefetch_neighbours(start):
+        missing = [
+            other
+            for other in (start - timedelta(days=7), start + timedelta(days=7))
+            if _cached_week(other) is None
+        ]
+        if not missing:
+            return
+
+        def _worker():
+            for other in missing:
+                try:
+                    _fetch_week(other)
+                except ApiError:
+                    return
+
+        threading.Thread(target=_worker, name="week-prefetch", daemon=True).start()
+
+    def load_week(force=False):
         _draw_grid()
-        week_label.config(text=_format_week_label(week_start["value"]))
-        try:
-            rows = api_list_sessions()
-        except ApiError as exc:
-            messagebox.showerror("API error", str(exc))
-            rows = []
+        start = week_start["value"]
+        week_label.config(text=_format_week_label(start))
+        rows = None if force else _cached_week(start)
+        if rows is None:
+            try:
+                rows = _fetch_week(start)
+            except ApiError as exc:
+                messagebox.showerror("API error", str(exc))
+                rows = []
         _draw_events(rows)
+        _prefetch_neighbours(start)
+
+    def _refresh_week():
+        with week_cache_lock:
+            week_cache.clear()
+        load_week(force=True)
 
     def _prev_week():
         week_start["value"] = week_start["value"] - timedelta(days=7)
@@ -279,7 +328,7 @@ def build(tab_attendance_week, on_session_click=None):
     btn_prev.config(command=_prev_week)
     btn_next.config(command=_next_week)
     btn_today.config(command=_today_week)
-    btn_refresh.config(command=load_week)
+    btn_refresh.config(command=_refresh_week)
 
     def _on_mousewheel(event):
         delta = -1 * int(event.delta / 120) if event.delta else 0
@@ -289,4 +338,4 @@ def build(tab_attendance_week, on_session_click=None):
     canvas.bind("<MouseWheel>", _on_mousewheel)
     canvas.bind("<Button-1>", _on_canvas_click)
 
-    return {"load_week": load_week}
+    return {"load_week": _refresh_week}
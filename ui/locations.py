@@ -5,11 +5,11 @@ from api_client import (
     ApiError,
     create_location as api_create_location,
     deactivate_location as api_deactivate_location,
-    list_locations as api_list_locations,
     reactivate_location as api_reactivate_location,
     update_location as api_update_location,
 )
 from i18n import t
+import local_store
 from validation_middleware import ValidationError, validate_required
 from error_middleware import handle_db_error, log_validation_error
 
@@ -97,9 +97,10 @@ def build(tab_locations):
     def load_locations():
         locations_tree.delete(*locations_tree.get_children())
         try:
+            local_store.refresh()
             rows = [
                 (r.get("id"), r.get("name"), r.get("phone"), r.get("address"), r.get("active"))
-                for r in api_list_locations()
+                for r in local_store.locations()
             ]
         except ApiError as e:
             messagebox.showerror("API error", str(e))
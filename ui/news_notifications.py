@@ -1,15 +1,32 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 
-from api_client import ApiError, is_api_configured, news_birthdays as api_news_birthdays
+from api_client import (
+    ApiError,
+    followups_due as api_followups_due,
+    is_api_configured,
+    news_birthdays as api_news_birthdays,
+)
 from i18n import t
 
+# Window choices for the header combobox; None is the calendar month.
+BIRTHDAY_WINDOWS = (None, 7, 30)
+FOLLOWUPS_DUE_LIMIT = 200
+
 
 def build(tab_news):
     header = ttk.Frame(tab_news)
     header.grid(row=0, column=0, sticky="ew", padx=10, pady=(10, 5))
 
-    ttk.Label(header, text=t("label.birthdays_this_month")).grid(row=0, column=0, sticky="w")
+    window_labels = {
+        (t("label.birthdays_this_month") if days is None else t("label.birthdays_next_days", days=days)): days
+        for days in BIRTHDAY_WINDOWS
+    }
+    window_var = tk.StringVar(value=t("label.birthdays_next_days", days=30))
+    window_cb = ttk.Combobox(
+        header, textvariable=window_var, values=list(window_labels), state="readonly", width=24
+    )
+    window_cb.grid(row=0, column=0, sticky="w")
 
     count_var = tk.StringVar(value=t("label.results", count=0))
     ttk.Label(header, textvariable=count_var).grid(row=0, column=1, sticky="w", padx=(10, 0))
@@ -52,7 +69,7 @@ def build(tab_news):
             rows = []
         else:
             try:
-                api_rows = api_news_birthdays()
+                api_rows = api_news_birthdays(window_labels.get(window_var.get()))
                 rows = [
                     (
                         r.get("name"),
@@ -86,13 +103,66 @@ def build(tab_news):
 
         count_var.set(t("label.results", count=len(rows)))
 
-    ttk.Button(header, text=t("button.refresh"), command=load_birthdays).grid(
+    due_frame = ttk.LabelFrame(tab_news, text=t("label.followups_due"), padding=10)
+    due_frame.grid(row=2, column=0, sticky="nsew", padx=10, pady=(0, 10))
+    tab_news.grid_rowconfigure(2, weight=1)
+
+    due_tree = ttk.Treeview(
+        due_frame,
+        columns=("name", "location", "stage", "days_overdue", "phone"),
+        show="headings"
+    )
+    due_header_map = {
+        "name": "label.name",
+        "location": "label.location",
+        "stage": "label.followup_stage",
+        "days_overdue": "label.days_overdue",
+        "phone": "label.phone",
+    }
+    for c in due_tree["columns"]:
+        due_tree.heading(c, text=t(due_header_map.get(c, c)))
+    due_tree.pack(fill=tk.BOTH, expand=True)
+
+    # Most overdue first, straight from /followups/due; no need to open students one by one.
+    def load_followups_due():
+        for r in due_tree.get_children():
+            due_tree.delete(r)
+        if not is_api_configured():
+            return
+        try:
+            rows = api_followups_due(limit=FOLLOWUPS_DUE_LIMIT).get("rows", [])
+        except ApiError as ae:
+            messagebox.showerror("API error", str(ae))
+            rows = []
+        if not rows:
+            due_tree.insert("", tk.END, values=(t("label.no_data"), "", "", "", ""))
+            return
+        for r in rows:
+            due_tree.insert(
+                "",
+                tk.END,
+                values=(
+                    r.get("name"),
+                    r.get("location") or "",
+                    r.get("current_stage"),
+                    r.get("days_overdue"),
+                    r.get("phone") or "",
+                ),
+            )
+
+    def refresh_news():
+        load_birthdays()
+        load_followups_due()
+
+    ttk.Button(header, text=t("button.refresh"), command=refresh_news).grid(
         row=0, column=2, sticky="e", padx=(10, 0)
     )
     header.grid_columnconfigure(2, weight=1)
+    window_cb.bind("<<ComboboxSelected>>", lambda _event: load_birthdays())
 
-    load_birthdays()
+    refresh_news()
 
     return {
         "load_birthdays": load_birthdays,
+        "load_followups_due": load_followups_due,
     }
@@ -1,6 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, colorchooser
-from datetime import date
+from datetime import date, timedelta
 
 from tkcalendar import DateEntry
 
@@ -11,16 +11,19 @@ from api_client import (
     active_teachers as api_active_teachers,
     cancel_session as api_cancel_session,
     create_class as api_create_class,
+    create_schedule_template as api_create_schedule_template,
     create_session as api_create_session,
     deactivate_class as api_deactivate_class,
-    list_classes as api_list_classes,
-    list_sessions as api_list_sessions,
+    deactivate_schedule_template as api_deactivate_schedule_template,
+    generate_sessions as api_generate_sessions,
+    list_schedule_templates as api_list_schedule_templates,
     reactivate_class as api_reactivate_class,
     restore_session as api_restore_session,
     update_class as api_update_class,
     update_session as api_update_session,
 )
 from i18n import t
+import local_store
 from ui.local_app_settings import (
     DEFAULT_CLASS_COLOR,
     get_class_color,
@@ -47,8 +50,12 @@ def build(tab_sessions):
     sessions_list_frame = ttk.LabelFrame(tab_sessions, text=t("label.sessions_list"), padding=10)
     sessions_list_frame.grid(row=3, column=0, columnspan=2, sticky="nsew", padx=10, pady=5)
 
+    timetable_frame = ttk.LabelFrame(tab_sessions, text=t("label.timetable"), padding=10)
+    timetable_frame.grid(row=4, column=0, columnspan=2, sticky="nsew", padx=10, pady=5)
+
     tab_sessions.grid_rowconfigure(2, weight=1)
     tab_sessions.grid_rowconfigure(3, weight=1)
+    tab_sessions.grid_rowconfigure(4, weight=1)
     tab_sessions.grid_columnconfigure(0, weight=1)
     tab_sessions.grid_columnconfigure(1, weight=1)
 
@@ -233,6 +240,53 @@ def build(tab_sessions):
     sessions_tree.tag_configure("cancelled", foreground="red")
     sessions_tree.pack(fill=tk.BOTH, expand=True)
 
+    # ---------- Timetable ----------
+    # Weekly slots (class, weekday, time, location) that "Generate Term" turns into sessions in one request.
+    timetable_controls = ttk.Frame(timetable_frame)
+    timetable_controls.pack(fill=tk.X, pady=(0, 6))
+    ttk.Label(timetable_controls, text=t("label.term_from")).pack(side=tk.LEFT)
+    term_from = DateEntry(timetable_controls, date_pattern="yyyy-mm-dd", width=12)
+    term_from.pack(side=tk.LEFT, padx=(4, 10))
+    ttk.Label(timetable_controls, text=t("label.term_to")).pack(side=tk.LEFT)
+    term_to = DateEntry(timetable_controls, date_pattern="yyyy-mm-dd", width=12)
+    term_to.set_date(date.today() + timedelta(days=120))
+    term_to.pack(side=tk.LEFT, padx=(4, 10))
+    btn_timetable_add = ttk.Button(timetable_controls, text=t("button.timetable_add"))
+    btn_timetable_add.pack(side=tk.LEFT, padx=4)
+    btn_timetable_remove = ttk.Button(timetable_controls, text=t("button.timetable_remove"))
+    btn_timetable_remove.pack(side=tk.LEFT, padx=4)
+    btn_generate_term = ttk.Button(timetable_controls, text=t("button.generate_term"))
+    btn_generate_term.pack(side=tk.RIGHT, padx=4)
+
+    timetable_tree = ttk.Treeview(
+        timetable_frame,
+        columns=("id", "weekday", "class", "start", "end", "location", "valid"),
+        show="headings",
+        height=5,
+    )
+    timetable_header_map = {
+        "id": "label.id",
+        "weekday": "label.weekday",
+        "class": "label.class",
+        "start": "label.start_time_short",
+        "end": "label.end_time_short",
+        "location": "label.location",
+        "valid": "label.valid_range",
+    }
+    for c in timetable_tree["columns"]:
+        timetable_tree.heading(c, text=t(timetable_header_map.get(c, c)))
+    timetable_tree.pack(fill=tk.BOTH, expand=True)
+    # ISO weekday (1 = Monday) -> label
+    weekday_labels = {
+        1: t("label.day_mon"),
+        2: t("label.day_tue"),
+        3: t("label.day_wed"),
+        4: t("label.day_thu"),
+        5: t("label.day_fri"),
+        6: t("label.day_sat"),
+        7: t("label.day_sun"),
+    }
+
     # ---------- Helpers ----------
     # Populate the coach combobox with active coaches from the database.
     def refresh_coach_options(show_empty_message=False):
@@ -320,6 +374,7 @@ def build(tab_sessions):
     def load_classes():
         classes_tree.delete(*classes_tree.get_children())
         try:
+            local_store.refresh()
             rows = [
                 (
                     r.get("id"),
@@ -329,7 +384,7 @@ def build(tab_sessions):
                     r.get("active"),
                     r.get("coach_name"),
                 )
-                for r in api_list_classes()
+                for r in local_store.classes()
             ]
         except ApiError as e:
             messagebox.showerror("API error", str(e))
@@ -356,6 +411,7 @@ def build(tab_sessions):
     def load_sessions():
         sessions_tree.delete(*sessions_tree.get_children())
         try:
+            local_store.refresh()
             rows = [
                 (
                     r.get("id"),
@@ -366,7 +422,7 @@ def build(tab_sessions):
                     r.get("location_name"),
                     r.get("cancelled"),
                 )
-                for r in api_list_sessions()
+                for r in local_store.sessions()
             ]
         except ApiError as e:
             messagebox.showerror("API error", str(e))
@@ -690,7 +746,98 @@ def build(tab_sessions):
 
         update_session_button_states()
 
+    # Show the active weekly slots.
+    def load_timetable():
+        timetable_tree.delete(*timetable_tree.get_children())
+        try:
+            rows = [r for r in api_list_schedule_templates() if r.get("active")]
+        except ApiError as e:
+            messagebox.showerror("API error", str(e))
+            rows = []
+        for r in rows:
+            timetable_tree.insert(
+                "", tk.END,
+                values=(
+                    r.get("id"),
+                    weekday_labels.get(r.get("weekday"), r.get("weekday")),
+                    r.get("class_name"),
+                    str(r.get("start_time") or "")[:5],
+                    str(r.get("end_time") or "")[:5],
+                    r.get("location_name") or "",
+                    f"{r.get('valid_from')} - {r.get('valid_to')}",
+                ),
+            )
+
+    # Store the session form (class, times, location) as a weekly slot on the form date's weekday.
+    def add_timetable_slot():
+        try:
+            validate_required(session_class.get(), "Class")
+            validate_required(session_start.get(), "Start time")
+            validate_required(session_end.get(), "End time")
+            validate_required(session_location.get(), "Location")
+            class_id = class_option_map.get(session_class.get())
+            if not class_id:
+                raise ValidationError("Select a valid class")
+            location_id = location_option_map.get(session_location.get())
+            if not location_id:
+                raise ValidationError("Select a valid location")
+            api_create_schedule_template(
+                {
+                    "class_id": class_id,
+                    "weekday": session_date.get_date().isoweekday(),
+                    "start_time": session_start.get().strip(),
+                    "end_time": session_end.get().strip(),
+                    "location_id": location_id,
+                    "valid_from": term_from.get_date().isoformat(),
+                    "valid_to": term_to.get_date().isoformat(),
+                }
+            )
+            load_timetable()
+        except ValidationError as ve:
+            log_validation_error(ve, "add_timetable_slot")
+            messagebox.showerror("Validation error", str(ve))
+        except ApiError as ae:
+            messagebox.showerror("API error", str(ae))
+
+    def remove_timetable_slot():
+        sel = timetable_tree.selection()
+        if not sel:
+            return
+        template_id = timetable_tree.item(sel[0])["values"][0]
+        try:
+            api_deactivate_schedule_template(template_id)
+        except ApiError as ae:
+            messagebox.showerror("API error", str(ae))
+            return
+        load_timetable()
+
+    # Preview the term, confirm the counts, then create every missing session in one request.
+    def generate_term():
+        start, end = term_from.get_date(), term_to.get_date()
+        try:
+            preview = api_generate_sessions(start, end, dry_run=True)
+            slots = int(preview.get("total_slots", 0))
+            existing = int(preview.get("skipped_existing", 0))
+            if slots - existing <= 0:
+                messagebox.showinfo("OK", t("label.generate_term_done", created=0))
+                return
+            if not messagebox.askyesno(
+                "Confirm",
+                t("label.generate_term_confirm", slots=slots, existing=existing, new=slots - existing),
+            ):
+                return
+            result = api_generate_sessions(start, end, dry_run=False)
+        except ApiError as ae:
+            messagebox.showerror("API error", str(ae))
+            return
+        load_sessions()
+        messagebox.showinfo("OK", t("label.generate_term_done", created=result.get("created", 0)))
+
     # ---------- Bind buttons ----------
+    btn_timetable_add.config(command=add_timetable_slot)
+    btn_timetable_remove.config(command=remove_timetable_slot)
+    btn_generate_term.config(command=generate_term)
+
     btn_class_add.config(command=register_class)
     btn_class_update.config(command=update_class)
     btn_class_deactivate.config(command=deactivate_class)
@@ -715,6 +862,7 @@ def build(tab_sessions):
     return {
         "load_classes": load_classes,
         "load_sessions": load_sessions,
+        "load_timetable": load_timetable,
         "refresh_coach_options": refresh_coach_options,
         "refresh_class_options": refresh_class_options,
         "refresh_location_options": refresh_location_options,
@@ -1,4 +1,5 @@
-﻿import tkinter as tk
+﻿import threading
+import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import date, datetime
 
@@ -11,12 +12,12 @@ from api_client import (
     active_locations as api_active_locations,
     ApiError,
     deactivate_student as api_deactivate_student,
-    count_students as api_count_students,
     create_student as api_create_student,
-    get_student as api_get_student,
-    list_students as api_list_students,
     list_student_followups as api_list_student_followups,
     reactivate_student as api_reactivate_student,
+    student_overview as api_student_overview,
+    student_stats as api_student_stats,
+    students_page as api_students_page,
     upsert_student_followup as api_upsert_student_followup,
     update_student as api_update_student,
 )
@@ -33,6 +34,9 @@ from error_middleware import handle_db_error, log_validation_error
 
 
 PAGE_SIZE_STUDENTS = 100
+STATS_MONTHS = 24
+# Arrow-key scrolling through the list only loads the row the user settles on.
+STUDENT_SELECT_DELAY_MS = 150
 
 matplotlib.use("TkAgg")
 
@@ -69,8 +73,16 @@ def build(tab_students):
     #)
 
     current_student_page = 0
+    # Pages are addressed by keyset cursors ({"after_id": ..} / {"before_id": ..}); {} is the first page.
+    student_page_anchor = {}
+    student_page_cursors = {"next": None, "prev": None}
+    student_prefetch = {"generation": 0, "key": None, "result": None, "thread": None}
+    student_prefetch_lock = threading.Lock()
     selected_student_id = None
     selected_student_active = None
+    # Overviews of students already visited since the list was last loaded, keyed by id.
+    student_overview_cache = {}
+    student_select_job = {"id": None}
 
     filter_active = tk.StringVar(value="Active")
     student_name_query = tk.StringVar(value="")
@@ -78,28 +90,77 @@ def build(tab_students):
     # =====================================================
     # DB HELPERS FOR CHARTS
     # =====================================================
-    # Return counts of students grouped by active status.
-    def count_students_by_status():
+    # Fetch the dashboard aggregates once; every chart draws from this response.
+    def load_student_stats():
         try:
-            active_total = int(api_count_students(status_filter="Active").get("total", 0))
-            inactive_total = int(api_count_students(status_filter="Inactive").get("total", 0))
-            return {True: active_total, False: inactive_total}
+            return api_student_stats(months=STATS_MONTHS) or {}
         except ApiError:
-            return {True: 0, False: 0}
+            return {}
 
     # =====================================================
     # LOADERS
     # =====================================================
-    # Fetch a page of students based on the active filter.
-    def load_students_paged(page):
-        status_filter = filter_active.get()
-        name_query = student_name_query.get().strip()
-        rows = api_list_students(
+    def student_page_key(anchor):
+        return (
+            filter_active.get(),
+            student_name_query.get().strip(),
+            anchor.get("after_id"),
+            anchor.get("before_id"),
+        )
+
+    def request_students_page(key):
+        status_filter, name_query, after_id, before_id = key
+        return api_students_page(
             limit=PAGE_SIZE_STUDENTS,
-            offset=page * PAGE_SIZE_STUDENTS,
+            offset=0,
             status_filter=status_filter,
             name_query=name_query,
+            after_id=after_id,
+            before_id=before_id,
         )
+
+    # Fetch the following page on a worker thread while the current one is on screen.
+    def prefetch_students_page(anchor):
+        key = student_page_key(anchor)
+        with student_prefetch_lock:
+            student_prefetch["generation"] += 1
+            generation = student_prefetch["generation"]
+            student_prefetch["key"] = key
+            student_prefetch["result"] = None
+
+        def _worker():
+            try:
+                result = request_students_page(key)
+            except ApiError:
+                return
+            with student_prefetch_lock:
+                if student_prefetch["generation"] == generation:
+                    student_prefetch["result"] = result
+
+        worker = threading.Thread(target=_worker, name="students-prefetch", daemon=True)
+        student_prefetch["thread"] = worker
+        worker.start()
+
+    # Use the prefetched page when it matches, otherwise ask the API.
+    def take_students_page(anchor):
+        key = student_page_key(anchor)
+        worker = student_prefetch["thread"]
+        if student_prefetch["key"] == key and worker is not None and worker.is_alive():
+            worker.join(timeout=10)
+        with student_prefetch_lock:
+            result = student_prefetch["result"] if student_prefetch["key"] == key else None
+            student_prefetch["generation"] += 1
+            student_prefetch["key"] = None
+            student_prefetch["result"] = None
+        return result if result is not None else request_students_page(key)
+
+    # Fetch a page of students and the filter's total in one request.
+    def load_students_paged(anchor):
+        result = take_students_page(anchor)
+        rows = result.get("rows") or []
+        total = int(result.get("total", 0))
+        student_page_cursors["next"] = result.get("next_cursor")
+        student_page_cursors["prev"] = result.get("prev_cursor")
         return [
             (
                 r.get("id"),
@@ -121,14 +182,7 @@ def build(tab_students):
                 r.get("newsletter_opt_in"),
             )
             for r in rows
-        ]
-
-    # Count students based on the active filter for pagination.
-    def count_students():
-        status_filter = filter_active.get()
-        name_query = student_name_query.get().strip()
-        result = api_count_students(status_filter=status_filter, name_query=name_query)
-        return int(result.get("total", 0))
+        ], total
 
     # ---------- Form ----------
     form = ttk.LabelFrame(tab_students, text=t("label.student_form"), padding=10)
@@ -651,7 +705,7 @@ def build(tab_students):
                 else:
                     badge.config(bg="#bfbfbf", fg="black")
 
-    def load_student_followup_data():
+    def load_student_followup_data(data=None):
         nonlocal selected_student_id
         followup_map.clear()
         followup_pending_extra_stage["value"] = None
@@ -662,11 +716,13 @@ def build(tab_students):
                 badge.config(bg="#bfbfbf", fg="black")
             _reset_followup_form()
             return
-        try:
-            data = api_list_student_followups(selected_student_id)
-        except ApiError as ae:
-            messagebox.showerror(t("alert.api_error_title"), str(ae))
-            return
+        if data is None:
+            student_overview_cache.pop(selected_student_id, None)
+            try:
+                data = api_list_student_followups(selected_student_id)
+            except ApiError as ae:
+                messagebox.showerror(t("alert.api_error_title"), str(ae))
+                return
         for item in data.get("followups", []):
             stage_number = int(item.get("stage_number", 0))
             if stage_number:
@@ -811,10 +867,9 @@ def build(tab_students):
     # CHARTS
     # =====================================================
     # Render the active vs inactive pie chart.
-    def draw_active_gauge():
-        stats = count_students_by_status()
-        active = stats.get(True, 0)
-        inactive = stats.get(False, 0)
+    def draw_active_gauge(stats):
+        active = int(stats.get("active", 0))
+        inactive = int(stats.get("inactive", 0))
 
         fig = Figure(figsize=(3.2, 3.2), dpi=100)
         ax = fig.add_subplot(111)
@@ -839,29 +894,30 @@ def build(tab_students):
         canvas.draw()
         canvas.get_tk_widget().pack()
 
-    # Render the total students line chart.
-    def draw_total_line():
-        stats = count_students_by_status()
-        active = stats.get(True, 0)
-        inactive = stats.get(False, 0)
-        total = active + inactive
+    # Render enrolment history: running total and new students per month.
+    def draw_total_line(stats):
+        points = stats.get("enrollments") or []
+        total = int(stats.get("total", 0))
 
         fig = Figure(figsize=(3.2, 3.2), dpi=100)
         ax = fig.add_subplot(111)
 
-        if total == 0:
+        if total == 0 or not points:
             ax.text(0.5, 0.5, t("label.no_data"), ha="center", va="center")
             ax.set_title(t("label.total_students"))
             ax.axis("off")
         else:
-            x = [0, 1]
-            ax.plot(x, [0, total], marker="o", color="blue", label=f"{t('label.total_students')} ({total})")
-            ax.plot(x, [0, inactive], marker="o", color="red", label=f"{t('label.inactive')} ({inactive})")
-            ax.plot(x, [0, active], marker="o", color="green", label=f"{t('label.active')} ({active})")
+            x = list(range(len(points)))
+            cumulative = [int(p.get("cumulative", 0)) for p in points]
+            enrolled = [int(p.get("enrolled", 0)) for p in points]
+            ax.plot(x, cumulative, color="blue", label=f"{t('label.total_students')} ({total})")
+            ax.bar(x, enrolled, color="green", alpha=0.5, label=t("label.new_per_month"))
             ax.set_title(t("label.total_students"))
             ax.set_ylabel(t("label.count"))
-            ax.set_xticks([])
-            ax.legend(loc="best")
+            step = max(1, len(points) // 4)
+            ax.set_xticks(x[::step])
+            ax.set_xticklabels([str(p.get("month", ""))[:7] for p in points[::step]], fontsize=7)
+            ax.legend(loc="best", fontsize=7)
 
         canvas = FigureCanvasTkAgg(fig, master=chart_right)
         canvas.draw()
@@ -873,8 +929,9 @@ def build(tab_students):
             w.destroy()
         for w in chart_right.winfo_children():
             w.destroy()
-        draw_active_gauge()
-        draw_total_line()
+        stats = load_student_stats()
+        draw_active_gauge(stats)
+        draw_total_line(stats)
 
     # =====================================================
     # ACTIONS
@@ -1147,22 +1204,34 @@ def build(tab_students):
 
     # Populate student form fields when a student row is selected.
     def on_student_select(event):
+        if student_select_job["id"] is not None:
+            students_tree.after_cancel(student_select_job["id"])
+        student_select_job["id"] = students_tree.after(STUDENT_SELECT_DELAY_MS, load_selected_student)
+
+    def load_selected_student():
         nonlocal selected_student_id, selected_student_active
+        student_select_job["id"] = None
         sel = students_tree.selection()
         if not sel:
             return
 
         item = students_tree.item(sel[0])
         v = item["values"]
+        if v[0] == "":
+            return
 
         selected_student_id = v[0]
         selected_student_active = ("active" in item.get("tags", ()))
 
-        try:
-            row = api_get_student(selected_student_id)
-        except ApiError as ae:
-            messagebox.showerror("API error", str(ae))
-            return
+        overview = student_overview_cache.get(selected_student_id)
+        if overview is None:
+            try:
+                overview = api_student_overview(selected_student_id, fields=("detail", "followups"))
+            except ApiError as ae:
+                messagebox.showerror("API error", str(ae))
+                return
+            student_overview_cache[selected_student_id] = overview
+        row = overview.get("detail") or {}
         st_name.set(row.get("name") or "")
         st_sex.set(sex_from_db(row.get("sex")))
         st_direction.set(row.get("direction") or "")
@@ -1222,7 +1291,7 @@ def build(tab_students):
         _update_student_academy_age_label()
 
         update_button_states()
-        load_student_followup_data()
+        load_student_followup_data(overview.get("followups"))
 
     students_tree.bind("<<TreeviewSelect>>", on_student_select)
 
@@ -1235,6 +1304,7 @@ def build(tab_students):
         nonlocal current_student_page
         selected_student_id = None
         selected_student_active = None
+        student_overview_cache.clear()
         followup_popup.withdraw()
         update_button_states()
         load_student_followup_data()
@@ -1242,11 +1312,13 @@ def build(tab_students):
         for r in students_tree.get_children():
             students_tree.delete(r)
 
+        student_page_cursors["next"] = None
+        student_page_cursors["prev"] = None
         try:
-            rows = load_students_paged(current_student_page)
+            rows, total = load_students_paged(student_page_anchor)
         except ApiError as ae:
             messagebox.showerror("API error", str(ae))
-            rows = []
+            rows, total = [], 0
         if not rows:
             students_tree.insert(
                 "", tk.END,
@@ -1285,26 +1357,32 @@ def build(tab_students):
                 tags=(tag,)
             )
 
-        try:
-            total = count_students()
-        except ApiError as ae:
-            messagebox.showerror("API error", str(ae))
-            total = 0
         pages = max(1, (total + PAGE_SIZE_STUDENTS - 1) // PAGE_SIZE_STUDENTS)
         lbl_page.config(text=t("label.page", page=current_student_page + 1, pages=pages))
+        if student_page_cursors["next"] is not None:
+            prefetch_students_page({"after_id": student_page_cursors["next"]})
 
     # Advance to the next page of students.
     def next_student():
-        nonlocal current_student_page
+        nonlocal current_student_page, student_page_anchor
+        if student_page_cursors["next"] is None:
+            return
         current_student_page += 1
+        student_page_anchor = {"after_id": student_page_cursors["next"]}
         load_students_view()
 
     # Move back to the previous page of students.
     def prev_student():
-        nonlocal current_student_page
-        if current_student_page > 0:
-            current_student_page -= 1
-            load_students_view()
+        nonlocal current_student_page, student_page_anchor
+        if current_student_page == 0:
+            return
+        current_student_page -= 1
+        if current_student_page == 0 or student_page_cursors["prev"] is None:
+            current_student_page = 0
+            student_page_anchor = {}
+        else:
+            student_page_anchor = {"before_id": student_page_cursors["prev"]}
+        load_students_view()
 
     ttk.Button(nav, text=t("button.prev"), command=prev_student).grid(row=0, column=0, padx=5)
     lbl_page = ttk.Label(nav, text=t("label.page", page=1, pages=1))
@@ -1312,8 +1390,9 @@ def build(tab_students):
     ttk.Button(nav, text=t("button.next"), command=next_student).grid(row=0, column=2, padx=5)
 
     def on_students_filter_change(*_):
-        nonlocal current_student_page
+        nonlocal current_student_page, student_page_anchor
         current_student_page = 0
+        student_page_anchor = {}
         load_students_view()
 
     filter_active.trace_add("write", on_students_filter_change)
@@ -6,11 +6,11 @@ from api_client import (
     ApiError,
     create_teacher as api_create_teacher,
     deactivate_teacher as api_deactivate_teacher,
-    list_teachers as api_list_teachers,
     reactivate_teacher as api_reactivate_teacher,
     update_teacher as api_update_teacher,
 )
 from i18n import t
+import local_store
 from validation_middleware import ValidationError, validate_required, validate_email
 from error_middleware import handle_db_error, log_validation_error
 
@@ -147,6 +147,7 @@ def build(tab_teachers):
     def load_teachers():
         teachers_tree.delete(*teachers_tree.get_children())
         try:
+            local_store.refresh()
             rows = [
                 (
                     r.get("id"),
@@ -158,7 +159,7 @@ def build(tab_teachers):
                     r.get("hire_date"),
                     r.get("active"),
                 )
-                for r in api_list_teachers()
+                for r in local_store.teachers()
             ]
         except ApiError as e:
             messagebox.showerror("API error", str(e))